@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 import sys
-from datetime import datetime
+import time
+import uuid
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
 # ------------------------------------------------------------
@@ -16,8 +18,35 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from src.analysis.campaign import DEFAULT_DRAWS, select_targets, simulate_campaign
+from src.analysis.cohorts import CohortMatrices, build_cohorts, cohorts_path, load_cohorts
+from src.analysis.customer_index import CustomerIndex
+from src.analysis.geography import (
+    UNKNOWN_REGION,
+    load_region_rollup,
+    rollup_kpis,
+    rollup_segment_summary,
+    state_summary,
+)
+from src.analysis.products import load_segment_category_mix
+from src.analysis.sketches import KPISketches, load_kpi_sketches
+from src.analysis.summary import compute_kpis, find_churn_col, segment_summary, top_at_risk
 from src.config import settings
-from src.modeling.inference import predict_churn_proba
+from src.etl.processed import load_processed_data, read_data_version
+from src.utils.profiling import (
+    CAPTURE_MODES,
+    RerunProfiler,
+    end_rerun,
+    profile_section,
+    profiling_log_path,
+    start_rerun,
+)
+from src.utils.result_cache import ResultCache, cache_key
+
+# Heavy / optional modules (plotly, the model stack) are imported inside the code paths
+# that need them, so a cold container can paint the KPIs before they are loaded.
+if TYPE_CHECKING:
+    from src.modeling.background import BackgroundScorer, ScoringJob
 
 # ------------------------------------------------------------
 # Paths & constants
@@ -55,6 +84,9 @@ I18N = {
         "reset_filters": "Reset filters",
         "help": "Help",
         "segment": "Customer segment",
+        "state": "Customer state",
+        "by_state": "Revenue and churn by state",
+        "churn_rate_axis": "Churn rate",
         "date_range": "Purchase date range",
         "all": "All",
         "active_filters": "Active filters",
@@ -63,10 +95,14 @@ I18N = {
         "revenue": "Revenue",
         "churn_proxy": "Churn (proxy {window})",
         "coverage": "Coverage",
+        "active_customers_approx": "≈ {n:,} of these customers purchased in the selected range (HyperLogLog estimate)",
+        "spend_p50": "Median spend",
+        "spend_p90": "P90 spend",
         "data_source": "Data source",
-        "tabs": ["Executive", "Segments", "Predict", "Method"],
+        "tabs": ["Executive", "Segments", "Retention", "Predict", "Customer", "Method"],
         "loading": "Loading data and computing KPIs…",
         "badge_demo": "Demo mode",
+        "badge_drift": "Data drift ({status}) vs the churn model's training data: {columns}",
         "demo_note": "You are seeing a sample dataset (cloud-friendly).",
         "exec_bullets": [
             "Revenue is concentrated in a small set of segments.",
@@ -83,6 +119,9 @@ I18N = {
         "seg_dist": "Customers by segment",
         "seg_table": "Segment table",
         "download_seg": "Download segment summary (CSV)",
+        "category_mix": "Category mix by segment (share of item revenue)",
+        "category": "Category",
+        "share": "Share",
         "predict_intro": "This is a risk score (0–100%) to prioritize outreach. It supports decisions; it is not a guarantee.",
         "how_to_use": "How to use it: start with the suggested threshold, then adjust to your team’s capacity.",
         "decision_controls": "Decision controls",
@@ -97,21 +136,58 @@ I18N = {
         "rev_at_risk": "Revenue at risk",
         "uplift": "Projected uplift",
         "rev_at_risk_share": "Revenue at risk share",
+        "clv_at_risk": "Future value at risk",
+        "clv_at_risk_share": "Share of expected 12-month value (CLV) at risk",
+        "clv_note": "Sized with expected 12-month customer value (BG/NBD + Gamma-Gamma). Historical revenue of these customers: {hist}.",
+        "campaign_sim": "Campaign simulator",
+        "campaign_intro": "Targets high-risk customers by expected save (risk × value) and simulates {draws:,} campaign outcomes: each targeted customer churns with their risk and is won back at the win-back rate.",
+        "cost_per_contact": "Cost per contact (R$)",
+        "budget_cap": "Budget cap (R$, 0 = none)",
+        "max_contacts": "Max contacts (0 = all)",
+        "targeted": "Targeted customers",
+        "campaign_cost": "Campaign cost",
+        "retained_revenue": "Retained value (mean)",
+        "campaign_roi": "ROI (mean)",
+        "campaign_ci": "90% interval — retained value: {rev_lo} to {rev_hi}; ROI: {roi_lo} to {roi_hi}. Chance ROI > 0: {p_pos}.",
+        "retained_dist": "Retained value per simulated campaign (R$)",
         "dist_risk": "Risk distribution (%)",
         "top_prioritize": "Priority customers",
         "how_many": "How many customers?",
+        "why_at_risk": "Why is this customer at risk?",
+        "explain_customer": "Customer to explain",
+        "explain_caption": "Baseline risk {bias} + feature contributions = {total}. Bars are percentage points of churn probability.",
+        "contribution": "Contribution (pp)",
         "download_prior": "Download priority customers (CSV)",
         "no_model": "Model artifacts not found or failed to load.",
         "run_train": "Local: run `python -m src.modeling.train_churn_model`",
         "cloud_commit": "Cloud: ensure model artifacts are committed.",
         "insight_threshold": "{pct}% of customers in current filters are above the selected threshold.",
         "insight_capacity": "Tip: If the list is too large, raise the threshold or narrow filters.",
+        "scoring_progress": "Scoring customers… {done} / {total}",
+        "scoring_partial": "Average risk so far: {avg}",
         "help_text": {
             "proxy": "Churn here is a proxy: a customer is labeled churned if they haven’t purchased within a time window (snapshot-based).",
             "interpret": "Use risk to prioritize outreach. It’s a ranking tool, not a guarantee.",
             "export": "Export the priority list and hand it to CRM/marketing for targeted campaigns.",
         },
         "method_title": "Method (portfolio)",
+        "profile_title": "Rerun timings",
+        "profile_log": "Appended to {path}",
+        "profile_capture_help": "Profile the next rerun with this tool and show the report here.",
+        "customer_intro": "Look up a single customer: features, segment, churn risk and order history.",
+        "customer_id": "Customer ID (customer_unique_id)",
+        "customer_not_found": "No customer with that ID.",
+        "churn_risk": "Churn risk",
+        "order_history": "Order history",
+        "retention_intro": "Customers grouped by the month of their first purchase; each cell shows what that cohort did N months later.",
+        "cohort_metric": "Show",
+        "cohort_metrics": ["Retention (%)", "Active customers", "Revenue"],
+        "cohort_month": "First purchase month",
+        "months_since_first": "Months since first purchase",
+        "last_cohorts": "Most recent cohorts",
+        "month1_retention": "Avg. month-1 retention",
+        "no_cohorts": "No orders in the current filters.",
+        "download_cohorts": "Download cohort table (CSV)",
         "method_bullets": [
             "Churn label is a proxy: churn_window = recency_days > window (snapshot-based).",
             "We remove recency_days from model inputs to avoid target leakage.",
@@ -131,6 +207,9 @@ I18N = {
         "reset_filters": "Restablecer filtros",
         "help": "Ayuda",
         "segment": "Segmento de cliente",
+        "state": "Estado del cliente",
+        "by_state": "Ingresos y churn por estado",
+        "churn_rate_axis": "Tasa de churn",
         "date_range": "Rango de fechas de compra",
         "all": "Todos",
         "active_filters": "Filtros activos",
@@ -139,10 +218,14 @@ I18N = {
         "revenue": "Ingresos",
         "churn_proxy": "Churn (proxy {window})",
         "coverage": "Cobertura",
+        "active_customers_approx": "≈ {n:,} de estos clientes compraron en el rango seleccionado (estimación HyperLogLog)",
+        "spend_p50": "Gasto mediano",
+        "spend_p90": "Gasto P90",
         "data_source": "Fuente de datos",
-        "tabs": ["Resumen", "Segmentos", "Predicción", "Método"],
+        "tabs": ["Resumen", "Segmentos", "Retención", "Predicción", "Cliente", "Método"],
         "loading": "Cargando datos y calculando KPIs…",
         "badge_demo": "Modo demo",
+        "badge_drift": "Drift de datos ({status}) vs los datos de entrenamiento del modelo de churn: {columns}",
         "demo_note": "Estás viendo un dataset de muestra (apto para cloud).",
         "exec_bullets": [
             "Los ingresos se concentran en pocos segmentos clave.",
@@ -159,6 +242,9 @@ I18N = {
         "seg_dist": "Clientes por segmento",
         "seg_table": "Tabla por segmento",
         "download_seg": "Descargar resumen de segmentos (CSV)",
+        "category_mix": "Mix de categorías por segmento (share de ingresos por ítem)",
+        "category": "Categoría",
+        "share": "Share",
         "predict_intro": "Esto es un score de riesgo (0–100%) para priorizar acciones. Ayuda a decidir; no es una garantía.",
         "how_to_use": "Cómo usarlo: empieza con el umbral sugerido y ajusta según la capacidad del equipo.",
         "decision_controls": "Controles de decisión",
@@ -173,21 +259,58 @@ I18N = {
         "rev_at_risk": "Ingresos en riesgo",
         "uplift": "Uplift proyectado",
         "rev_at_risk_share": "Share de ingresos en riesgo",
+        "clv_at_risk": "Valor futuro en riesgo",
+        "clv_at_risk_share": "Share del valor esperado a 12 meses (CLV) en riesgo",
+        "clv_note": "Calculado con el valor esperado del cliente a 12 meses (BG/NBD + Gamma-Gamma). Ingresos históricos de estos clientes: {hist}.",
+        "campaign_sim": "Simulador de campaña",
+        "campaign_intro": "Selecciona clientes de alto riesgo por rescate esperado (riesgo × valor) y simula {draws:,} resultados de campaña: cada cliente contactado abandona según su riesgo y se recupera con la tasa de recuperación.",
+        "cost_per_contact": "Costo por contacto (R$)",
+        "budget_cap": "Presupuesto máximo (R$, 0 = sin límite)",
+        "max_contacts": "Máximo de contactos (0 = todos)",
+        "targeted": "Clientes contactados",
+        "campaign_cost": "Costo de la campaña",
+        "retained_revenue": "Valor retenido (media)",
+        "campaign_roi": "ROI (media)",
+        "campaign_ci": "Intervalo del 90% — valor retenido: {rev_lo} a {rev_hi}; ROI: {roi_lo} a {roi_hi}. Probabilidad de ROI > 0: {p_pos}.",
+        "retained_dist": "Valor retenido por campaña simulada (R$)",
         "dist_risk": "Distribución del riesgo (%)",
         "top_prioritize": "Clientes prioritarios",
         "how_many": "¿Cuántos clientes?",
+        "why_at_risk": "¿Por qué este cliente está en riesgo?",
+        "explain_customer": "Cliente a explicar",
+        "explain_caption": "Riesgo base {bias} + contribuciones de las variables = {total}. Las barras son puntos porcentuales de probabilidad de churn.",
+        "contribution": "Contribución (pp)",
         "download_prior": "Descargar clientes priorizados (CSV)",
         "no_model": "No se encuentran los artefactos del modelo o falló la carga.",
         "run_train": "Local: ejecuta `python -m src.modeling.train_churn_model`",
         "cloud_commit": "Cloud: asegúrate de haber commiteado los artefactos del modelo.",
         "insight_threshold": "El {pct}% de los clientes filtrados está por encima del umbral seleccionado.",
         "insight_capacity": "Tip: si la lista es enorme, sube el umbral o acota filtros.",
+        "scoring_progress": "Calculando riesgo… {done} / {total}",
+        "scoring_partial": "Riesgo medio hasta ahora: {avg}",
         "help_text": {
             "proxy": "El churn aquí es un proxy: se etiqueta churn si no compra dentro de una ventana (snapshot).",
             "interpret": "El riesgo sirve para priorizar. Es un ranking, no una garantía.",
             "export": "Exporta la lista priorizada y úsala en CRM/marketing para campañas dirigidas.",
         },
         "method_title": "Método (portfolio)",
+        "profile_title": "Tiempos del rerun",
+        "profile_log": "Añadido a {path}",
+        "profile_capture_help": "Perfila el siguiente rerun con esta herramienta y muestra el informe aquí.",
+        "customer_intro": "Consulta un cliente: variables, segmento, riesgo de churn e historial de pedidos.",
+        "customer_id": "ID de cliente (customer_unique_id)",
+        "customer_not_found": "No hay ningún cliente con ese ID.",
+        "churn_risk": "Riesgo de churn",
+        "order_history": "Historial de pedidos",
+        "retention_intro": "Clientes agrupados por el mes de su primera compra; cada celda muestra qué hizo esa cohorte N meses después.",
+        "cohort_metric": "Mostrar",
+        "cohort_metrics": ["Retención (%)", "Clientes activos", "Ingresos"],
+        "cohort_month": "Mes de primera compra",
+        "months_since_first": "Meses desde la primera compra",
+        "last_cohorts": "Cohortes más recientes",
+        "month1_retention": "Retención media al mes 1",
+        "no_cohorts": "No hay pedidos con los filtros actuales.",
+        "download_cohorts": "Descargar tabla de cohortes (CSV)",
         "method_bullets": [
             "El churn es un proxy: churn_window = recency_days > window (snapshot).",
             "Quitamos recency_days del modelo para evitar leakage.",
@@ -256,16 +379,6 @@ def pct(x: float, decimals: int = 1) -> str:
     except Exception:
         return "—"
 
-def last_updated(path: Path) -> str:
-    ts = path.stat().st_mtime
-    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
-
-def parse_datetime_cols(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    for c in cols:
-        if c in df.columns:
-            df[c] = pd.to_datetime(df[c], errors="coerce")
-    return df
-
 def render_branding() -> None:
     if BANNER_SVG.exists():
         st.markdown('<div class="brand-banner">', unsafe_allow_html=True)
@@ -303,62 +416,171 @@ def clamp_date_range(min_date, max_date):
 # -----------------------------
 # Data loading
 # -----------------------------
-@st.cache_data
-def load_data() -> tuple[pd.DataFrame, pd.DataFrame, str, bool]:
-    seg_path = PROCESSED_DIR / "customer_segments.csv"
-    tx_path = PROCESSED_DIR / "transactions.csv"
-
-    demo_seg_path = ROOT / "data" / "demo" / "customer_segments_demo.csv"
-    demo_tx_path = ROOT / "data" / "demo" / "transactions_demo.csv"
-
-    demo_mode = False
-    if seg_path.exists() and tx_path.exists():
-        segments = pd.read_csv(seg_path)
-        tx = pd.read_csv(tx_path)
-        source = f"processed (local) · updated {last_updated(seg_path)}"
-    elif demo_seg_path.exists() and demo_tx_path.exists():
-        segments = pd.read_csv(demo_seg_path)
-        tx = pd.read_csv(demo_tx_path)
-        source = f"demo sample (cloud) · updated {last_updated(demo_seg_path)}"
-        demo_mode = True
-    else:
-        st.error(
-            "No data found.\n\n"
-            "Local: run `python main.py` to generate `data/processed/*.csv`\n"
-            "Cloud: commit `data/demo/*.csv` so the app can load sample data."
-        )
+@st.cache_data(max_entries=2)
+def load_data(data_version: str) -> tuple[pd.DataFrame, pd.DataFrame, str, bool]:
+    # `data_version` changes whenever the pipeline rewrites data/processed (see
+    # src.pipeline.watch), so running dashboards reload on their next rerun.
+    try:
+        return load_processed_data()
+    except (FileNotFoundError, ValueError) as e:
+        st.error(str(e))
         st.stop()
 
-    # Parse datetimes (pro hygiene)
-    tx = parse_datetime_cols(
-        tx,
-        [
-            "order_purchase_timestamp",
-            "order_approved_at",
-            "order_delivered_carrier_date",
-            "order_delivered_customer_date",
-            "order_estimated_delivery_date",
-        ],
+@st.cache_resource(max_entries=2)
+def get_customer_index(data_source: str, _segments: pd.DataFrame, _tx: pd.DataFrame) -> CustomerIndex:
+    # Keyed on the data source string only; the frames themselves are not hashed.
+    return CustomerIndex(_segments, _tx)
+
+@st.cache_data(max_entries=32)
+def get_cohorts(data_source: str, segment_key: str | None, date_key: tuple | None, _tx: pd.DataFrame) -> CohortMatrices:
+    # The unfiltered view comes from the artifact written by `python main.py`; filtered
+    # views are recomputed (a few array passes) and cached per filter state.
+    if segment_key is None and date_key is None:
+        path = cohorts_path()
+        if path.exists() and not data_source.startswith("demo"):
+            cohorts = load_cohorts(path)
+            if cohorts is not None:
+                return cohorts
+    return build_cohorts(_tx)
+
+@st.cache_data
+def get_segment_category_mix(data_source: str) -> pd.DataFrame | None:
+    # Written by `python main.py`; not part of the demo sample.
+    return None if data_source.startswith("demo") else load_segment_category_mix()
+
+@st.cache_resource(max_entries=2)
+def get_kpi_sketches(data_source: str) -> KPISketches | None:
+    # Segment × day KPI cells written by `python main.py`; filters are answered by merging cells.
+    return None if data_source.startswith("demo") else load_kpi_sketches()
+
+@st.cache_data
+def get_region_rollup(data_source: str) -> pd.DataFrame | None:
+    # State × city × segment totals written by `python main.py`; region filters sum its rows.
+    return None if data_source.startswith("demo") else load_region_rollup()
+
+# -----------------------------
+# Result cache
+# -----------------------------
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    # Shared by every session in this process; DASHBOARD_CACHE_DIR adds a tier shared by worker processes.
+    disk_dir = settings.dashboard_cache_dir
+    return ResultCache(
+        max_bytes=settings.dashboard_cache_mb * 1024**2,
+        disk_dir=ROOT / disk_dir if disk_dir else None,
     )
-    segments = parse_datetime_cols(segments, ["last_purchase"])
 
-    # Ensure churn dtype is clean if it comes as 0/1 in some environments
-    if "churn_180d" in segments.columns:
-        if segments["churn_180d"].dtype != bool:
-            segments["churn_180d"] = segments["churn_180d"].astype(bool)
+def cached(namespace: str, key: tuple, compute):
+    # Derived results (filtered views, summaries, figures, simulations) keyed by everything they depend on.
+    return get_result_cache().get_or_compute(cache_key(namespace, *key), compute)
 
-    required_seg_cols = {"customer_unique_id", "segment_name", "monetary_total"}
-    required_tx_cols = {"order_id", "order_purchase_timestamp"}
-    if not required_seg_cols.issubset(set(segments.columns)):
-        st.error(f"Segments missing columns: {sorted(required_seg_cols - set(segments.columns))}")
-        st.stop()
-    if not required_tx_cols.issubset(set(tx.columns)):
-        st.error(f"Transactions missing columns: {sorted(required_tx_cols - set(tx.columns))}")
-        st.stop()
+# -----------------------------
+# Background scoring
+# -----------------------------
+@st.cache_resource
+def get_background_scorer() -> BackgroundScorer:
+    from src.modeling.background import BackgroundScorer
+
+    # Shared by every session in this process, so finished scores are reused across them.
+    return BackgroundScorer()
+
+def submit_scoring(segments_filtered: pd.DataFrame, segment_key: str | None, data_source: str) -> ScoringJob:
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    from src.modeling.inference import model_version
+
+    key = (data_source, segment_key, model_version())
+    return get_background_scorer().submit(key, segments_filtered, st.session_state.session_id)
+
+def render_drift_badge(t: dict) -> None:
+    # Written by the pipeline (see src.modeling.monitoring); only meaningful for the model it checked.
+    from src.modeling.monitoring import load_drift_report
 
-    return segments, tx, source, demo_mode
+    report = load_drift_report()
+    if report is None or report["status"] == "ok":
+        return
+    from src.modeling.inference import model_version
+
+    try:
+        if report["model_version"] != model_version():
+            return
+    except FileNotFoundError:
+        return
+    columns = ", ".join(c["column"] for c in report["columns"] if c["status"] != "ok")
+    st.markdown(
+        f'<span class="badge">⚠️ {t["badge_drift"].format(status=report["status"], columns=columns)}</span>',
+        unsafe_allow_html=True,
+    )
+
+def wait_for_scoring(job: ScoringJob, t: dict) -> pd.Series:
+    # Polling through st.* calls lets Streamlit interrupt this loop as soon as a widget changes;
+    # the superseded job is then cancelled by the next submit.
+    if not job.done:
+        bar = st.progress(0.0)
+        preview = st.empty()
+        while not job.done:
+            bar.progress(
+                job.progress,
+                text=t["scoring_progress"].format(done=f"{job.scored:,}", total=f"{job.total:,}"),
+            )
+            partial = job.partial()
+            if not partial.empty:
+                preview.caption(t["scoring_partial"].format(avg=pct(partial.mean() * 100, 1)))
+            time.sleep(0.2)
+        bar.empty()
+        preview.empty()
+
+    scores = job.result()
+    if scores is None:
+        # Cancelled underneath us (superseded filter state): start over with the current one.
+        st.rerun()
+    return scores
+
+# -----------------------------
+# Profiling (opt-in)
+# -----------------------------
+def start_profiling() -> RerunProfiler | None:
+    # ?profile=1 (or DASHBOARD_PROFILE=1) times each section; "cprofile"/"pyinstrument"
+    # capture every rerun. The sidebar buttons capture just the next one.
+    mode = str(st.query_params.get("profile", settings.dashboard_profile)).strip().lower()
+    if mode in ("", "0", "false", "off"):
+        return None
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    capture = st.session_state.pop("profile_capture", None) or (mode if mode in CAPTURE_MODES else None)
+    return start_rerun(session=st.session_state.session_id[:8], capture=capture)
+
+def render_profile(profiler: RerunProfiler) -> None:
+    t = I18N[st.session_state.get("lang", "es")]
+    record = profiler.finish(context={"query": dict(st.query_params)})
+
+    with st.sidebar.expander(f"⏱️ {t['profile_title']} · {record['total_ms']:,.0f} ms", expanded=False):
+        timings = pd.DataFrame(record["sections"], columns=["name", "ms"])
+        st.dataframe(timings.sort_values("ms", ascending=False), width="stretch", hide_index=True)
+        st.caption(t["profile_log"].format(path=profiling_log_path()))
+
+        c1, c2 = st.columns(2, gap="small")
+        for col, capture in zip((c1, c2), CAPTURE_MODES):
+            col.button(
+                capture,
+                key=f"profile_{capture}",
+                help=t["profile_capture_help"],
+                on_click=lambda c=capture: st.session_state.update(profile_capture=c),
+            )
+        if record.get("capture"):
+            st.caption(record["capture"])
+            st.code(record["capture_text"][:6000], language="text")
 
 def main() -> None:
+    profiler = start_profiling()
+    try:
+        render_dashboard()
+    finally:
+        if profiler is not None:
+            render_profile(profiler)
+            end_rerun()
+
+def render_dashboard() -> None:
     apply_css()
     render_branding()
 
@@ -395,15 +617,19 @@ def main() -> None:
         unsafe_allow_html=True,
     )
 
-    with st.spinner(t["loading"]):
-        segments, tx, data_source, demo_mode = load_data()
+    with st.spinner(t["loading"]), profile_section("load_data"):
+        data_version = read_data_version()
+        segments, tx, data_source, demo_mode = load_data(data_version)
+    # Cache key for everything derived from this load: the source label plus the data version.
+    data_key = f"{data_source} #{data_version}"
 
     if demo_mode:
         st.markdown(f'<span class="badge">🧪 {t["badge_demo"]}</span>', unsafe_allow_html=True)
         st.caption(t["demo_note"])
+    else:
+        render_drift_badge(t)
 
-    churn_cols = [c for c in segments.columns if c.startswith("churn_")]
-    churn_col = churn_cols[0] if churn_cols else None
+    churn_col = find_churn_col(segments)
 
     min_date = tx["order_purchase_timestamp"].min()
     max_date = tx["order_purchase_timestamp"].max()
@@ -413,6 +639,13 @@ def main() -> None:
     segment_options = [t["all"]] + sorted(segments["segment_name"].dropna().unique().tolist())
     selected_segment = st.sidebar.selectbox(t["segment"], segment_options)
 
+    region_rollup = get_region_rollup(data_key) if "customer_state" in segments.columns else None
+    selected_state = t["all"]
+    if region_rollup is not None:
+        state_options = [t["all"]] + sorted(region_rollup["customer_state"].unique().tolist())
+        selected_state = st.sidebar.selectbox(t["state"], state_options)
+    states = None if selected_state == t["all"] else [selected_state]
+
     date_range = None
     minmax = clamp_date_range(min_date, max_date)
     if minmax:
@@ -423,41 +656,73 @@ def main() -> None:
             max_value=minmax[1],
         )
 
-    if selected_segment != t["all"]:
-        segments_filtered = segments[segments["segment_name"] == selected_segment].copy()
-    else:
-        segments_filtered = segments.copy()
-
-    tx_filtered = tx.copy()
-    if date_range:
-        tx_filtered = tx_filtered[
-            (tx_filtered["order_purchase_timestamp"].dt.date >= date_range[0])
-            & (tx_filtered["order_purchase_timestamp"].dt.date <= date_range[1])
-        ].copy()
-
-    seg_label = selected_segment
+    # Identifies the customer subset for the per-filter caches (cohorts, scoring, results).
+    segment_key = None if selected_segment == t["all"] else selected_segment
+    if states:
+        segment_key = f"{segment_key or t['all']} · {selected_state}"
+    date_key = None if not date_range or tuple(date_range) == minmax else tuple(date_range)
+    view_key = (data_key, segment_key, date_key)
+    lang = st.session_state.lang
+
+    def filter_positions() -> tuple[np.ndarray, np.ndarray | None]:
+        mask = np.ones(len(segments), dtype=bool)
+        if selected_segment != t["all"]:
+            mask &= (segments["segment_name"] == selected_segment).to_numpy()
+        if states:
+            # Categorical column: compares integer codes, not strings.
+            state_col = segments["customer_state"]
+            in_state = state_col.isna() if selected_state == UNKNOWN_REGION else state_col == selected_state
+            mask &= in_state.to_numpy()
+        tx_positions = None
+        if date_key:
+            dates = tx["order_purchase_timestamp"].dt.date
+            tx_positions = np.flatnonzero(((dates >= date_key[0]) & (dates <= date_key[1])).to_numpy())
+        return np.flatnonzero(mask), tx_positions
+
+    with profile_section("filters"):
+        segment_positions, tx_positions = cached("filters", view_key, filter_positions)
+        segments_filtered = segments.take(segment_positions)
+        tx_filtered = tx if tx_positions is None else tx.take(tx_positions)
+
+    seg_label = selected_segment if not states else f"{selected_segment} · {t['state']}: {selected_state}"
     date_label = f"{date_range[0]} → {date_range[1]}" if date_range else "—"
     st.markdown(
         f'<span class="badge">🎛️ <b>{t["active_filters"]}:</b> {t["segment"]}: {seg_label} · {t["date_range"]}: {date_label}</span>',
         unsafe_allow_html=True,
     )
 
-    total_customers = int(segments_filtered.shape[0])
-    total_orders = int(tx_filtered["order_id"].nunique())
-    total_revenue = float(segments_filtered["monetary_total"].sum())
+    sketches = get_kpi_sketches(data_key)
+    def filtered_kpis() -> dict:
+        kpis = compute_kpis(
+            segments_filtered,
+            tx_filtered,
+            churn_col,
+            sketches=sketches,
+            start=date_range[0] if date_range else None,
+            end=date_range[1] if date_range else None,
+        )
+        if states:
+            # Customer-level totals for the region straight from the rollup; the sketch
+            # cells are per segment only, so the active-customer estimate does not apply.
+            segment = None if selected_segment == t["all"] else selected_segment
+            kpis.update(rollup_kpis(region_rollup, states, segment, churn_col is not None))
+            kpis.pop("active_customers_approx", None)
+        return kpis
+
+    with profile_section("kpis"):
+        kpis = cached("kpis", view_key, filtered_kpis)
 
     churn_label = t["churn_proxy"].format(window="—")
     churn_value = "N/A"
     if churn_col:
         churn_window = churn_col.replace("churn_", "")
         churn_label = t["churn_proxy"].format(window=churn_window)
-        churn_rate = float(segments_filtered[churn_col].mean() * 100)
-        churn_value = pct(churn_rate, 1)
+        churn_value = pct(kpis["churn_rate"], 1)
 
     k1, k2, k3, k4 = st.columns(4, gap="small")
-    k1.metric(t["customers"], f"{total_customers:,}")
-    k2.metric(t["orders"], f"{total_orders:,}")
-    k3.metric(t["revenue"], brl(total_revenue))
+    k1.metric(t["customers"], f"{kpis['total_customers']:,}")
+    k2.metric(t["orders"], f"{kpis['total_orders']:,}")
+    k3.metric(t["revenue"], brl(kpis["total_revenue"]))
     k4.metric(churn_label, churn_value)
 
     if pd.notna(min_date) and pd.notna(max_date):
@@ -467,12 +732,17 @@ def main() -> None:
         )
     else:
         st.caption(f"{t['data_source']}: {data_source}")
+    if "active_customers_approx" in kpis:
+        st.caption(t["active_customers_approx"].format(n=kpis["active_customers_approx"]))
 
     st.divider()
 
-    tab1, tab2, tab3, tab4 = st.tabs(t["tabs"])
+    # Imported here rather than at module level: the KPI header above renders without it.
+    import plotly.express as px
+
+    tab1, tab2, tab_ret, tab3, tab4, tab5 = st.tabs(t["tabs"])
 
-    with tab1:
+    with tab1, profile_section("executive"):
         st.markdown("\n".join([f"- {b}" for b in t["exec_bullets"]]))
 
         cA, cB, cC = st.columns(3, gap="small")
@@ -486,62 +756,63 @@ def main() -> None:
         st.markdown('<div class="section"></div>', unsafe_allow_html=True)
 
         st.subheader(t["rev_by_seg"])
-        rev_by_seg = segments_filtered.groupby("segment_name")["monetary_total"].sum().sort_values(ascending=False)
 
-        max_bars = 10
-        if len(rev_by_seg) > max_bars:
-            top = rev_by_seg.head(max_bars)
-            others = pd.Series({"Others": float(rev_by_seg.iloc[max_bars:].sum())})
-            rev_plot = pd.concat([top, others])
-        else:
-            rev_plot = rev_by_seg
+        def revenue_by_segment_figure():
+            rev_by_seg = segments_filtered.groupby("segment_name")["monetary_total"].sum().sort_values(ascending=False)
+
+            max_bars = 10
+            if len(rev_by_seg) > max_bars:
+                top = rev_by_seg.head(max_bars)
+                others = pd.Series({"Others": float(rev_by_seg.iloc[max_bars:].sum())})
+                rev_plot = pd.concat([top, others])
+            else:
+                rev_plot = rev_by_seg
+
+            fig = px.bar(
+                rev_plot.reset_index().rename(columns={"index": "segment_name"}),
+                x="segment_name",
+                y="monetary_total",
+                labels={"segment_name": "Segment", "monetary_total": f"{t['revenue']} ({CURRENCY_SYMBOL})"},
+            )
+            fig.update_layout(xaxis_tickangle=-25, margin=dict(t=10, l=10, r=10, b=10))
+            fig.update_yaxes(tickprefix=f"{CURRENCY_SYMBOL} ", tickformat=",.0f")
+            return fig
 
-        fig = px.bar(
-            rev_plot.reset_index().rename(columns={"index": "segment_name"}),
-            x="segment_name",
-            y="monetary_total",
-            labels={"segment_name": "Segment", "monetary_total": f"{t['revenue']} ({CURRENCY_SYMBOL})"},
-        )
-        fig.update_layout(xaxis_tickangle=-25, margin=dict(t=10, l=10, r=10, b=10))
-        fig.update_yaxes(tickprefix=f"{CURRENCY_SYMBOL} ", tickformat=",.0f")
-        st.plotly_chart(fig, width="stretch")
+        with profile_section("plotly"):
+            fig = cached("fig_revenue_by_segment", (data_key, segment_key, lang), revenue_by_segment_figure)
+            st.plotly_chart(fig, width="stretch")
 
-    with tab2:
+    with tab2, profile_section("segments"):
         st.subheader(t["seg_dist"])
-        seg_counts = segments_filtered["segment_name"].value_counts().reset_index()
-        seg_counts.columns = ["segment_name", "customers"]
-
-        fig = px.bar(
-            seg_counts,
-            x="segment_name",
-            y="customers",
-            labels={"segment_name": "Segment", "customers": t["customers"]},
-        )
-        fig.update_layout(xaxis_tickangle=-25, margin=dict(t=10, l=10, r=10, b=10))
-        fig.update_yaxes(tickformat=",.0f")
-        st.plotly_chart(fig, width="stretch")
+
+        def segment_counts_figure():
+            seg_counts = segments_filtered["segment_name"].value_counts().reset_index()
+            seg_counts.columns = ["segment_name", "customers"]
+            fig = px.bar(
+                seg_counts,
+                x="segment_name",
+                y="customers",
+                labels={"segment_name": "Segment", "customers": t["customers"]},
+            )
+            fig.update_layout(xaxis_tickangle=-25, margin=dict(t=10, l=10, r=10, b=10))
+            fig.update_yaxes(tickformat=",.0f")
+            return fig
+
+        with profile_section("plotly"):
+            fig = cached("fig_segment_counts", (data_key, segment_key, lang), segment_counts_figure)
+            st.plotly_chart(fig, width="stretch")
 
         st.markdown('<div class="section"></div>', unsafe_allow_html=True)
         st.subheader(t["seg_table"])
 
-        if churn_col:
-            summary = (
-                segments_filtered.groupby("segment_name")
-                .agg(
-                    customers=("customer_unique_id", "count"),
-                    revenue=("monetary_total", "sum"),
-                    churn_rate=(churn_col, "mean"),
-                )
-                .sort_values("revenue", ascending=False)
-            )
-            summary["churn_risk_%"] = (summary["churn_rate"] * 100).round(1)
-            summary = summary.drop(columns=["churn_rate"])
-        else:
-            summary = (
-                segments_filtered.groupby("segment_name")
-                .agg(customers=("customer_unique_id", "count"), revenue=("monetary_total", "sum"))
-                .sort_values("revenue", ascending=False)
-            )
+        def filtered_segment_summary() -> pd.DataFrame:
+            if states:
+                segment = None if selected_segment == t["all"] else selected_segment
+                return rollup_segment_summary(region_rollup, states, segment, churn_col is not None)
+            return segment_summary(segments_filtered, churn_col)
+
+        with profile_section("segment_summary"):
+            summary = cached("segment_summary", (data_key, segment_key), filtered_segment_summary)
 
         display = summary.reset_index().rename(columns={"segment_name": "segment"}).copy()
         cols = ["segment", "customers", "revenue"] + (["churn_risk_%"] if "churn_risk_%" in display.columns else [])
@@ -549,23 +820,157 @@ def main() -> None:
         display["revenue"] = display["revenue"].map(brl)
         if "churn_risk_%" in display.columns:
             display["churn_risk_%"] = display["churn_risk_%"].map(lambda x: pct(x, 1))
+        if sketches is not None and "monetary_total" in sketches.quantile_sketches and not states:
+            spend = [sketches.quantiles("monetary_total", [0.5, 0.9], [s]) for s in display["segment"]]
+            display[t["spend_p50"]] = [brl(q[0]) if q[0] is not None else "—" for q in spend]
+            display[t["spend_p90"]] = [brl(q[1]) if q[1] is not None else "—" for q in spend]
 
         st.dataframe(display, width="stretch", hide_index=True)
+        with profile_section("csv"):
+            summary_csv = summary.reset_index().to_csv(index=False).encode("utf-8")
         st.download_button(
             t["download_seg"],
-            data=summary.reset_index().to_csv(index=False).encode("utf-8"),
+            data=summary_csv,
             file_name="segment_summary.csv",
             mime="text/csv",
         )
 
-    with tab3:
+        if region_rollup is not None:
+            st.markdown('<div class="section"></div>', unsafe_allow_html=True)
+            st.subheader(t["by_state"])
+
+            def by_state_figure():
+                by_state = state_summary(region_rollup, None if selected_segment == t["all"] else selected_segment)
+                fig = px.bar(
+                    by_state.reset_index(),
+                    x="customer_state",
+                    y="revenue",
+                    color="churn_rate" if churn_col else None,
+                    color_continuous_scale="Reds",
+                    labels={
+                        "customer_state": t["state"],
+                        "revenue": f"{t['revenue']} ({CURRENCY_SYMBOL})",
+                        "churn_rate": t["churn_rate_axis"],
+                    },
+                )
+                fig.update_layout(margin=dict(t=10, l=10, r=10, b=10))
+                fig.update_yaxes(tickprefix=f"{CURRENCY_SYMBOL} ", tickformat=",.0f")
+                return fig
+
+            with profile_section("plotly"):
+                fig = cached("fig_by_state", (data_key, segment_key, lang), by_state_figure)
+                st.plotly_chart(fig, width="stretch")
+
+        mix = get_segment_category_mix(data_key)
+        if mix is not None and not mix.empty:
+            st.markdown('<div class="section"></div>', unsafe_allow_html=True)
+            st.subheader(t["category_mix"])
+
+            def category_mix_figure():
+                seg_mix = mix
+                if selected_segment != t["all"]:
+                    seg_mix = seg_mix[seg_mix["segment_name"] == selected_segment]
+
+                # Keep the legend readable: top categories overall, the rest folded into "other".
+                top_categories = seg_mix.groupby("category")["revenue"].sum().nlargest(10).index
+                seg_mix = seg_mix.assign(
+                    category=seg_mix["category"].where(seg_mix["category"].isin(top_categories), "other")
+                )
+                seg_mix = seg_mix.groupby(["segment_name", "category"], as_index=False)["share"].sum()
+
+                fig = px.bar(
+                    seg_mix,
+                    x="share",
+                    y="segment_name",
+                    color="category",
+                    orientation="h",
+                    labels={"segment_name": "Segment", "share": t["share"], "category": t["category"]},
+                )
+                fig.update_layout(barmode="stack", margin=dict(t=10, l=10, r=10, b=10))
+                fig.update_xaxes(tickformat=".0%")
+                return fig
+
+            with profile_section("plotly"):
+                fig = cached("fig_category_mix", (data_key, selected_segment, lang), category_mix_figure)
+                st.plotly_chart(fig, width="stretch")
+
+    with tab_ret, profile_section("retention"):
         st.subheader(t["tabs"][2])
+        st.write(t["retention_intro"])
+
+        if segment_key is not None:
+            tx_cohort = tx_filtered[tx_filtered["customer_unique_id"].isin(segments_filtered["customer_unique_id"])]
+        else:
+            tx_cohort = tx_filtered
+        with profile_section("cohorts"):
+            cohorts = get_cohorts(data_key, segment_key, date_key, tx_cohort)
+
+        if len(cohorts.cohorts) == 0:
+            st.info(t["no_cohorts"])
+        else:
+            n_total = len(cohorts.cohorts)
+            c1, c2 = st.columns([2, 1], gap="small")
+            with c1:
+                metric = st.radio(t["cohort_metric"], t["cohort_metrics"], horizontal=True)
+            with c2:
+                n_cohorts = st.slider(t["last_cohorts"], 1, n_total, min(24, n_total)) if n_total > 1 else n_total
+
+            retention = cohorts.retention()
+            k1, k2 = st.columns(2, gap="small")
+            k1.metric(t["customers"], f"{int(cohorts.sizes[-n_cohorts:].sum()):,}")
+            if retention.shape[1] > 1:
+                k2.metric(t["month1_retention"], pct(float(retention.iloc[-n_cohorts:, 1].mean()) * 100, 1))
+
+            metric_idx = t["cohort_metrics"].index(metric)
+
+            def cohort_heatmap():
+                if metric_idx == 0:
+                    matrix, text_fmt, z_label = retention * 100, ".0f", "%"
+                elif metric_idx == 1:
+                    matrix, text_fmt, z_label = cohorts.active_customers(), ",.0f", t["customers"]
+                else:
+                    matrix, text_fmt, z_label = cohorts.revenue_matrix(), ",.0f", CURRENCY_SYMBOL
+                matrix = matrix.iloc[-n_cohorts:].dropna(axis=1, how="all")
+
+                fig = px.imshow(
+                    matrix,
+                    text_auto=text_fmt,
+                    aspect="auto",
+                    color_continuous_scale="Blues",
+                    labels={"x": t["months_since_first"], "y": t["cohort_month"], "color": z_label},
+                )
+                fig.update_layout(margin=dict(t=10, l=10, r=10, b=10))
+                fig.update_xaxes(side="top", dtick=1)
+                return fig
+
+            with profile_section("plotly"):
+                fig = cached("fig_cohorts", (view_key, metric_idx, n_cohorts, lang), cohort_heatmap)
+                st.plotly_chart(fig, width="stretch")
+
+            with profile_section("csv"):
+                cohorts_csv = cohorts.to_long().to_csv(index=False).encode("utf-8")
+            st.download_button(
+                t["download_cohorts"],
+                data=cohorts_csv,
+                file_name="cohort_retention.csv",
+                mime="text/csv",
+            )
+
+    with tab3, profile_section("predict"):
+        st.subheader(t["tabs"][3])
         st.write(t["predict_intro"])
         st.caption(t["how_to_use"])
 
         try:
+            from src.modeling.inference import model_version
+
+            job = submit_scoring(segments_filtered, segment_key, data_key)
+            # Everything below depends on the customer subset and the model that scored it.
+            score_key = (data_key, segment_key, model_version())
+
             segments_scored = segments_filtered.copy()
-            segments_scored["churn_probability"] = predict_churn_proba(segments_scored)
+            with profile_section("scoring"):
+                segments_scored["churn_probability"] = wait_for_scoring(job, t)
             segments_scored["churn_probability_%"] = (segments_scored["churn_probability"] * 100).clip(0, 100)
 
             suggested = compute_suggested_threshold(segments_scored["churn_probability_%"])
@@ -606,8 +1011,11 @@ def main() -> None:
             high_risk_customers = int(high_risk.shape[0])
             pct_above = (high_risk_customers / total_customers_scored * 100) if total_customers_scored else 0.0
 
-            total_revenue_scored = float(segments_scored["monetary_total"].sum())
-            revenue_at_risk = float(high_risk["monetary_total"].sum())
+            # Prefer expected future value (CLV) over historical revenue when it has been fitted.
+            has_clv = "clv" in segments_scored.columns and segments_scored["clv"].notna().any()
+            value_col = "clv" if has_clv else "monetary_total"
+            total_revenue_scored = float(segments_scored[value_col].sum())
+            revenue_at_risk = float(high_risk[value_col].sum())
             revenue_at_risk_share = (revenue_at_risk / total_revenue_scored * 100) if total_revenue_scored else 0.0
             projected_uplift = revenue_at_risk * (uplift_rate / 100)
             avg_risk = float(segments_scored["churn_probability_%"].mean())
@@ -621,7 +1029,7 @@ def main() -> None:
 
             with k3:
                 st.markdown('<div class="emph-risk">', unsafe_allow_html=True)
-                st.metric(f"⚠️ {t['rev_at_risk']}", brl(revenue_at_risk))
+                st.metric(f"⚠️ {t['clv_at_risk'] if has_clv else t['rev_at_risk']}", brl(revenue_at_risk))
                 st.markdown("</div>", unsafe_allow_html=True)
 
             with k4:
@@ -629,42 +1037,111 @@ def main() -> None:
                 st.metric(f"⬆️ {t['uplift']}", brl(projected_uplift))
                 st.markdown("</div>", unsafe_allow_html=True)
 
-            st.caption(f"{t['rev_at_risk_share']}: **{revenue_at_risk_share:.1f}%**")
+            share_label = t["clv_at_risk_share"] if has_clv else t["rev_at_risk_share"]
+            st.caption(f"{share_label}: **{revenue_at_risk_share:.1f}%**")
+            if has_clv:
+                st.caption(t["clv_note"].format(hist=brl(float(high_risk["monetary_total"].sum()))))
+
+            st.markdown('<div class="section"></div>', unsafe_allow_html=True)
+            st.markdown(f"### {t['campaign_sim']}")
+            st.caption(t["campaign_intro"].format(draws=DEFAULT_DRAWS))
+
+            cC, cD, cE = st.columns(3, gap="small")
+            cost_per_contact = cC.number_input(t["cost_per_contact"], min_value=0.0, value=5.0, step=1.0)
+            budget_cap = cD.number_input(t["budget_cap"], min_value=0.0, value=0.0, step=500.0)
+            max_contacts = cE.number_input(t["max_contacts"], min_value=0, value=0, step=100)
+
+            def run_campaign():
+                targets = select_targets(
+                    segments_scored,
+                    value_col,
+                    threshold / 100,
+                    top_n=int(max_contacts) or None,
+                    budget=budget_cap or None,
+                    cost_per_contact=cost_per_contact,
+                )
+                return simulate_campaign(
+                    targets["churn_probability"].to_numpy(),
+                    targets[value_col].to_numpy(),
+                    uplift_rate / 100,
+                    cost_per_contact=cost_per_contact,
+                    seed=settings.random_seed,
+                )
+
+            campaign_key = (*score_key, threshold, uplift_rate, cost_per_contact, budget_cap, max_contacts)
+            with profile_section("campaign"):
+                simulation = cached("campaign", campaign_key, run_campaign)
+            campaign = simulation.summary()
+
+            m1, m2, m3, m4 = st.columns(4, gap="small")
+            m1.metric(t["targeted"], f"{campaign['n_targeted']:,}")
+            m2.metric(t["campaign_cost"], brl(campaign["cost"]))
+            m3.metric(t["retained_revenue"], brl(campaign["retained_mean"]))
+            m4.metric(t["campaign_roi"], pct(campaign["roi_mean"] * 100, 0) if campaign["cost"] else "—")
+            if campaign["cost"] and campaign["n_targeted"]:
+                (rev_lo, rev_hi), (roi_lo, roi_hi) = campaign["retained_ci"], campaign["roi_ci"]
+                st.caption(
+                    t["campaign_ci"].format(
+                        rev_lo=brl(rev_lo),
+                        rev_hi=brl(rev_hi),
+                        roi_lo=pct(roi_lo * 100, 0),
+                        roi_hi=pct(roi_hi * 100, 0),
+                        p_pos=pct(campaign["p_positive_roi"] * 100, 0),
+                    )
+                )
+            if campaign["n_targeted"]:
+
+                def retained_figure():
+                    fig = px.histogram(x=simulation.retained, nbins=40, labels={"x": t["retained_dist"]})
+                    fig.update_layout(margin=dict(t=10, l=10, r=10, b=10), height=260, yaxis_title=None)
+                    return fig
+
+                with profile_section("plotly"):
+                    fig = cached("fig_campaign", (*campaign_key, lang), retained_figure)
+                    st.plotly_chart(fig, width="stretch")
 
             st.markdown('<div class="section"></div>', unsafe_allow_html=True)
             st.subheader(t["dist_risk"])
 
-            fig = px.histogram(
-                segments_scored,
-                x="churn_probability_%",
-                nbins=20,
-                labels={"churn_probability_%": "Churn risk (%)"},
-            )
-            fig.update_layout(margin=dict(t=10, l=10, r=10, b=10))
-            fig.update_xaxes(tickformat=".0f")
-            st.plotly_chart(fig, width="stretch")
+            def risk_histogram():
+                fig = px.histogram(
+                    segments_scored,
+                    x="churn_probability_%",
+                    nbins=20,
+                    labels={"churn_probability_%": "Churn risk (%)"},
+                )
+                fig.update_layout(margin=dict(t=10, l=10, r=10, b=10))
+                fig.update_xaxes(tickformat=".0f")
+                return fig
+
+            with profile_section("plotly"):
+                fig = cached("fig_risk", score_key, risk_histogram)
+                st.plotly_chart(fig, width="stretch")
 
             st.markdown('<div class="section"></div>', unsafe_allow_html=True)
             st.subheader(t["top_prioritize"])
 
             top_n = st.slider(t["how_many"], 10, 300, 50, step=10)
 
-            display_cols = [
-                "customer_unique_id",
-                "segment_name",
-                "churn_probability_%",
-                "monetary_total",
-                "avg_order_value",
-                "avg_delivery_days",
-                "avg_review_score",
-            ]
-            available_cols = [c for c in display_cols if c in segments_scored.columns]
+            def explained_top() -> tuple[pd.DataFrame, tuple[float, pd.DataFrame] | None]:
+                top = top_at_risk(segments_scored, top_n)
+                try:
+                    from src.modeling.explain import explain_churn, top_drivers
+
+                    with profile_section("explain"):
+                        explanations = explain_churn(segments_scored.loc[top.index], from_store=not demo_mode)
+                except TypeError:
+                    return top, None  # not a tree ensemble: no path contributions
+                return top.assign(top_drivers=top_drivers(explanations[1])), explanations
+
+            top, explanations = cached("top_at_risk", (*score_key, top_n), explained_top)
 
-            top = segments_scored.sort_values("churn_probability_%", ascending=False).head(top_n).copy()
-            top_display = top[available_cols].copy()
+            top_display = top.copy()
 
             if "monetary_total" in top_display.columns:
                 top_display["monetary_total"] = top_display["monetary_total"].map(brl)
+            if "clv" in top_display.columns:
+                top_display["clv"] = top_display["clv"].map(brl)
             if "avg_order_value" in top_display.columns:
                 top_display["avg_order_value"] = top_display["avg_order_value"].round(0).astype("Int64")
             if "avg_delivery_days" in top_display.columns:
@@ -677,13 +1154,42 @@ def main() -> None:
             st.caption("Top 10 are the highest risk in the current filters.")
             st.dataframe(top_display, width="stretch", hide_index=True)
 
+            with profile_section("csv"):
+                top_csv = top.to_csv(index=False).encode("utf-8")
             st.download_button(
                 t["download_prior"],
-                data=top[available_cols].to_csv(index=False).encode("utf-8"),
+                data=top_csv,
                 file_name="priority_customers.csv",
                 mime="text/csv",
             )
 
+            if explanations is not None and len(top):
+                bias, contributions = explanations
+                st.markdown('<div class="section"></div>', unsafe_allow_html=True)
+                st.subheader(t["why_at_risk"])
+                explain_id = st.selectbox(t["explain_customer"], top["customer_unique_id"].tolist())
+                row = contributions.loc[top.index[top["customer_unique_id"] == explain_id][0]]
+                row = row[row.abs() > 1e-6].sort_values()
+                st.caption(
+                    t["explain_caption"].format(bias=pct(bias * 100, 1), total=pct((bias + row.sum()) * 100, 1))
+                )
+
+                def contribution_figure():
+                    fig = px.bar(
+                        x=row.to_numpy() * 100,
+                        y=row.index,
+                        orientation="h",
+                        color=np.where(row.to_numpy() > 0, "+", "−"),
+                        color_discrete_map={"+": "#d62728", "−": "#2ca02c"},
+                        labels={"x": t["contribution"], "y": ""},
+                    )
+                    fig.update_layout(showlegend=False, margin=dict(t=10, l=10, r=10, b=10))
+                    return fig
+
+                with profile_section("plotly"):
+                    fig = cached("fig_explain", (score_key[0], score_key[2], explain_id, lang), contribution_figure)
+                    st.plotly_chart(fig, width="stretch")
+
         except Exception as e:
             st.error(
                 f"{t['no_model']}\n\n"
@@ -692,7 +1198,47 @@ def main() -> None:
                 f"Details: {e}"
             )
 
-    with tab4:
+    with tab4, profile_section("customer"):
+        st.subheader(t["tabs"][4])
+        st.write(t["customer_intro"])
+
+        customer_id = st.text_input(t["customer_id"]).strip()
+        if customer_id:
+            index = get_customer_index(data_key, segments, tx)
+            profile = index.profile(customer_id)
+            if profile is None:
+                st.warning(t["customer_not_found"])
+            else:
+                customer = profile["customer"]
+                risk_value = "N/A"
+                try:
+                    from src.modeling.inference import predict_churn_proba
+
+                    proba = predict_churn_proba(customer.to_frame().T, from_store=True)
+                    risk_value = pct(float(proba.iloc[0]) * 100, 1)
+                except FileNotFoundError:
+                    pass  # no model published: the risk card shows N/A
+                except ValueError as e:
+                    # Features that do not match the model: say so rather than hide it behind N/A.
+                    st.error(
+                        f"{t['no_model']}\n\n"
+                        f"{t['run_train']}\n"
+                        f"{t['cloud_commit']}\n\n"
+                        f"Details: {e}"
+                    )
+
+                k1, k2, k3, k4 = st.columns(4, gap="small")
+                k1.metric(t["segment"], str(customer.get("segment_name", "—")))
+                k2.metric(t["churn_risk"], risk_value)
+                k3.metric(t["revenue"], brl(customer.get("monetary_total")))
+                k4.metric(t["orders"], f"{len(profile['orders']):,}")
+
+                st.dataframe(customer.to_frame("value").astype(str), width="stretch")
+
+                st.markdown(f"### {t['order_history']}")
+                st.dataframe(profile["orders"], width="stretch", hide_index=True)
+
+    with tab5, profile_section("method"):
         st.subheader(t["method_title"])
         st.markdown("**Key points**")
         st.markdown("\n".join([f"- {b}" for b in t["method_bullets"]]))
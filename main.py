@@ -2,16 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from src.analysis.segmentation import assign_rfm_segments
-from src.analysis.visualization import (
-    plot_churn_rate_by_segment,
-    plot_revenue_by_segment,
-    plot_segment_distribution,
-)
 from src.config import settings
-from src.etl.extract import load_all_raw_data
-from src.etl.transform import build_transaction_table
-from src.modeling.features import build_customer_features
+from src.pipeline.stages import run_pipeline
 
 
 def _has_raw_files(raw_dir: Path) -> bool:
@@ -42,42 +34,8 @@ def main() -> None:
         )
         return
 
-    print("\n[etl] Starting extraction...")
-    data = load_all_raw_data()
-    print(f"[etl] Loaded datasets: {list(data.keys())}")
-
-    print("\n[etl] Building transaction table...")
-    transactions = build_transaction_table(data)
-    print(f"[etl] Transaction table shape: {transactions.shape}")
-
-    out_path = processed_dir / "transactions.csv"
-    transactions.to_csv(out_path, index=False)
-    print(f"[etl] Saved processed transactions to: {out_path}")
-
-    print("\n[model] Building customer features...")
-    customer_features = build_customer_features(
-        transactions,
-        churn_window_days=settings.default_churn_window_days,
-    )
-
-    features_path = processed_dir / "customer_features.csv"
-    customer_features.to_csv(features_path, index=False)
-    print(f"[model] Customer features shape: {customer_features.shape}")
-    print(f"[model] Saved to: {features_path}")
-
-    print("\n[analysis] Assigning RFM segments...")
-    segmented = assign_rfm_segments(customer_features)
-
-    segments_path = processed_dir / "customer_segments.csv"
-    segmented.to_csv(segments_path, index=False)
-    print(f"[analysis] Segmented dataset shape: {segmented.shape}")
-    print(f"[analysis] Saved to: {segments_path}")
-
-    print("\n[analysis] Visualizing segments...")
-    plot_segment_distribution(segmented)
-    plot_revenue_by_segment(segmented)
-    plot_churn_rate_by_segment(segmented)
+    run_pipeline()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+COHORTS_FILENAME = "cohort_retention.csv"
+
+_NO_MONTH = np.iinfo(np.int64).max
+
+
+def month_codes(ts: pd.Series) -> np.ndarray:
+    """Integer month codes (year * 12 + month - 1); -1 where the timestamp is missing."""
+    ts = pd.to_datetime(ts, errors="coerce")
+    codes = (ts.dt.year * 12 + ts.dt.month - 1).to_numpy(dtype=np.float64, na_value=-1)
+    return codes.astype(np.int64)
+
+
+def _month_period(code: int) -> pd.Period:
+    return pd.Period(year=int(code) // 12, month=int(code) % 12 + 1, freq="M")
+
+
+@dataclass(frozen=True)
+class CohortMatrices:
+    """
+    First-purchase-month × months-since-first matrices. Row i is the cohort
+    `cohorts[i]`; column p is p months after the first purchase. Cells past the end of
+    the observed data (`last_month`, the last month with any order) are NaN.
+    """
+
+    cohorts: pd.PeriodIndex
+    sizes: np.ndarray
+    active: np.ndarray
+    revenue: np.ndarray
+    last_month: pd.Period | None = None  # None: the last cohort month
+
+    @property
+    def n_periods(self) -> int:
+        return self.active.shape[1]
+
+    def _observable(self) -> np.ndarray:
+        if len(self.cohorts) == 0:
+            return np.zeros(self.active.shape, dtype=bool)
+        # The data can end after the last cohort: a final month with repeat orders only.
+        last = (self.last_month if self.last_month is not None else self.cohorts.max()).ordinal
+        max_period = last - self.cohorts.asi8  # later cohorts have fewer observable months
+        return np.arange(self.n_periods)[None, :] <= max_period[:, None]
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        values = np.where(self._observable(), values, np.nan)
+        return pd.DataFrame(values, index=self.cohorts.astype(str), columns=range(self.n_periods))
+
+    def retention(self) -> pd.DataFrame:
+        """Share of each cohort that purchased again p months after its first month."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._frame(self.active / self.sizes[:, None])
+
+    def active_customers(self) -> pd.DataFrame:
+        return self._frame(self.active.astype(np.float64))
+
+    def revenue_matrix(self) -> pd.DataFrame:
+        return self._frame(self.revenue)
+
+    def to_long(self) -> pd.DataFrame:
+        rows, periods = np.nonzero(self._observable())
+        return pd.DataFrame(
+            {
+                "cohort_month": self.cohorts.astype(str)[rows],
+                "months_since_first": periods,
+                "cohort_size": self.sizes[rows],
+                "active_customers": self.active[rows, periods],
+                "retention": self.active[rows, periods] / self.sizes[rows],
+                "revenue": self.revenue[rows, periods],
+            }
+        )
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame) -> "CohortMatrices":
+        cohorts = pd.PeriodIndex(sorted(df["cohort_month"].unique()), freq="M")
+        n_periods = int(df["months_since_first"].max()) + 1 if len(df) else 0
+        rows = cohorts.get_indexer(pd.PeriodIndex(df["cohort_month"], freq="M"))
+        periods = df["months_since_first"].to_numpy(dtype=np.int64)
+
+        active = np.zeros((len(cohorts), n_periods), dtype=np.int64)
+        revenue = np.zeros((len(cohorts), n_periods), dtype=np.float64)
+        active[rows, periods] = df["active_customers"].to_numpy()
+        revenue[rows, periods] = df["revenue"].to_numpy()
+        sizes = np.zeros(len(cohorts), dtype=np.int64)
+        sizes[rows] = df["cohort_size"].to_numpy()
+        # Every observable cell is written (zeros included), so the furthest one is the last month.
+        last_month = pd.Period(ordinal=int((cohorts.asi8[rows] + periods).max()), freq="M") if len(df) else None
+        return cls(cohorts=cohorts, sizes=sizes, active=active, revenue=revenue, last_month=last_month)
+
+
+def build_cohorts(tx: pd.DataFrame) -> CohortMatrices:
+    """
+    Cohort matrices from the transaction table in a few array passes: integer month
+    codes, a per-customer first month via `np.minimum.at`, and `np.bincount` over the
+    flattened (cohort, period) cell index. Distinct active customers come from one
+    `np.unique` over (customer, period) keys. No per-cohort loops.
+    """
+    months = month_codes(tx["order_purchase_timestamp"])
+    customers, _ = pd.factorize(tx["customer_unique_id"])
+    revenue = (
+        tx["revenue"].to_numpy(dtype=np.float64, na_value=0.0)
+        if "revenue" in tx.columns
+        else np.zeros(len(tx))
+    )
+
+    valid = (months >= 0) & (customers >= 0)
+    months, customers, revenue = months[valid], customers[valid].astype(np.int64), revenue[valid]
+    if len(months) == 0:
+        empty = np.zeros((0, 0))
+        return CohortMatrices(pd.PeriodIndex([], freq="M"), np.zeros(0, dtype=np.int64), empty.astype(np.int64), empty)
+
+    first = np.full(customers.max() + 1, _NO_MONTH, dtype=np.int64)
+    np.minimum.at(first, customers, months)
+
+    m0 = int(months.min())
+    n = int(months.max()) - m0 + 1  # cohorts and periods share the same span of months
+    cohort_idx = first[customers] - m0
+    period = months - first[customers]
+
+    revenue_cells = np.bincount(cohort_idx * n + period, weights=revenue, minlength=n * n)
+
+    pairs = np.unique(customers * n + period)
+    pair_customers, pair_periods = pairs // n, pairs % n
+    active_cells = np.bincount((first[pair_customers] - m0) * n + pair_periods, minlength=n * n)
+
+    active = active_cells.reshape(n, n)
+    sizes = active[:, 0]
+    keep = sizes > 0  # months in which nobody made a first purchase
+    cohorts = pd.period_range(_month_period(m0), periods=n, freq="M")[keep]
+
+    return CohortMatrices(
+        cohorts=cohorts,
+        sizes=sizes[keep],
+        active=active[keep],
+        revenue=revenue_cells.reshape(n, n)[keep],
+        last_month=_month_period(int(months.max())),
+    )
+
+
+def cohorts_path() -> Path:
+    return settings.root_dir / settings.data_processed_dir / COHORTS_FILENAME
+
+
+def save_cohorts(cohorts: CohortMatrices, path: Path | None = None) -> Path:
+    path = path or cohorts_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cohorts.to_long().to_csv(path, index=False)
+    return path
+
+
+def load_cohorts(path: Path | None = None) -> CohortMatrices | None:
+    path = path or cohorts_path()
+    if not path.exists():
+        return None
+    return CohortMatrices.from_long(pd.read_csv(path))
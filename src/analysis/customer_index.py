@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+ORDER_HISTORY_COLS = [
+    "order_id",
+    "order_purchase_timestamp",
+    "order_status",
+    "revenue",
+    "freight_value",
+    "total_payment",
+    "review_score",
+    "delivery_days",
+]
+
+
+class CustomerIndex:
+    """
+    O(1) per-customer lookup over the segments and transactions tables.
+
+    - segments: hash map customer_unique_id → row position.
+    - transactions: sorted once by (customer, purchase time); each customer maps to a
+      (start, end) slice of that array, so an order history is a contiguous `iloc` slice
+      instead of a boolean scan over every order.
+    """
+
+    def __init__(self, segments: pd.DataFrame, tx: pd.DataFrame):
+        self.segments = segments.reset_index(drop=True)
+        self._seg_pos = {cid: i for i, cid in enumerate(self.segments["customer_unique_id"])}
+
+        history_cols = [c for c in ORDER_HISTORY_COLS if c in tx.columns]
+        tx = tx.loc[tx["customer_unique_id"].notna(), ["customer_unique_id"] + history_cols]
+        sort_cols = ["customer_unique_id"] + (
+            ["order_purchase_timestamp"] if "order_purchase_timestamp" in tx.columns else []
+        )
+        self.tx = tx.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+
+        ids = self.tx["customer_unique_id"].to_numpy()
+        n = ids.size
+        if n:
+            boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+            starts = np.r_[0, boundaries]
+            ends = np.r_[boundaries, n]
+            self._tx_offsets = dict(zip(ids[starts], zip(starts.tolist(), ends.tolist())))
+        else:
+            self._tx_offsets = {}
+        self._history_cols = history_cols
+
+    def __contains__(self, customer_unique_id: str) -> bool:
+        return customer_unique_id in self._seg_pos
+
+    def __len__(self) -> int:
+        return len(self._seg_pos)
+
+    def features(self, customer_unique_id: str) -> pd.Series | None:
+        pos = self._seg_pos.get(customer_unique_id)
+        if pos is None:
+            return None
+        return self.segments.iloc[pos]
+
+    def orders(self, customer_unique_id: str) -> pd.DataFrame:
+        start, end = self._tx_offsets.get(customer_unique_id, (0, 0))
+        return self.tx.iloc[start:end][self._history_cols]
+
+    def profile(self, customer_unique_id: str) -> dict | None:
+        """Features (incl. segment and churn score when present) plus order history."""
+        row = self.features(customer_unique_id)
+        if row is None:
+            return None
+        return {"customer": row, "orders": self.orders(customer_unique_id)}
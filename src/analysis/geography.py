@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+GEO_COLS = ["customer_zip_code_prefix", "customer_city", "customer_state"]
+ROLLUP_FILENAME = "region_segment_rollup.csv"
+ROLLUP_KEYS = ["customer_state", "customer_city", "segment_name"]
+UNKNOWN_REGION = "unknown"
+
+
+def as_geo_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast whichever location columns `df` has to categoricals (in place). Zip prefixes
+    are kept as zero-padded 5-digit strings, since leading zeros are significant.
+    """
+    if "customer_zip_code_prefix" in df.columns:
+        zips = pd.to_numeric(df["customer_zip_code_prefix"], errors="coerce").astype("Int64")
+        df["customer_zip_code_prefix"] = zips.astype("string").str.zfill(5).astype("category")
+    for col in ("customer_city", "customer_state"):
+        if col in df.columns:
+            df[col] = df[col].astype("string").str.strip().astype("category")
+    return df
+
+
+def customer_regions(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Each customer's location as of their latest order (customers can move between orders)."""
+    cols = [c for c in GEO_COLS if c in transactions.columns]
+    latest = (
+        transactions[["customer_unique_id", "order_purchase_timestamp", *cols]]
+        .sort_values("order_purchase_timestamp", kind="stable")
+        .drop_duplicates("customer_unique_id", keep="last")
+    )
+    return latest.drop(columns=["order_purchase_timestamp"]).reset_index(drop=True)
+
+
+def build_region_rollup(segments: pd.DataFrame, churn_col: str | None) -> pd.DataFrame:
+    """
+    Customers, revenue and churned customers per (state, city, segment). Every coarser
+    view (a state, a state × segment, the whole country) is a sum over these rows, so
+    region filters never regroup customer rows.
+    """
+    keys = segments[ROLLUP_KEYS].astype(object).fillna(UNKNOWN_REGION)
+    values = pd.DataFrame(
+        {
+            "customers": 1,
+            "revenue": segments["monetary_total"].to_numpy(dtype=np.float64, na_value=0.0),
+            "churned": segments[churn_col].to_numpy(dtype=np.int64) if churn_col else 0,
+        },
+        index=segments.index,
+    )
+    rollup = pd.concat([keys, values], axis=1).groupby(ROLLUP_KEYS, observed=True, sort=True).sum()
+    return rollup.reset_index()
+
+
+def _select(rollup: pd.DataFrame, states: list[str] | None, segment: str | None) -> pd.DataFrame:
+    mask = np.ones(len(rollup), dtype=bool)
+    if states is not None:
+        mask &= rollup["customer_state"].isin(states).to_numpy()
+    if segment is not None:
+        mask &= (rollup["segment_name"] == segment).to_numpy()
+    return rollup[mask]
+
+
+def rollup_kpis(rollup: pd.DataFrame, states: list[str] | None, segment: str | None, has_churn: bool) -> dict:
+    """Customer-level KPIs (see `compute_kpis`) for a region/segment filter, from the rollup."""
+    rows = _select(rollup, states, segment)
+    customers = int(rows["customers"].sum())
+    churn_rate = None
+    if has_churn:
+        churn_rate = float(rows["churned"].sum() / customers * 100) if customers else 0.0
+    return {
+        "total_customers": customers,
+        "total_revenue": float(rows["revenue"].sum()),
+        "churn_rate": churn_rate,
+    }
+
+
+def rollup_segment_summary(
+    rollup: pd.DataFrame, states: list[str] | None, segment: str | None, has_churn: bool
+) -> pd.DataFrame:
+    """Same shape as `segment_summary`, for the customers of `states`."""
+    summary = (
+        _select(rollup, states, segment)
+        .groupby("segment_name")[["customers", "revenue", "churned"]]
+        .sum()
+        .sort_values("revenue", ascending=False)
+    )
+    if has_churn:
+        summary["churn_risk_%"] = (summary["churned"] / summary["customers"] * 100).round(1)
+    return summary.drop(columns=["churned"])
+
+
+def state_summary(rollup: pd.DataFrame, segment: str | None) -> pd.DataFrame:
+    """Customers, revenue and churn rate per state, largest revenue first."""
+    by_state = _select(rollup, None, segment).groupby("customer_state")[["customers", "revenue", "churned"]].sum()
+    by_state["churn_rate"] = by_state["churned"] / by_state["customers"].where(by_state["customers"] > 0)
+    return by_state.sort_values("revenue", ascending=False)
+
+
+def rollup_path() -> Path:
+    return settings.root_dir / settings.data_processed_dir / ROLLUP_FILENAME
+
+
+def save_region_rollup(rollup: pd.DataFrame, path: Path | None = None) -> Path:
+    path = path or rollup_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rollup.to_csv(path, index=False)
+    return path
+
+
+def load_region_rollup(path: Path | None = None) -> pd.DataFrame | None:
+    path = path or rollup_path()
+    if not path.exists():
+        return None
+    return pd.read_csv(path, dtype={"customer_state": str, "customer_city": str, "segment_name": str})
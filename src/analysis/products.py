@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.modeling.features import CATEGORY_SHARE_PREFIX
+from src.utils.validation import require_columns
+
+UNKNOWN_CATEGORY = "unknown"
+DEFAULT_TOP_CATEGORIES = 8
+
+MATRIX_FILENAME = "customer_category_matrix.npz"
+MATRIX_INDEX_FILENAME = "customer_category_index.json"
+SEGMENT_MIX_FILENAME = "segment_category_mix.csv"
+
+
+def build_item_table(data: dict, transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per order item of the orders kept in `transactions`, with the buying
+    customer and the English category name: item → product → category in two merges.
+    """
+    items = data["order_items"]
+    products = data["products"]
+    translation = data["category_translation"]
+    require_columns(items, ["order_id", "product_id", "price"], "order_items")
+    require_columns(products, ["product_id", "product_category_name"], "products")
+    require_columns(translation, ["product_category_name", "product_category_name_english"], "category_translation")
+
+    categories = products[["product_id", "product_category_name"]].merge(
+        translation[["product_category_name", "product_category_name_english"]],
+        on="product_category_name",
+        how="left",
+    )
+    category = categories["product_category_name_english"].fillna(categories["product_category_name"])
+    categories = pd.DataFrame({
+        "product_id": categories["product_id"],
+        "category": category.fillna(UNKNOWN_CATEGORY).str.lower(),
+    })
+
+    orders = transactions[["order_id", "customer_unique_id"]]
+    df = items[["order_id", "product_id", "price"]].merge(orders, on="order_id", how="inner")
+    df = df.merge(categories, on="product_id", how="left")
+    df["category"] = df["category"].fillna(UNKNOWN_CATEGORY)
+    return df
+
+
+@dataclass(frozen=True)
+class CategoryMatrix:
+    """Sparse customers × categories item revenue (CSR); rows follow `customer_ids`."""
+
+    matrix: object  # scipy.sparse.csr_matrix
+    customer_ids: pd.Index
+    categories: list[str]
+
+    def revenue_by_category(self) -> pd.Series:
+        totals = np.asarray(self.matrix.sum(axis=0)).ravel()
+        return pd.Series(totals, index=self.categories).sort_values(ascending=False)
+
+    def top_categories(self, k: int = DEFAULT_TOP_CATEGORIES) -> list[str]:
+        return self.revenue_by_category().head(k).index.tolist()
+
+    def row_shares(self):
+        """Same sparsity pattern, each row scaled to sum to 1."""
+        from scipy import sparse
+
+        totals = np.asarray(self.matrix.sum(axis=1)).ravel()
+        inv = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        return sparse.diags(inv) @ self.matrix
+
+
+def build_category_matrix(items: pd.DataFrame) -> CategoryMatrix:
+    from scipy import sparse
+
+    customer_codes, customer_ids = pd.factorize(items["customer_unique_id"], sort=True)
+    category_codes, categories = pd.factorize(items["category"], sort=True)
+    # Duplicate (customer, category) pairs are summed when converting COO → CSR.
+    matrix = sparse.coo_matrix(
+        (items["price"].to_numpy(dtype=np.float64), (customer_codes, category_codes)),
+        shape=(len(customer_ids), len(categories)),
+    ).tocsr()
+    return CategoryMatrix(matrix=matrix, customer_ids=pd.Index(customer_ids), categories=list(categories))
+
+
+def category_share_features(
+    cm: CategoryMatrix,
+    k: int = DEFAULT_TOP_CATEGORIES,
+    categories: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Per customer: revenue share of each of the top-`k` categories (by total revenue),
+    the share of everything else, and the number of distinct categories bought.
+    Only these k + 2 columns are densified.
+
+    Pass `categories` to get shares for exactly that list instead (e.g. the one a model
+    was trained on): the columns then do not move with the data, and a category nobody
+    bought in `cm` is an all-zero column.
+    """
+    shares = cm.row_shares()
+    top = cm.top_categories(k) if categories is None else list(categories)
+    position = {c: i for i, c in enumerate(cm.categories)}
+    dense = np.zeros((shares.shape[0], len(top)))
+    present = [i for i, c in enumerate(top) if c in position]
+    if present:
+        dense[:, present] = shares[:, [position[top[i]] for i in present]].toarray()
+
+    out = pd.DataFrame(dense, columns=[f"{CATEGORY_SHARE_PREFIX}{c}" for c in top])
+    out[f"{CATEGORY_SHARE_PREFIX}other"] = (1.0 - dense.sum(axis=1)).clip(0, 1)
+    out["n_categories"] = np.diff(cm.matrix.indptr)
+    out.insert(0, "customer_unique_id", cm.customer_ids.to_numpy())
+    return out
+
+
+def segment_category_mix(cm: CategoryMatrix, segments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Segment × category revenue, as one sparse product: (segments × customers) indicator
+    @ (customers × categories). Returns a long table with each category's share of the
+    segment's item revenue.
+    """
+    from scipy import sparse
+
+    seg = segments.set_index("customer_unique_id")["segment_name"].reindex(cm.customer_ids)
+    seg_codes, seg_names = pd.factorize(seg, sort=True)
+    known = seg_codes >= 0
+    indicator = sparse.csr_matrix(
+        (np.ones(known.sum()), (seg_codes[known], np.flatnonzero(known))),
+        shape=(len(seg_names), len(cm.customer_ids)),
+    )
+    revenue = (indicator @ cm.matrix).toarray()
+
+    mix = pd.DataFrame(revenue, index=pd.Index(seg_names, name="segment_name"), columns=cm.categories)
+    long = mix.stack().rename("revenue").reset_index().rename(columns={"level_1": "category"})
+    long = long[long["revenue"] > 0]
+    long["share"] = long["revenue"] / long.groupby("segment_name")["revenue"].transform("sum")
+    return long.sort_values(["segment_name", "revenue"], ascending=[True, False]).reset_index(drop=True)
+
+
+def save_category_outputs(cm: CategoryMatrix, mix: pd.DataFrame, out_dir: Path | None = None) -> Path:
+    from scipy import sparse
+
+    out_dir = out_dir or settings.root_dir / settings.data_processed_dir
+    sparse.save_npz(out_dir / MATRIX_FILENAME, cm.matrix)
+    (out_dir / MATRIX_INDEX_FILENAME).write_text(
+        json.dumps({"customer_ids": cm.customer_ids.tolist(), "categories": cm.categories}),
+        encoding="utf-8",
+    )
+    mix.to_csv(out_dir / SEGMENT_MIX_FILENAME, index=False)
+    return out_dir
+
+
+def load_segment_category_mix(out_dir: Path | None = None) -> pd.DataFrame | None:
+    path = (out_dir or settings.root_dir / settings.data_processed_dir) / SEGMENT_MIX_FILENAME
+    return pd.read_csv(path) if path.exists() else None
+
+
+def load_category_matrix(out_dir: Path | None = None) -> CategoryMatrix | None:
+    from scipy import sparse
+
+    out_dir = out_dir or settings.root_dir / settings.data_processed_dir
+    matrix_path = out_dir / MATRIX_FILENAME
+    index_path = out_dir / MATRIX_INDEX_FILENAME
+    if not matrix_path.exists() or not index_path.exists():
+        return None
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    return CategoryMatrix(
+        matrix=sparse.load_npz(matrix_path).tocsr(),
+        customer_ids=pd.Index(index["customer_ids"]),
+        categories=index["categories"],
+    )
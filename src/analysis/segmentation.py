@@ -1,55 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+from joblib import dump, load
+
+from src.config import settings
+
+RFM_BINS_FILENAME = "rfm_bins.joblib"
+
+# score column → (feature column, reverse). Recency: lower is better.
+RFM_COLUMNS = {
+    "R_score": ("recency_days", True),
+    "F_score": ("frequency_orders", False),
+    "M_score": ("monetary_total", False),
+}
+
+
+@dataclass(frozen=True)
+class RFMBins:
+    """
+    Quantile bin edges for R/F/M, fitted once on a reference population.
+
+    `edges[col]` holds the interior edges left after dropping duplicate quantiles (so a
+    heavily tied column like frequency may have fewer than q bins). Scoring new customers
+    against fixed edges keeps scores comparable across runs and micro-batches.
+    """
+
+    edges: dict[str, np.ndarray]
+    labels: tuple[int, ...] = (1, 2, 3, 4)
+    n_reference: int = 0
 
 
-def _qcut_score(series: pd.Series, q: int, labels: list[int], reverse: bool = False) -> pd.Series:
+def _quantile_edges(values: np.ndarray, q: int) -> np.ndarray | None:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None
+    # Same quantiles (linear interpolation) and duplicate-edge handling as pd.qcut(duplicates="drop").
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, q + 1)))
+    if edges.size < 2:
+        return None
+    return edges[1:-1]
+
+
+def fit_rfm_bins(
+    features: pd.DataFrame,
+    q: int = 4,
+    sample_size: int | None = None,
+    seed: int = settings.random_seed,
+) -> RFMBins:
     """
-    Quantile scoring that won't fail when there are duplicate bin edges.
-    If qcut can't create q bins, it will drop duplicate edges and still return a score.
+    Fit R/F/M quantile edges. With `sample_size`, edges are estimated on a uniform random
+    sample of that many customers (approximate quantiles for very large populations).
     """
-    s = series.copy()
+    df = features
+    if sample_size is not None and len(df) > sample_size:
+        rng = np.random.default_rng(seed)
+        df = df.iloc[np.sort(rng.choice(len(df), size=sample_size, replace=False))]
+
+    edges = {}
+    for col, _ in RFM_COLUMNS.values():
+        col_edges = _quantile_edges(df[col].to_numpy(dtype=float), q)
+        if col_edges is not None:
+            edges[col] = col_edges
 
-    buckets = pd.qcut(s, q=q, duplicates="drop")
-    codes = buckets.cat.codes
+    return RFMBins(edges=edges, labels=tuple(range(1, q + 1)), n_reference=len(df))
 
-    k = buckets.cat.categories.size
-    if k <= 0:
-        return pd.Series([labels[-1]] * len(s), index=s.index)
 
-    scaled = (codes / max(k - 1, 1) * (len(labels) - 1)).round().astype(int)
-    out = pd.Series([labels[i] for i in scaled], index=s.index)
+def save_rfm_bins(bins: RFMBins, path: Path | None = None) -> Path:
+    path = path or settings.root_dir / settings.models_dir / RFM_BINS_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dump(bins, path)
+    return path
+
+
+def load_rfm_bins(path: Path | None = None) -> RFMBins:
+    path = path or settings.root_dir / settings.models_dir / RFM_BINS_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"RFM bins not found: {path}. Run: python main.py")
+    return load(path)
+
+
+def _score_column(values: pd.Series, edges: np.ndarray | None, labels: tuple[int, ...], reverse: bool) -> np.ndarray:
+    if edges is None:
+        # Constant or empty reference column: everyone lands in the same (top) bucket.
+        return np.full(len(values), labels[-1], dtype=int)
+
+    # Right-closed bins like pd.qcut: a value equal to an edge falls in the lower bin.
+    codes = np.searchsorted(edges, values.to_numpy(dtype=float), side="left")
+    k = edges.size + 1
+    scaled = np.round(codes / max(k - 1, 1) * (len(labels) - 1)).astype(int)
+    out = np.asarray(labels)[scaled]
 
     if reverse:
-        out = out.max() + out.min() - out
+        out = labels[0] + labels[-1] - out
+    return out
 
-    return out.astype(int)
 
+def score_rfm(features: pd.DataFrame, bins: RFMBins) -> pd.DataFrame:
+    """Vectorized R/F/M scores for any batch of customers against pre-fitted edges."""
+    scores = {
+        score_col: _score_column(features[col], bins.edges.get(col), bins.labels, reverse)
+        for score_col, (col, reverse) in RFM_COLUMNS.items()
+    }
+    return pd.DataFrame(scores, index=features.index)
 
-def assign_rfm_segments(features: pd.DataFrame) -> pd.DataFrame:
-    df = features.copy()
 
-    # Recency → lower is better
-    df["R_score"] = _qcut_score(
-        df["recency_days"],
-        q=4,
-        labels=[1, 2, 3, 4],
-        reverse=True,
-    )
+def label_segments(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> np.ndarray:
+    conditions = [
+        (r >= 4) & (f >= 3) & (m >= 3),
+        (r >= 3) & (f >= 3) & (m >= 2),
+        (r >= 4) & (f <= 2),
+        (r == 3) & (f <= 2) & (m <= 2),
+        (r <= 2) & (f >= 2) & (m >= 2),
+        (r <= 2) & (f == 1),
+    ]
+    choices = ["Champions", "Loyal", "New Customers", "Need Attention", "At Risk", "Hibernating"]
+    return np.select(conditions, choices, default="Regular")
 
-    # Frequency → higher is better
-    df["F_score"] = _qcut_score(
-        df["frequency_orders"],
-        q=4,
-        labels=[1, 2, 3, 4],
-        reverse=False,
-    )
 
-    # Monetary → higher is better
-    df["M_score"] = _qcut_score(
-        df["monetary_total"],
-        q=4,
-        labels=[1, 2, 3, 4],
-        reverse=False,
-    )
+def assign_rfm_segments(features: pd.DataFrame, bins: RFMBins | None = None) -> pd.DataFrame:
+    """
+    Add R/F/M scores, the concatenated RFM code and a segment label.
+    Edges are fitted on `features` itself unless pre-fitted `bins` are given.
+    """
+    df = features.copy()
+    bins = bins or fit_rfm_bins(df)
+
+    scores = score_rfm(df, bins)
+    for col in scores.columns:
+        df[col] = scores[col]
 
     df["RFM_score"] = (
         df["R_score"].astype(str)
@@ -57,24 +139,10 @@ def assign_rfm_segments(features: pd.DataFrame) -> pd.DataFrame:
         + df["M_score"].astype(str)
     )
 
-    def label_segment(r: int, f: int, m: int) -> str:
-        if r >= 4 and f >= 3 and m >= 3:
-            return "Champions"
-        if r >= 3 and f >= 3 and m >= 2:
-            return "Loyal"
-        if r >= 4 and f <= 2:
-            return "New Customers"
-        if r == 3 and f <= 2 and m <= 2:
-            return "Need Attention"
-        if r <= 2 and f >= 2 and m >= 2:
-            return "At Risk"
-        if r <= 2 and f == 1:
-            return "Hibernating"
-        return "Regular"
-
-    df["segment_name"] = df.apply(
-        lambda x: label_segment(x["R_score"], x["F_score"], x["M_score"]),
-        axis=1,
+    df["segment_name"] = label_segments(
+        df["R_score"].to_numpy(),
+        df["F_score"].to_numpy(),
+        df["M_score"].to_numpy(),
     )
 
-    return df
\ No newline at end of file
+    return df
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+SKETCHES_FILENAME = "kpi_sketches.npz"
+
+HLL_PRECISION = 11  # 2,048 one-byte registers per cell: ~2.3% standard error
+QUANTILE_ACCURACY = 0.01  # DDSketch-style relative accuracy of quantile estimates
+QUANTILE_METRICS = ("monetary_total", "clv", "churn_probability")
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+_NO_DAY = -1  # orders without a purchase timestamp
+_ZERO_KEY = np.iinfo(np.int64).min  # bucket for values <= 0
+
+
+# ---------------------------------------------------------------
+# HyperLogLog
+# ---------------------------------------------------------------
+def hash64(values: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    # Exact for uint64: frexp on each 32-bit half (both are exactly representable as float64).
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1]).astype(np.int64)
+
+
+def hll_observations(hashes: np.ndarray, precision: int = HLL_PRECISION) -> tuple[np.ndarray, np.ndarray]:
+    """(register index, rank) per hash: top `precision` bits pick the register, the rank
+    is the position of the first set bit in the rest."""
+    tail_bits = 64 - precision
+    index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+    tail = hashes & np.uint64((1 << tail_bits) - 1)
+    rank = tail_bits - _bit_length(tail) + 1
+    return index, rank.astype(np.uint8)
+
+
+def hll_estimate(registers: np.ndarray) -> float:
+    """Cardinality of one register array (Flajolet et al. 2007, with linear counting for small counts)."""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return float(m * np.log(m / zeros))
+    return float(raw)
+
+
+# ---------------------------------------------------------------
+# Quantiles
+# ---------------------------------------------------------------
+@dataclass(frozen=True)
+class QuantileSketch:
+    """
+    Log-bucketed histogram (DDSketch): bucket k holds values in (γ^(k-1), γ^k], so any
+    quantile is returned within `accuracy` relative error. Merging is adding counts.
+    Values <= 0 share one bucket and are reported as 0.
+    """
+
+    keys: np.ndarray
+    counts: np.ndarray
+    accuracy: float = QUANTILE_ACCURACY
+
+    @property
+    def gamma(self) -> float:
+        return (1 + self.accuracy) / (1 - self.accuracy)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, accuracy: float = QUANTILE_ACCURACY) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        gamma = (1 + accuracy) / (1 - accuracy)
+        with np.errstate(divide="ignore"):
+            keys = np.where(values > 0, np.ceil(np.log(values) / np.log(gamma)), 0).astype(np.int64)
+        keys[values <= 0] = _ZERO_KEY
+        keys, counts = np.unique(keys, return_counts=True)
+        return cls(keys=keys, counts=counts.astype(np.int64), accuracy=accuracy)
+
+    @classmethod
+    def merge(cls, sketches: list["QuantileSketch"]) -> "QuantileSketch":
+        if not sketches:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        keys = np.concatenate([s.keys for s in sketches])
+        counts = np.concatenate([s.counts for s in sketches])
+        merged, inverse = np.unique(keys, return_inverse=True)
+        return cls(keys=merged, counts=np.bincount(inverse, weights=counts).astype(np.int64), accuracy=sketches[0].accuracy)
+
+    def quantiles(self, qs: list[float]) -> list[float | None]:
+        if self.count == 0:
+            return [None for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        out = []
+        for q in qs:
+            rank = min(max(q, 0.0), 1.0) * (self.count - 1)
+            key = self.keys[int(np.searchsorted(cumulative, rank, side="right"))]
+            out.append(0.0 if key == _ZERO_KEY else float(2 * self.gamma**key / (self.gamma + 1)))
+        return out
+
+
+# ---------------------------------------------------------------
+# Segment × day cube
+# ---------------------------------------------------------------
+def _day_number(value) -> int:
+    return int((np.datetime64(pd.Timestamp(value).date(), "D") - _EPOCH).astype(np.int64))
+
+
+@dataclass(frozen=True)
+class KPISketches:
+    """
+    Pre-aggregated KPI cells, one per (segment, purchase day): exact order and revenue
+    totals (the transaction table has one row per order, so these simply add up) and a
+    HyperLogLog register array of the customers who bought that day. Per-segment
+    quantile sketches cover customer-level metrics.
+
+    Any segment/date filter is answered by merging cells (sum / register-wise max),
+    without touching transaction rows.
+    """
+
+    segment_names: list[str]
+    cell_segment: np.ndarray
+    cell_day: np.ndarray
+    orders: np.ndarray
+    revenue: np.ndarray
+    registers: np.ndarray
+    quantile_sketches: dict[str, dict[str, QuantileSketch]] = field(default_factory=dict)
+
+    def _cells(self, segments: list[str] | None, start: date | None, end: date | None) -> np.ndarray:
+        mask = np.ones(len(self.cell_day), dtype=bool)
+        if segments is not None:
+            codes = [self.segment_names.index(s) for s in segments if s in self.segment_names]
+            mask &= np.isin(self.cell_segment, codes)
+        if start is not None:
+            mask &= self.cell_day >= _day_number(start)
+        if end is not None:
+            mask &= (self.cell_day <= _day_number(end)) & (self.cell_day != _NO_DAY)
+        return mask
+
+    def order_count(self, segments: list[str] | None = None, start: date | None = None, end: date | None = None) -> int:
+        return int(self.orders[self._cells(segments, start, end)].sum())
+
+    def revenue_total(self, segments: list[str] | None = None, start: date | None = None, end: date | None = None) -> float:
+        return float(self.revenue[self._cells(segments, start, end)].sum())
+
+    def distinct_customers(self, segments: list[str] | None = None, start: date | None = None, end: date | None = None) -> int:
+        mask = self._cells(segments, start, end)
+        if not mask.any():
+            return 0
+        return int(round(hll_estimate(self.registers[mask].max(axis=0))))
+
+    def quantiles(self, metric: str, qs: list[float], segments: list[str] | None = None) -> list[float | None]:
+        by_segment = self.quantile_sketches.get(metric, {})
+        names = by_segment.keys() if segments is None else [s for s in segments if s in by_segment]
+        return QuantileSketch.merge([by_segment[s] for s in names]).quantiles(qs)
+
+
+def build_kpi_sketches(
+    transactions: pd.DataFrame,
+    segments: pd.DataFrame,
+    scores: pd.DataFrame | None = None,
+    precision: int = HLL_PRECISION,
+) -> KPISketches:
+    """
+    One pass over the transaction table: map each order to its customer's segment and
+    purchase day, then fold orders/revenue with `np.bincount` and HLL ranks with
+    `np.maximum.at` into (segment × day) cells.
+    """
+    segment_of = segments.set_index("customer_unique_id")["segment_name"]
+    seg = transactions["customer_unique_id"].map(segment_of).fillna("Unsegmented")
+    seg_codes, segment_names = pd.factorize(seg, sort=True)
+
+    ts = pd.to_datetime(transactions["order_purchase_timestamp"], errors="coerce")
+    days = np.where(
+        ts.notna().to_numpy(),
+        (ts.dt.normalize().to_numpy(dtype="datetime64[ns]").astype("datetime64[D]") - _EPOCH).astype(np.int64),
+        _NO_DAY,
+    )
+
+    cell_keys = pd.MultiIndex.from_arrays([seg_codes, days])
+    cell, cells = pd.factorize(cell_keys)
+    n_cells = len(cells)
+
+    revenue = (
+        transactions["revenue"].to_numpy(dtype=np.float64, na_value=0.0)
+        if "revenue" in transactions.columns
+        else np.zeros(len(transactions))
+    )
+    orders = np.bincount(cell, minlength=n_cells).astype(np.int64)
+    revenue_cells = np.bincount(cell, weights=revenue, minlength=n_cells)
+
+    index, rank = hll_observations(hash64(transactions["customer_unique_id"]), precision)
+    registers = np.zeros((n_cells, 1 << precision), dtype=np.uint8)
+    np.maximum.at(registers, (cell, index), rank)
+
+    metrics = segments
+    if scores is not None and "churn_probability" in scores.columns:
+        metrics = segments.merge(scores[["customer_unique_id", "churn_probability"]], on="customer_unique_id", how="left")
+    quantile_sketches = {
+        metric: {
+            name: QuantileSketch.from_values(group.to_numpy(dtype=np.float64, na_value=np.nan))
+            for name, group in metrics.groupby("segment_name")[metric]
+        }
+        for metric in QUANTILE_METRICS
+        if metric in metrics.columns
+    }
+
+    return KPISketches(
+        segment_names=[str(s) for s in segment_names],
+        cell_segment=cells.get_level_values(0).to_numpy(dtype=np.int64),
+        cell_day=cells.get_level_values(1).to_numpy(dtype=np.int64),
+        orders=orders,
+        revenue=revenue_cells,
+        registers=registers,
+        quantile_sketches=quantile_sketches,
+    )
+
+
+def sketches_path() -> Path:
+    return settings.root_dir / settings.data_processed_dir / SKETCHES_FILENAME
+
+
+def save_kpi_sketches(sketches: KPISketches, path: Path | None = None) -> Path:
+    path = path or sketches_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Quantile sketches flattened to (metric, segment, key, count) columns.
+    q_metric, q_segment, q_key, q_count = [], [], [], []
+    metrics = list(sketches.quantile_sketches)
+    for m, metric in enumerate(metrics):
+        for name, sketch in sketches.quantile_sketches[metric].items():
+            n = len(sketch.keys)
+            q_metric.append(np.full(n, m))
+            q_segment.append(np.full(n, sketches.segment_names.index(name)))
+            q_key.append(sketch.keys)
+            q_count.append(sketch.counts)
+
+    def cat(parts: list[np.ndarray]) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    np.savez_compressed(
+        path,
+        segment_names=np.array(sketches.segment_names, dtype=str),
+        cell_segment=sketches.cell_segment,
+        cell_day=sketches.cell_day,
+        orders=sketches.orders,
+        revenue=sketches.revenue,
+        registers=sketches.registers,
+        q_metrics=np.array(metrics, dtype=str),
+        q_metric=cat(q_metric),
+        q_segment=cat(q_segment),
+        q_key=cat(q_key),
+        q_count=cat(q_count),
+    )
+    return path
+
+
+def load_kpi_sketches(path: Path | None = None) -> KPISketches | None:
+    """The saved sketches, or None when missing or older than the transactions they summarize."""
+    path = path or sketches_path()
+    tx_path = path.parent / "transactions.csv"
+    if not path.exists() or (tx_path.exists() and path.stat().st_mtime < tx_path.stat().st_mtime):
+        return None
+    with np.load(path) as z:
+        segment_names = z["segment_names"].tolist()
+        q_metric, q_segment, q_key, q_count = z["q_metric"], z["q_segment"], z["q_key"], z["q_count"]
+        quantile_sketches: dict[str, dict[str, QuantileSketch]] = {}
+        for m, metric in enumerate(z["q_metrics"].tolist()):
+            for s, name in enumerate(segment_names):
+                rows = (q_metric == m) & (q_segment == s)
+                if rows.any():
+                    quantile_sketches.setdefault(metric, {})[name] = QuantileSketch(q_key[rows], q_count[rows])
+        return KPISketches(
+            segment_names=segment_names,
+            cell_segment=z["cell_segment"],
+            cell_day=z["cell_day"],
+            orders=z["orders"],
+            revenue=z["revenue"],
+            registers=z["registers"],
+            quantile_sketches=quantile_sketches,
+        )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+
+from src.analysis.sketches import KPISketches
+
+
+def find_churn_col(df: pd.DataFrame) -> str | None:
+    churn_cols = [c for c in df.columns if c.startswith("churn_")]
+    return churn_cols[0] if churn_cols else None
+
+
+def compute_kpis(
+    segments: pd.DataFrame,
+    tx: pd.DataFrame | None,
+    churn_col: str | None,
+    sketches: KPISketches | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> dict:
+    """
+    Headline numbers shown at the top of the dashboard.
+    `churn_rate` is a percentage, or None when there is no churn label.
+
+    With precomputed `sketches`, orders in [start, end] come from the segment × day
+    cells instead of the transaction rows, and `active_customers_approx` (HyperLogLog)
+    estimates how many of the selected segments' customers bought in that range.
+    """
+    churn_rate = None
+    if churn_col:
+        churn_rate = float(segments[churn_col].mean() * 100) if len(segments) else 0.0
+
+    kpis = {
+        "total_customers": int(segments.shape[0]),
+        "total_revenue": float(segments["monetary_total"].sum()),
+        "churn_rate": churn_rate,
+    }
+    if sketches is None:
+        kpis["total_orders"] = int(tx["order_id"].nunique())
+    else:
+        kpis["total_orders"] = sketches.order_count(start=start, end=end)
+        segment_names = segments["segment_name"].unique().tolist()
+        kpis["active_customers_approx"] = sketches.distinct_customers(segment_names, start, end)
+    return kpis
+
+
+def segment_summary(segments: pd.DataFrame, churn_col: str | None) -> pd.DataFrame:
+    """
+    Customers, revenue and (optionally) churn risk per segment, sorted by revenue.
+    Indexed by `segment_name`.
+    """
+    if churn_col:
+        summary = (
+            segments.groupby("segment_name")
+            .agg(
+                customers=("customer_unique_id", "count"),
+                revenue=("monetary_total", "sum"),
+                churn_rate=(churn_col, "mean"),
+            )
+            .sort_values("revenue", ascending=False)
+        )
+        summary["churn_risk_%"] = (summary["churn_rate"] * 100).round(1)
+        return summary.drop(columns=["churn_rate"])
+
+    return (
+        segments.groupby("segment_name")
+        .agg(customers=("customer_unique_id", "count"), revenue=("monetary_total", "sum"))
+        .sort_values("revenue", ascending=False)
+    )
+
+
+PRIORITY_DISPLAY_COLS = [
+    "customer_unique_id",
+    "segment_name",
+    "churn_probability_%",
+    "monetary_total",
+    "clv",
+    "avg_order_value",
+    "avg_delivery_days",
+    "avg_review_score",
+]
+
+
+def top_at_risk(segments_scored: pd.DataFrame, n: int) -> pd.DataFrame:
+    """Highest churn-probability customers, restricted to the priority display columns."""
+    available_cols = [c for c in PRIORITY_DISPLAY_COLS if c in segments_scored.columns]
+    top = segments_scored.nlargest(n, "churn_probability_%")
+    return top[available_cols]
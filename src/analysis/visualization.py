@@ -1,52 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-import matplotlib.pyplot as plt
 
+from src.config import settings
 
-def plot_segment_distribution(df: pd.DataFrame) -> None:
-    counts = df["segment_name"].value_counts().sort_values(ascending=False)
+# chart name → (report column, title, y-axis label)
+SEGMENT_CHARTS = {
+    "segment_distribution": ("customers", "Customer Distribution by Segment", "Number of Customers"),
+    "revenue_by_segment": ("revenue", "Total Revenue by Segment", "Revenue"),
+    "churn_rate_by_segment": ("churn_rate_%", "Churn Rate (%) by Segment", "Churn Rate (%)"),
+}
 
-    plt.figure()
-    counts.plot(kind="bar")
-    plt.title("Customer Distribution by Segment")
-    plt.xlabel("Segment")
-    plt.ylabel("Number of Customers")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+DEFAULT_FORMATS = ("png", "svg", "html")
+MANIFEST_NAME = "manifest.json"
 
 
-def plot_revenue_by_segment(df: pd.DataFrame) -> None:
-    revenue = (
-        df.groupby("segment_name")["monetary_total"]
-        .sum()
-        .sort_values(ascending=False)
-    )
+def segment_report_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Customers, revenue and churn rate (%) per segment in a single groupby pass.
+    The churn column is omitted when the frame has no churn label.
+    """
+    churn_cols = [c for c in df.columns if c.startswith("churn_")]
+
+    aggs = {
+        "customers": ("segment_name", "size"),
+        "revenue": ("monetary_total", "sum"),
+    }
+    if churn_cols:
+        aggs["churn_rate_%"] = (churn_cols[0], "mean")
+
+    report = df.groupby("segment_name").agg(**aggs)
+    if churn_cols:
+        report["churn_rate_%"] = report["churn_rate_%"] * 100
+    return report
 
-    plt.figure()
-    revenue.plot(kind="bar")
-    plt.title("Total Revenue by Segment")
-    plt.xlabel("Segment")
-    plt.ylabel("Revenue")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
 
+def _render_static(values: pd.Series, title: str, ylabel: str, path: Path) -> None:
+    # Figure + Agg canvas instead of pyplot: no GUI backend, no global state, safe to run in threads.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
 
-def plot_churn_rate_by_segment(df: pd.DataFrame) -> None:
-    churn_col = [c for c in df.columns if c.startswith("churn_")][0]
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.bar(values.index.astype(str), values.to_numpy())
+    ax.set_title(title)
+    ax.set_xlabel("Segment")
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(path)
 
-    churn_rate = (
-        df.groupby("segment_name")[churn_col]
-        .mean()
-        .sort_values(ascending=False)
-        * 100
+
+def _render_html(values: pd.Series, title: str, ylabel: str, path: Path) -> None:
+    import plotly.express as px
+
+    fig = px.bar(
+        x=values.index.astype(str),
+        y=values.to_numpy(),
+        labels={"x": "Segment", "y": ylabel},
+        title=title,
     )
+    fig.write_html(path, include_plotlyjs="cdn")
+
+
+def _render_one(report: pd.DataFrame, chart: str, fmt: str, out_dir: Path) -> Path:
+    column, title, ylabel = SEGMENT_CHARTS[chart]
+    values = report[column].sort_values(ascending=False)
+    path = out_dir / f"{chart}.{fmt}"
+    if fmt == "html":
+        _render_html(values, title, ylabel, path)
+    else:
+        _render_static(values, title, ylabel, path)
+    return path
+
+
+def _fingerprint(report: pd.DataFrame, formats: tuple[str, ...]) -> str:
+    payload = report.to_csv().encode("utf-8") + ",".join(formats).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def render_segment_reports(
+    df: pd.DataFrame,
+    out_dir: Path | None = None,
+    formats: tuple[str, ...] = DEFAULT_FORMATS,
+    parallel: bool = False,
+    force: bool = False,
+) -> list[Path]:
+    """
+    Render the segment charts headlessly to `reports/figures/` (or `out_dir`).
+
+    Rendering is skipped when the aggregated inputs and formats match the previous run
+    (tracked in `manifest.json`) and every file is still on disk. With `parallel=True`
+    the charts are rendered on a thread pool.
+    """
+    out_dir = out_dir or settings.root_dir / settings.reports_dir / "figures"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    report = segment_report_frame(df)
+    charts = [c for c, (column, _, _) in SEGMENT_CHARTS.items() if column in report.columns]
+    expected = [out_dir / f"{chart}.{fmt}" for chart in charts for fmt in formats]
+
+    fingerprint = _fingerprint(report, formats)
+    manifest_path = out_dir / MANIFEST_NAME
+    if not force and manifest_path.exists():
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if previous.get("fingerprint") == fingerprint and all(p.exists() for p in expected):
+            print(f"[report] Segment charts unchanged; skipping render ({out_dir})")
+            return expected
+
+    tasks = [(chart, fmt) for chart in charts for fmt in formats]
+    if parallel:
+        with ThreadPoolExecutor(max_workers=min(len(tasks), 6) or 1) as pool:
+            paths = list(pool.map(lambda task: _render_one(report, *task, out_dir), tasks))
+    else:
+        paths = [_render_one(report, chart, fmt, out_dir) for chart, fmt in tasks]
 
-    plt.figure()
-    churn_rate.plot(kind="bar")
-    plt.title("Churn Rate (%) by Segment")
-    plt.xlabel("Segment")
-    plt.ylabel("Churn Rate (%)")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    manifest = {"fingerprint": fingerprint, "files": [p.name for p in paths]}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"[report] Rendered {len(paths)} chart file(s) to {out_dir}")
+    return paths
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode
+from urllib.request import urlopen
+
+import numpy as np
+
+from src.api.server import make_server
+from src.config import settings
+
+
+def _get(url: str) -> tuple[int, bytes]:
+    try:
+        with urlopen(url, timeout=30) as resp:
+            return resp.status, resp.read()
+    except HTTPError as e:
+        return e.code, e.read()
+
+
+def _build_paths(base_url: str) -> list[tuple[str, str]]:
+    """A realistic request mix: (endpoint label, full URL)."""
+    _, body = _get(f"{base_url}/segments")
+    segments = [row["segment"] for row in json.loads(body)]
+
+    status, body = _get(f"{base_url}/customers/at-risk?n=1000")
+    customer_ids = [row["customer_unique_id"] for row in json.loads(body)] if status == 200 else []
+
+    paths = [("health", f"{base_url}/health"), ("kpis", f"{base_url}/kpis")]
+    for seg in segments:
+        q = urlencode({"segment": seg})
+        paths += [
+            ("segments", f"{base_url}/segments?{q}"),
+            ("kpis", f"{base_url}/kpis?{q}"),
+        ]
+        if customer_ids:
+            paths.append(("at-risk", f"{base_url}/customers/at-risk?n=50&{q}"))
+    for cid in customer_ids[:200]:
+        paths.append(("customer", f"{base_url}/customers/{quote(cid)}"))
+    return paths
+
+
+def run_load_test(base_url: str, concurrency: int, duration_s: float, seed: int) -> dict:
+    paths = _build_paths(base_url)
+    latencies: dict[str, list[float]] = {}
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration_s
+
+    def worker(worker_id: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed + worker_id)
+        local: dict[str, list[float]] = {}
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            label, url = rng.choice(paths)
+            t0 = time.perf_counter()
+            status, _ = _get(url)
+            local.setdefault(label, []).append(time.perf_counter() - t0)
+            if status >= 500:
+                local_errors += 1
+        with lock:
+            for label, values in local.items():
+                latencies.setdefault(label, []).extend(values)
+            errors += local_errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+
+    total = sum(len(v) for v in latencies.values())
+    summary = {"requests": total, "errors": errors, "rps": total / duration_s, "endpoints": {}}
+    for label, values in sorted(latencies.items()):
+        ms = np.asarray(values) * 1000
+        summary["endpoints"][label] = {
+            "count": int(ms.size),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+        }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local load test for the query API.")
+    parser.add_argument("--url", help="Base URL of a running API; if omitted one is started in-process")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        print("[load] Starting in-process API server...")
+        server = make_server("127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"[load] Target: {base_url} · concurrency={args.concurrency} · duration={args.duration}s")
+    try:
+        summary = run_load_test(base_url.rstrip("/"), args.concurrency, args.duration, settings.random_seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f"[load] {summary['requests']:,} requests · {summary['rps']:.0f} req/s · {summary['errors']} errors")
+    for label, stats in summary["endpoints"].items():
+        print(
+            f"[load] {label:<10} n={stats['count']:<7,} "
+            f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
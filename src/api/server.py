@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from src.api.service import QueryService
+from src.config import settings
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    GET-only JSON endpoints:
+
+      /health
+      /kpis?segment=&start=YYYY-MM-DD&end=YYYY-MM-DD&approx=1
+      /quantiles?metric=monetary_total&q=0.5,0.9&segment=
+      /segments?segment=
+      /customers/at-risk?n=50&segment=
+      /customers/<customer_unique_id>
+    """
+
+    server: "QueryServer"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        status, body = self.server.service.handle(unquote(url.path), params)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: QueryService, verbose: bool = False):
+        super().__init__(address, QueryHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def make_server(host: str, port: int, service: QueryService | None = None, verbose: bool = False) -> QueryServer:
+    return QueryServer((host, port), service or QueryService(), verbose=verbose)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the processed segments.")
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    print("[api] Loading processed data and building indexes...")
+    server = make_server(args.host, args.port, verbose=args.verbose)
+    print(f"[api] Source: {server.service.source}")
+    print(f"[api] Listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[api] Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
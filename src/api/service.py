@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.customer_index import CustomerIndex
+from src.analysis.sketches import load_kpi_sketches
+from src.analysis.summary import compute_kpis, find_churn_col, segment_summary, top_at_risk
+from src.etl.processed import load_processed_data
+from src.modeling.inference import predict_churn_proba
+
+MAX_TOP_N = 1000
+
+
+class QueryError(ValueError):
+    """Bad request parameters; reported to API callers as HTTP 400."""
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    # to_json takes care of NaN/NaT and numpy scalar types in one pass.
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def _parse_date(value: str | None, name: str) -> pd.Timestamp | None:
+    if not value:
+        return None
+    ts = pd.to_datetime(value, errors="coerce")
+    if pd.isna(ts):
+        raise QueryError(f"Invalid date for '{name}': {value!r} (expected YYYY-MM-DD)")
+    return ts.normalize()
+
+
+def _parse_int(value: str | None, name: str, default: int, low: int, high: int) -> int:
+    if value is None:
+        return default
+    try:
+        n = int(value)
+    except ValueError:
+        raise QueryError(f"Invalid integer for '{name}': {value!r}") from None
+    return max(low, min(high, n))
+
+
+class QueryService:
+    """
+    Read-only queries over the processed segments and transactions.
+
+    Everything is loaded and indexed once at start-up (customer id → row and order-history
+    slice, segment → rows, transactions sorted by purchase time), so each request is a
+    dictionary lookup or an array slice. Encoded responses are kept in a bounded LRU.
+    """
+
+    def __init__(
+        self,
+        segments: pd.DataFrame | None = None,
+        tx: pd.DataFrame | None = None,
+        source: str = "in-memory",
+        cache_size: int = 1024,
+    ):
+        # Rows loaded from data/processed can be scored straight from the mapped feature store.
+        from_store = segments is None or tx is None
+        if from_store:
+            segments, tx, source, _ = load_processed_data()
+
+        self.source = source
+        # Precomputed segment × day sketches only describe the processed data on disk.
+        self.sketches = load_kpi_sketches() if from_store else None
+        self.churn_col = find_churn_col(segments)
+        self.segments = self._score(segments.reset_index(drop=True), from_store)
+        self.tx = tx.sort_values("order_purchase_timestamp", kind="stable").reset_index(drop=True)
+
+        self._tx_ts = self.tx["order_purchase_timestamp"].to_numpy()
+        self._customers = CustomerIndex(self.segments, self.tx)
+        self._segment_rows = {
+            name: np.asarray(rows) for name, rows in self.segments.groupby("segment_name").indices.items()
+        }
+
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple, tuple[int, bytes]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ---------------------------------------------------------------
+    # Index helpers
+    # ---------------------------------------------------------------
+    def _score(self, segments: pd.DataFrame, from_store: bool = False) -> pd.DataFrame:
+        self.scored = False
+        try:
+            proba = predict_churn_proba(segments, from_store=from_store)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"[api] Scoring disabled: {e}")
+            return segments
+        segments = segments.copy()
+        segments["churn_probability"] = proba
+        segments["churn_probability_%"] = (proba * 100).clip(0, 100)
+        self.scored = True
+        return segments
+
+    def _segment_frame(self, segment: str | None) -> pd.DataFrame:
+        if not segment:
+            return self.segments
+        rows = self._segment_rows.get(segment)
+        if rows is None:
+            raise QueryError(f"Unknown segment: {segment!r}. Known: {sorted(self._segment_rows)}")
+        return self.segments.iloc[rows]
+
+    def _tx_between(self, start: pd.Timestamp | None, end: pd.Timestamp | None) -> pd.DataFrame:
+        if start is None and end is None:
+            return self.tx
+        lo = 0 if start is None else int(np.searchsorted(self._tx_ts, start.to_datetime64(), side="left"))
+        if end is None:
+            hi = int(self.tx["order_purchase_timestamp"].notna().sum())
+        else:
+            # Inclusive end date, like the dashboard's date filter.
+            hi = int(np.searchsorted(self._tx_ts, (end + pd.Timedelta(days=1)).to_datetime64(), side="left"))
+        return self.tx.iloc[lo:hi]
+
+    # ---------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "source": self.source,
+            "customers": int(self.segments.shape[0]),
+            "orders": int(self.tx.shape[0]),
+            "scored": self.scored,
+        }
+
+    def kpis(
+        self,
+        segment: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        approx: bool = False,
+    ) -> dict:
+        segments = self._segment_frame(segment)
+        start_ts, end_ts = _parse_date(start, "start"), _parse_date(end, "end")
+        if approx and self.sketches is not None:
+            kpis = compute_kpis(segments, None, self.churn_col, sketches=self.sketches, start=start_ts, end=end_ts)
+        else:
+            kpis = compute_kpis(segments, self._tx_between(start_ts, end_ts), self.churn_col)
+        return {"segment": segment, "start": start, "end": end, **kpis}
+
+    def quantiles(self, metric: str | None, qs: str | None, segment: str | None = None) -> dict:
+        if self.sketches is None:
+            raise LookupError("KPI sketches not found. Run: python main.py")
+        if not metric or metric not in self.sketches.quantile_sketches:
+            raise QueryError(f"Unknown metric: {metric!r}. Known: {sorted(self.sketches.quantile_sketches)}")
+        try:
+            levels = [float(q) for q in (qs or "0.5,0.9,0.99").split(",")]
+        except ValueError:
+            raise QueryError(f"Invalid quantiles: {qs!r} (expected e.g. 0.5,0.9)") from None
+        if segment:
+            self._segment_frame(segment)  # validates the name
+        values = self.sketches.quantiles(metric, levels, [segment] if segment else None)
+        return {"metric": metric, "segment": segment, "quantiles": dict(zip(map(str, levels), values))}
+
+    def segments_summary(self, segment: str | None = None) -> list[dict]:
+        summary = segment_summary(self._segment_frame(segment), self.churn_col)
+        return _records(summary.reset_index().rename(columns={"segment_name": "segment"}))
+
+    def at_risk(self, n: int = 50, segment: str | None = None) -> list[dict]:
+        if not self.scored:
+            raise LookupError(
+                "Model artifacts not found. Run: python -m src.modeling.train_churn_model"
+            )
+        return _records(top_at_risk(self._segment_frame(segment), n))
+
+    def customer(self, customer_unique_id: str) -> dict | None:
+        profile = self._customers.profile(customer_unique_id)
+        if profile is None:
+            return None
+        return {
+            "customer": _records(profile["customer"].to_frame().T)[0],
+            "orders": _records(profile["orders"]),
+        }
+
+    # ---------------------------------------------------------------
+    # Routing (shared by the HTTP server and the load test)
+    # ---------------------------------------------------------------
+    def handle(self, path: str, params: dict[str, str]) -> tuple[int, bytes]:
+        key = (path, tuple(sorted(params.items())))
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+
+        status, payload = self._dispatch(path, params)
+        response = (status, json.dumps(payload).encode("utf-8"))
+
+        if status == 200:
+            with self._cache_lock:
+                self._cache[key] = response
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return response
+
+    def _dispatch(self, path: str, params: dict[str, str]) -> tuple[int, object]:
+        path = path.rstrip("/") or "/"
+        segment = params.get("segment")
+        try:
+            if path == "/health":
+                return 200, self.health()
+            if path == "/kpis":
+                approx = params.get("approx", "").lower() in ("1", "true", "yes")
+                return 200, self.kpis(segment, params.get("start"), params.get("end"), approx)
+            if path == "/quantiles":
+                return 200, self.quantiles(params.get("metric"), params.get("q"), segment)
+            if path == "/segments":
+                return 200, self.segments_summary(segment)
+            if path == "/customers/at-risk":
+                n = _parse_int(params.get("n"), "n", default=50, low=1, high=MAX_TOP_N)
+                return 200, self.at_risk(n, segment)
+            if path.startswith("/customers/"):
+                customer_id = path[len("/customers/"):]
+                record = self.customer(customer_id)
+                if record is None:
+                    return 404, {"error": f"Customer not found: {customer_id}"}
+                return 200, record
+        except QueryError as e:
+            return 400, {"error": str(e)}
+        except LookupError as e:
+            return 503, {"error": str(e)}
+
+        return 404, {"error": f"Unknown endpoint: {path}"}
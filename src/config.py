@@ -4,11 +4,14 @@ import os
 from dataclasses import dataclass
 from pathlib import Path
 
-from dotenv import load_dotenv
+_DOTENV_PATH = Path(__file__).resolve().parents[1] / ".env"
 
+# Load environment variables from .env if present (local dev). Deployments configure the
+# environment directly, so skip importing python-dotenv when there is no file to read.
+if _DOTENV_PATH.exists():
+    from dotenv import load_dotenv
 
-# Load environment variables from .env if present (local dev)
-load_dotenv()
+    load_dotenv(_DOTENV_PATH)
 
 
 def _env(key: str, default: str | None = None) -> str:
@@ -32,6 +35,17 @@ class Settings:
     app_title: str = _env("APP_TITLE", "Customer Intelligence Dashboard")
     default_churn_window_days: int = int(_env("DEFAULT_CHURN_WINDOW_DAYS", "180"))
 
+    # Dashboard profiling: "1" times rerun sections; "cprofile"/"pyinstrument" also capture
+    dashboard_profile: str = _env("DASHBOARD_PROFILE", "")
+
+    # Dashboard result cache: in-process LRU size, plus an optional on-disk tier shared by workers
+    dashboard_cache_mb: int = int(_env("DASHBOARD_CACHE_MB", "256"))
+    dashboard_cache_dir: str = _env("DASHBOARD_CACHE_DIR", "")
+
+    # Query API
+    api_host: str = _env("API_HOST", "127.0.0.1")
+    api_port: int = int(_env("API_PORT", "8000"))
+
     # Reproducibility
     random_seed: int = int(_env("RANDOM_SEED", "42"))
 
@@ -1,6 +1,18 @@
 import pandas as pd
 
 from src.config import settings
+from src.etl.schemas import OLIST_SCHEMAS
+from src.utils.validation import ValidationResult, validate_tables, validation_report
+
+RAW_FILES = {
+    "orders": "olist_orders_dataset.csv",
+    "order_items": "olist_order_items_dataset.csv",
+    "customers": "olist_customers_dataset.csv",
+    "payments": "olist_order_payments_dataset.csv",
+    "reviews": "olist_order_reviews_dataset.csv",
+    "products": "olist_products_dataset.csv",
+    "category_translation": "product_category_name_translation.csv",
+}
 
 
 def load_csv(filename: str) -> pd.DataFrame:
@@ -15,15 +27,47 @@ def load_csv(filename: str) -> pd.DataFrame:
     return df
 
 
-def load_all_raw_data() -> dict:
-    data = {
-        "orders": load_csv("olist_orders_dataset.csv"),
-        "order_items": load_csv("olist_order_items_dataset.csv"),
-        "customers": load_csv("olist_customers_dataset.csv"),
-        "payments": load_csv("olist_order_payments_dataset.csv"),
-        "reviews": load_csv("olist_order_reviews_dataset.csv"),
-        "products": load_csv("olist_products_dataset.csv"),
-        "category_translation": load_csv("product_category_name_translation.csv"),
-    }
+def write_quality_outputs(results: dict[str, ValidationResult]) -> None:
+    """Data-quality report under reports/ and quarantined rows under data/processed/quarantine/."""
+    reports_dir = settings.root_dir / settings.reports_dir
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    report = validation_report(results)
+    report_path = reports_dir / "data_quality_report.csv"
+    if report_path.exists() and set(results) != set(RAW_FILES):
+        # Partial reload: keep the previous rows of the tables that were not re-read.
+        previous = pd.read_csv(report_path)
+        report = pd.concat([previous[~previous["table"].isin(list(results))], report], ignore_index=True)
+    report.to_csv(report_path, index=False)
+
+    quarantine_dir = settings.root_dir / settings.data_processed_dir / "quarantine"
+    for name, result in results.items():
+        path = quarantine_dir / f"{name}.csv"
+        if len(result.quarantine):
+            quarantine_dir.mkdir(parents=True, exist_ok=True)
+            result.quarantine.to_csv(path, index=False)
+        elif path.exists():
+            path.unlink()
+
+    for name, result in results.items():
+        print(f"[validate] {name}: {len(result.valid):,} valid · {len(result.quarantine):,} quarantined")
+    issues = report[report["status"] != "ok"]
+    for row in issues.itertuples(index=False):
+        print(f"[validate] {row.status.upper()} {row.table}.{row.column} {row.check}: {row.failed_rows:,} rows ({row.failed_rate:.2%})")
+    print(f"[validate] Report saved to: {report_path}")
+
+
+def load_all_raw_data(validate: bool = True, tables: list[str] | None = None) -> dict:
+    """
+    Load the seven Olist tables (or only `tables`). With `validate`, each table goes
+    through the declarative checks in `src.etl.schemas` (concurrently); rows failing a
+    check are quarantined and only the valid rows are returned. Foreign keys into
+    tables that were not loaded are not checked.
+    """
+    data = {name: load_csv(RAW_FILES[name]) for name in (tables or RAW_FILES)}
+
+    if validate:
+        results = validate_tables(data, OLIST_SCHEMAS)
+        write_quality_outputs(results)
+        data = {name: results[name].valid if name in results else df for name, df in data.items()}
 
     return data
\ No newline at end of file
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.analysis.geography import as_geo_categoricals
+from src.config import settings
+from src.modeling.temporal_features import with_temporal_features
+
+TX_DATETIME_COLS = [
+    "order_purchase_timestamp",
+    "order_approved_at",
+    "order_delivered_carrier_date",
+    "order_delivered_customer_date",
+    "order_estimated_delivery_date",
+]
+
+DATA_VERSION_FILENAME = "DATA_VERSION"
+
+REQUIRED_SEG_COLS = {"customer_unique_id", "segment_name", "monetary_total"}
+REQUIRED_TX_COLS = {"order_id", "order_purchase_timestamp"}
+
+
+def last_updated(path: Path) -> str:
+    ts = path.stat().st_mtime
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
+
+
+def data_version_path() -> Path:
+    return settings.root_dir / settings.data_processed_dir / DATA_VERSION_FILENAME
+
+
+def bump_data_version() -> str:
+    """
+    Record that the processed outputs changed. Dashboards key their data caches on this
+    token, so running processes reload on their next rerun instead of at restart.
+    """
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    path = data_version_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    tmp.replace(path)
+    return version
+
+
+def read_data_version() -> str:
+    path = data_version_path()
+    return path.read_text(encoding="utf-8").strip() if path.exists() else ""
+
+
+def parse_datetime_cols(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    for c in cols:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    return df
+
+
+def load_processed_data() -> tuple[pd.DataFrame, pd.DataFrame, str, bool]:
+    """
+    Load the segments and transactions tables produced by `python main.py`,
+    falling back to the committed demo sample.
+
+    Returns (segments, transactions, source description, demo_mode).
+    """
+    processed_dir = settings.root_dir / settings.data_processed_dir
+    seg_path = processed_dir / "customer_segments.csv"
+    tx_path = processed_dir / "transactions.csv"
+
+    demo_seg_path = settings.root_dir / "data" / "demo" / "customer_segments_demo.csv"
+    demo_tx_path = settings.root_dir / "data" / "demo" / "transactions_demo.csv"
+
+    demo_mode = False
+    if seg_path.exists() and tx_path.exists():
+        segments = pd.read_csv(seg_path)
+        tx = pd.read_csv(tx_path)
+        source = f"processed (local) · updated {last_updated(seg_path)}"
+
+        # Forward-looking value per customer (see src.modeling.clv), when it has been fitted.
+        clv_path = processed_dir / "customer_clv.csv"
+        if clv_path.exists():
+            segments = segments.merge(pd.read_csv(clv_path), on="customer_unique_id", how="left")
+    elif demo_seg_path.exists() and demo_tx_path.exists():
+        segments = pd.read_csv(demo_seg_path)
+        tx = pd.read_csv(demo_tx_path)
+        source = f"demo sample (cloud) · updated {last_updated(demo_seg_path)}"
+        demo_mode = True
+    else:
+        raise FileNotFoundError(
+            "No data found.\n\n"
+            "Local: run `python main.py` to generate `data/processed/*.csv`\n"
+            "Cloud: commit `data/demo/*.csv` so the app can load sample data."
+        )
+
+    tx = parse_datetime_cols(tx, TX_DATETIME_COLS)
+    segments = parse_datetime_cols(segments, ["last_purchase"])
+    tx = as_geo_categoricals(tx)
+    segments = as_geo_categoricals(segments)
+    segments = with_temporal_features(segments, tx)
+
+    # Ensure churn dtype is clean if it comes as 0/1 in some environments
+    for c in segments.columns:
+        if c.startswith("churn_") and segments[c].dtype != bool:
+            segments[c] = segments[c].astype(bool)
+
+    if not REQUIRED_SEG_COLS.issubset(set(segments.columns)):
+        raise ValueError(f"Segments missing columns: {sorted(REQUIRED_SEG_COLS - set(segments.columns))}")
+    if not REQUIRED_TX_COLS.issubset(set(tx.columns)):
+        raise ValueError(f"Transactions missing columns: {sorted(REQUIRED_TX_COLS - set(tx.columns))}")
+
+    return segments, tx, source, demo_mode
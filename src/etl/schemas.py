@@ -0,0 +1,78 @@
+from src.utils.validation import ColumnRule, ForeignKey, TableSchema
+
+ORDER_STATUSES = (
+    "delivered",
+    "shipped",
+    "canceled",
+    "unavailable",
+    "invoiced",
+    "processing",
+    "created",
+    "approved",
+)
+
+OLIST_SCHEMAS = {
+    "orders": TableSchema(
+        name="orders",
+        columns=(
+            ColumnRule("order_id", nullable=False, unique=True),
+            ColumnRule("customer_id", nullable=False),
+            ColumnRule("order_status", nullable=False, allowed=ORDER_STATUSES),
+            ColumnRule("order_purchase_timestamp", dtype="datetime", nullable=False),
+            ColumnRule("order_delivered_customer_date", dtype="datetime", max_null_rate=0.10),
+        ),
+        foreign_keys=(ForeignKey("customer_id", "customers", "customer_id"),),
+    ),
+    "order_items": TableSchema(
+        name="order_items",
+        columns=(
+            ColumnRule("order_id", nullable=False),
+            ColumnRule("price", dtype="numeric", nullable=False, min_value=0),
+            ColumnRule("freight_value", dtype="numeric", min_value=0, max_null_rate=0.01),
+        ),
+        primary_key=("order_id", "order_item_id"),
+        foreign_keys=(
+            ForeignKey("order_id", "orders", "order_id"),
+            ForeignKey("product_id", "products", "product_id"),
+        ),
+    ),
+    "customers": TableSchema(
+        name="customers",
+        columns=(
+            ColumnRule("customer_id", nullable=False, unique=True),
+            ColumnRule("customer_unique_id", nullable=False),
+        ),
+    ),
+    "payments": TableSchema(
+        name="payments",
+        columns=(
+            ColumnRule("order_id", nullable=False),
+            ColumnRule("payment_value", dtype="numeric", nullable=False, min_value=0),
+        ),
+        primary_key=("order_id", "payment_sequential"),
+        foreign_keys=(ForeignKey("order_id", "orders", "order_id"),),
+    ),
+    "reviews": TableSchema(
+        name="reviews",
+        columns=(
+            ColumnRule("order_id", nullable=False),
+            ColumnRule("review_score", dtype="numeric", min_value=1, max_value=5, max_null_rate=0.05),
+        ),
+        primary_key=("review_id", "order_id"),
+        foreign_keys=(ForeignKey("order_id", "orders", "order_id"),),
+    ),
+    "products": TableSchema(
+        name="products",
+        columns=(
+            ColumnRule("product_id", nullable=False, unique=True),
+            ColumnRule("product_category_name", max_null_rate=0.05),
+        ),
+    ),
+    "category_translation": TableSchema(
+        name="category_translation",
+        columns=(
+            ColumnRule("product_category_name", nullable=False, unique=True),
+            ColumnRule("product_category_name_english", nullable=False),
+        ),
+    ),
+}
@@ -1,5 +1,6 @@
 import pandas as pd
 
+from src.analysis.geography import GEO_COLS, as_geo_categoricals
 from src.utils.validation import require_columns
 
 
@@ -62,8 +63,10 @@ def build_transaction_table(data: dict) -> pd.DataFrame:
         on="order_id",
         how="left",
     )
+    # Location columns are optional (not every export has them); carried as categoricals.
+    geo_cols = [c for c in GEO_COLS if c in customers.columns]
     df = df.merge(
-        customers[["customer_id", "customer_unique_id"]],
+        as_geo_categoricals(customers[["customer_id", "customer_unique_id", *geo_cols]].copy()),
         on="customer_id",
         how="left",
     )
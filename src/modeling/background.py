@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Hashable
+
+import pandas as pd
+
+from src.modeling.inference import load_model_artifacts, model_matrix, predict_positive
+
+
+@dataclass
+class ScoringJob:
+    """
+    One background scoring run. Scores are produced chunk by chunk so callers
+    can show progress and partial results while the job is still running.
+    """
+
+    key: Hashable
+    total: int
+    scored: int = 0
+    chunks: list[pd.Series] = field(default_factory=list)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    watchers: set[str] = field(default_factory=set)
+    future: Future | None = None
+
+    @property
+    def progress(self) -> float:
+        return (self.scored / self.total) if self.total else 1.0
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def partial(self) -> pd.Series:
+        chunks = list(self.chunks)
+        if not chunks:
+            return pd.Series(dtype=float, name="churn_probability")
+        return pd.concat(chunks)
+
+    def result(self) -> pd.Series:
+        if self.future is None:
+            raise RuntimeError(f"Scoring job {self.key!r} was never started")
+        return self.future.result()
+
+
+class BackgroundScorer:
+    """
+    Runs churn scoring on a small thread pool so the dashboard script never blocks
+    inside `predict_proba`.
+
+    - Jobs are keyed by the caller (e.g. filter state + model version); identical
+      requests share one job, and completed results are kept in a bounded LRU so
+      reruns and other sessions reuse them.
+    - Each session watches at most one job. When a session submits a new key, its
+      previous job is cancelled unless another session is still waiting on it.
+    """
+
+    def __init__(self, max_workers: int = 2, chunk_size: int = 5000, max_results: int = 16):
+        self.chunk_size = chunk_size
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+        self._lock = threading.Lock()
+        self._jobs: dict[Hashable, ScoringJob] = {}
+        self._results: OrderedDict[Hashable, ScoringJob] = OrderedDict()
+        self._session_keys: dict[str, Hashable] = {}
+
+    def submit(self, key: Hashable, features_df: pd.DataFrame, session_id: str) -> ScoringJob:
+        with self._lock:
+            self._release_previous(session_id, key)
+            self._session_keys[session_id] = key
+
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled:
+                job.watchers.add(session_id)
+                return job
+
+            job = ScoringJob(key=key, total=int(features_df.shape[0]), watchers={session_id})
+            self._jobs[key] = job
+            job.future = self._executor.submit(self._run, job, features_df)
+            return job
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                job.cancel_event.set()
+
+    def _release_previous(self, session_id: str, new_key: Hashable) -> None:
+        prev_key = self._session_keys.get(session_id)
+        if prev_key is None or prev_key == new_key:
+            return
+        prev = self._jobs.get(prev_key)
+        if prev is None:
+            return
+        prev.watchers.discard(session_id)
+        if not prev.watchers and not prev.done:
+            prev.cancel_event.set()
+
+    def _forget(self, job: ScoringJob) -> None:
+        # A cancelled job may already have been replaced by a fresh one for the same key.
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+
+    def _run(self, job: ScoringJob, features_df: pd.DataFrame) -> pd.Series | None:
+        try:
+            model, feature_cols, _ = load_model_artifacts()
+            X = model_matrix(features_df, feature_cols, from_store=True)
+
+            for start in range(0, job.total, self.chunk_size):
+                if job.cancelled:
+                    break
+                X_chunk = X[start:start + self.chunk_size]
+                proba = predict_positive(model, X_chunk, feature_cols)
+                index = features_df.index[start:start + len(X_chunk)]
+                job.chunks.append(pd.Series(proba, index=index, name="churn_probability"))
+                job.scored = start + len(X_chunk)
+
+            result = job.partial().reindex(features_df.index)
+            result.name = "churn_probability"
+        except BaseException:
+            with self._lock:
+                self._forget(job)
+            raise
+
+        with self._lock:
+            self._forget(job)
+            if job.cancelled:
+                return None
+            self._results[job.key] = job
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
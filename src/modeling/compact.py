@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import pickle
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PARITY_TOLERANCE = 1e-6
+
+
+@dataclass
+class CompactForest:
+    """
+    A fitted tree ensemble flattened into plain arrays.
+
+    All trees share one node table (global node ids); `roots[t]` is the root of tree t.
+    Leaves point to themselves, so every tree can be walked for `max_depth` steps in
+    lock-step: one gather per level for all rows × trees, no Python loop over trees.
+    `value` holds each node's class-1 probability (sklearn's normalized leaf value).
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    n_features: int
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompactForest":
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+            v = tree.value[:, 0, :]
+            value.append(v[:, 1] / v.sum(axis=1))
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            value=np.concatenate(value).astype(np.float32),
+            roots=offsets.astype(np.int32),
+            max_depth=int(max(t.max_depth for t in trees)),
+            n_features=int(model.n_features_in_),
+        )
+
+    def leaf_ids(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf node id reached by each row in each tree, shape (n_rows, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_base = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            # float32 features vs float64 thresholds, exactly like sklearn's tree traversal.
+            go_left = flat.take(row_base + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        return node
+
+    def predict_proba(self, X, chunk_size: int = 4096) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        p1 = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.leaf_ids(X[start:start + chunk_size])
+            p1[start:start + chunk_size] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return np.column_stack([1 - p1, p1])
+
+    def contributions(self, X: np.ndarray, chunk_size: int = 1024) -> tuple[float, np.ndarray]:
+        """
+        Path-based (Saabas) feature contributions to the class-1 probability.
+
+        Walking a tree from root to leaf, each split moves the node value by
+        value[child] - value[node]; that change is credited to the split feature.
+        Averaged over trees, `bias + contributions.sum(axis=1)` equals predict_proba.
+        Same lock-step walk as `leaf_ids`: per level, one gather for all rows × trees
+        and one bincount into (row, feature) cells.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_trees = self.roots.size
+        out = np.zeros((n_rows, n_features), dtype=np.float64)
+        value = self.value.astype(np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            chunk = X[start:start + chunk_size]
+            n = chunk.shape[0]
+            flat = chunk.ravel()
+            row_base = (np.arange(n) * n_features)[:, None]  # also the row's first (row, feature) cell
+            node = np.broadcast_to(self.roots, (n, n_trees)).copy()
+            acc = np.zeros(n * n_features, dtype=np.float64)
+            for _ in range(self.max_depth):
+                feat = self.feature.take(node)
+                go_left = flat.take(row_base + feat) <= self.threshold.take(node)
+                child = np.where(go_left, self.left.take(node), self.right.take(node))
+                # Leaves point to themselves, so finished paths add a zero delta.
+                delta = value.take(child) - value.take(node)
+                acc += np.bincount((row_base + feat).ravel(), weights=delta.ravel(), minlength=n * n_features)
+                node = child
+            out[start:start + n] = acc.reshape(n, n_features) / n_trees
+
+        bias = float(value.take(self.roots).mean())
+        return bias, out
+
+    def save(self, path: Path) -> None:
+        # Uncompressed: loading is a straight read of a few contiguous arrays.
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            meta=np.array([self.max_depth, self.n_features]),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompactForest":
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in ("feature", "threshold", "left", "right", "value", "roots")}
+            max_depth, n_features = (int(v) for v in data["meta"])
+        return cls(max_depth=max_depth, n_features=n_features, **arrays)
+
+
+def is_exportable(model) -> bool:
+    """Tree ensembles whose predict_proba is the mean of per-tree leaf probabilities (RF/ExtraTrees)."""
+    estimators = getattr(model, "estimators_", None)
+    return (
+        isinstance(estimators, list)
+        and len(estimators) > 0
+        and hasattr(estimators[0], "tree_")
+        and getattr(model, "n_classes_", 0) == 2
+    )
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def compare_with_sklearn(model, compact: CompactForest, X: pd.DataFrame, compact_path: Path) -> dict:
+    """
+    Parity and cost of the compact export against the sklearn estimator on `X`.
+    Raises if probabilities differ by more than PARITY_TOLERANCE.
+    """
+    X_arr = np.asarray(X, dtype=np.float32)
+    expected = model.predict_proba(X)[:, 1]
+    actual = compact.predict_proba(X_arr)[:, 1]
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X_arr) else 0.0
+    if max_diff > PARITY_TOLERANCE:
+        raise AssertionError(
+            f"Compact model diverges from sklearn predict_proba (max abs diff {max_diff:.2e})"
+        )
+
+    pickled = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    single, single_arr = X.iloc[:1], X_arr[:1]
+    return {
+        "max_abs_diff": max_diff,
+        "sklearn_bytes": len(pickled),
+        "compact_bytes": compact_path.stat().st_size,
+        "sklearn_load_ms": _best_of(lambda: pickle.loads(pickled)) * 1000,
+        "compact_load_ms": _best_of(lambda: CompactForest.load(compact_path)) * 1000,
+        "sklearn_batch_ms": _best_of(lambda: model.predict_proba(X)) * 1000,
+        "compact_batch_ms": _best_of(lambda: compact.predict_proba(X_arr)) * 1000,
+        "sklearn_single_ms": _best_of(lambda: model.predict_proba(single)) * 1000,
+        "compact_single_ms": _best_of(lambda: compact.predict_proba(single_arr)) * 1000,
+        "rows": int(len(X_arr)),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"[export] Parity vs sklearn predict_proba: max abs diff {report['max_abs_diff']:.2e}")
+    print(f"[export] Size:   sklearn {report['sklearn_bytes'] / 1e6:.2f} MB · compact {report['compact_bytes'] / 1e6:.2f} MB")
+    print(f"[export] Load:   sklearn {report['sklearn_load_ms']:.1f} ms · compact {report['compact_load_ms']:.1f} ms")
+    print(
+        f"[export] Batch ({report['rows']:,} rows): sklearn {report['sklearn_batch_ms']:.1f} ms · "
+        f"compact {report['compact_batch_ms']:.1f} ms"
+    )
+    print(f"[export] Single row: sklearn {report['sklearn_single_ms']:.2f} ms · compact {report['compact_single_ms']:.2f} ms")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.compact import CompactForest, is_exportable
+from src.modeling.feature_store import ID_COL, open_feature_store
+from src.modeling.inference import load_model_artifacts, model_matrix
+
+MAX_CACHED_CUSTOMERS = 100_000
+
+# (model version, customer id) -> contribution row. Only rows read from the feature
+# store are cached, and the cache is dropped when the store is rebuilt.
+_cache: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+_cache_state: dict[str, object] = {"store": None}
+_compact: dict[str, tuple[CompactForest, float]] = {}
+_lock = threading.Lock()
+
+
+def _forest(model, version: str) -> tuple[CompactForest, float]:
+    """`model` (of `version`) as a CompactForest, converted once per version if only the pickle exists."""
+    with _lock:
+        if version in _compact:
+            return _compact[version]
+    if not isinstance(model, CompactForest):
+        if not is_exportable(model):
+            raise TypeError(f"Per-customer explanations need a tree ensemble, not {type(model).__name__}")
+        model = CompactForest.from_sklearn(model)
+    bias = float(model.value.astype(np.float64).take(model.roots).mean())
+    with _lock:
+        _compact.clear()
+        _compact[version] = (model, bias)
+    return model, bias
+
+
+def explain_churn(features_df: pd.DataFrame, from_store: bool = False) -> tuple[float, pd.DataFrame]:
+    """
+    Per-customer contributions of each model feature to the churn probability, for the
+    rows of `features_df` (same index). Returns (bias, contributions): the bias is the
+    forest's average prior, and bias + the row sum is the customer's churn probability.
+
+    With `from_store=True`, rows computed before for the same model version are served
+    from an in-process cache; only the missing customers go through the forest, in one batch.
+    """
+    model, feature_cols, version = load_model_artifacts()
+    forest, bias = _forest(model, version)
+
+    store = open_feature_store() if from_store else None
+    if store is None or ID_COL not in features_df.columns:
+        contributions = forest.contributions(model_matrix(features_df, feature_cols))[1]
+        return bias, pd.DataFrame(contributions, index=features_df.index, columns=feature_cols)
+
+    ids = features_df[ID_COL].astype(str).to_numpy()
+    with _lock:
+        if _cache_state["store"] is not store:
+            _cache.clear()
+            _cache_state["store"] = store
+        rows = [_cache.get((version, i)) for i in ids]
+        for i, row in zip(ids, rows):
+            if row is not None:
+                _cache.move_to_end((version, i))
+
+    missing = [k for k, row in enumerate(rows) if row is None]
+    if missing:
+        X = model_matrix(features_df.iloc[missing], feature_cols, from_store=True)
+        computed = forest.contributions(X)[1]
+        with _lock:
+            for k, row in zip(missing, computed):
+                rows[k] = row
+                _cache[(version, ids[k])] = row
+            while len(_cache) > MAX_CACHED_CUSTOMERS:
+                _cache.popitem(last=False)
+
+    return bias, pd.DataFrame(np.vstack(rows), index=features_df.index, columns=feature_cols)
+
+
+def top_drivers(contributions: pd.DataFrame, k: int = 3) -> pd.Series:
+    """'feature (+x.x pp)' for the k features pushing each customer's risk up the most."""
+    values = contributions.to_numpy()
+    order = np.argsort(-values, axis=1)[:, :k]
+    cols = np.asarray(contributions.columns)
+    labels = []
+    for r, idx in enumerate(order):
+        parts = [f"{cols[j]} ({values[r, j] * 100:+.1f} pp)" for j in idx if values[r, j] > 0]
+        labels.append(", ".join(parts))
+    return pd.Series(labels, index=contributions.index, name="top_drivers")
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.modeling.features import share_categories
+
+ID_COL = "customer_unique_id"
+
+STORE_DIRNAME = "feature_store"
+MATRIX_FILENAME = "features.npy"
+IDS_FILENAME = "ids.npy"
+TARGET_FILENAME = "target.npy"
+META_FILENAME = "meta.json"
+
+_open_lock = threading.Lock()
+_open_cache: dict[str, object] = {"key": None, "store": None}
+
+
+def store_dir() -> Path:
+    return settings.root_dir / settings.data_processed_dir / STORE_DIRNAME
+
+
+def _source_csv() -> Path:
+    return settings.root_dir / settings.data_processed_dir / "customer_features.csv"
+
+
+def _fingerprint(path: Path) -> str | None:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _save_npy(out_dir: Path, filename: str, array: np.ndarray) -> None:
+    # Write next to the target and rename, so readers that already mapped the old file
+    # keep their (still valid) inode and new readers only ever see a complete array.
+    fd, tmp = tempfile.mkstemp(prefix=f".{filename}-", suffix=".npy", dir=out_dir)
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, out_dir / filename)
+
+
+def write_feature_store(
+    features: pd.DataFrame,
+    feature_cols: list[str],
+    target_col: str | None = None,
+) -> Path:
+    """
+    Persist the model-ready feature matrix (`features[feature_cols].fillna(0)`) as one
+    C-contiguous float32 .npy, plus the customer ids and, optionally, the training target.
+
+    float32 is what the tree models evaluate on anyway (sklearn casts its input), so
+    scores from the stored matrix match scores from the CSV. meta.json is written last
+    and records a fingerprint of customer_features.csv so stale stores are ignored.
+    """
+    out_dir = store_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    X = np.ascontiguousarray(features[feature_cols].fillna(0).to_numpy(dtype=np.float32))
+    ids = features[ID_COL].astype(str).to_numpy(dtype=str)
+
+    _save_npy(out_dir, MATRIX_FILENAME, X)
+    _save_npy(out_dir, IDS_FILENAME, ids)
+    if target_col is not None:
+        _save_npy(out_dir, TARGET_FILENAME, features[target_col].astype(np.int8).to_numpy())
+
+    meta = {
+        "columns": list(feature_cols),
+        "categories": share_categories(feature_cols),
+        "n_rows": int(X.shape[0]),
+        "dtype": str(X.dtype),
+        "target": target_col,
+        "source_fingerprint": _fingerprint(_source_csv()),
+    }
+    fd, tmp = tempfile.mkstemp(prefix=f".{META_FILENAME}-", dir=out_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, out_dir / META_FILENAME)
+
+    return out_dir
+
+
+@dataclass(frozen=True)
+class FeatureStore:
+    """
+    Read-only, memory-mapped view of the persisted feature matrix. Every process that
+    opens it maps the same files, so they share one page-cache copy of the data.
+    """
+
+    path: Path
+    X: np.ndarray
+    ids: np.ndarray
+    columns: tuple[str, ...]
+    target: np.ndarray | None = None
+    target_name: str | None = None
+    categories: tuple[str, ...] = ()  # of the share columns; their `other` is relative to these
+
+    @cached_property
+    def _id_index(self) -> pd.Index:
+        return pd.Index(self.ids)
+
+    def covers(self, cols: Iterable[str]) -> bool:
+        return set(cols) <= set(self.columns)
+
+    def matrix(self, cols: list[str]) -> np.ndarray:
+        """Columns `cols` for all rows; the mapped array itself when they match the stored layout."""
+        if list(cols) == list(self.columns):
+            return self.X
+        return self.X[:, [self.columns.index(c) for c in cols]]
+
+    def rows(self, ids: Iterable[str], cols: list[str]) -> np.ndarray | None:
+        """
+        Rows for `ids` (in that order) restricted to `cols`, or None if any id is unknown.
+        The full population in stored order is returned without copying.
+        """
+        if not self.covers(cols):
+            return None
+        positions = self._id_index.get_indexer(pd.Index(ids).astype(str))
+        if (positions < 0).any():
+            return None
+        if len(positions) == len(self.ids) and np.array_equal(positions, np.arange(len(self.ids))):
+            return self.matrix(cols)
+        if list(cols) == list(self.columns):
+            return self.X[positions]
+        return self.X[np.ix_(positions, [self.columns.index(c) for c in cols])]
+
+
+def open_feature_store() -> FeatureStore | None:
+    """
+    Map the store written by `python main.py`, or return None when it is missing,
+    incomplete, or older than customer_features.csv. The mapping is reused within a
+    process until meta.json changes.
+    """
+    out_dir = store_dir()
+    meta_path = out_dir / META_FILENAME
+    try:
+        stat = meta_path.stat()
+    except FileNotFoundError:
+        return None
+    source = _fingerprint(_source_csv())
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino, source)
+
+    with _open_lock:
+        if _open_cache["key"] == key:
+            return _open_cache["store"]  # type: ignore[return-value]
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        store = None
+        if source is None or meta.get("source_fingerprint") == source:
+            try:
+                X = np.load(out_dir / MATRIX_FILENAME, mmap_mode="r")
+                ids = np.load(out_dir / IDS_FILENAME, mmap_mode="r")
+                target_path = out_dir / TARGET_FILENAME
+                target = np.load(target_path, mmap_mode="r") if meta.get("target") and target_path.exists() else None
+            except (FileNotFoundError, ValueError):
+                X = None
+            if X is not None and X.shape == (meta["n_rows"], len(meta["columns"])) and len(ids) == meta["n_rows"]:
+                store = FeatureStore(
+                    path=out_dir,
+                    X=X,
+                    ids=ids,
+                    columns=tuple(meta["columns"]),
+                    target=target if target is not None and len(target) == meta["n_rows"] else None,
+                    target_name=meta.get("target"),
+                    categories=tuple(meta.get("categories", share_categories(meta["columns"]))),
+                )
+
+        _open_cache["key"], _open_cache["store"] = key, store
+        return store
@@ -1,5 +1,44 @@
+from typing import Iterable
+
 import pandas as pd
 
+from src.modeling.temporal_features import TEMPORAL_FEATURE_COLS
+
+# Category share columns are named CATEGORY_SHARE_PREFIX + category (see
+# src.analysis.products.category_share_features), plus `<prefix>other` and n_categories.
+CATEGORY_SHARE_PREFIX = "cat_share_"
+
+# Model inputs, shared by training, the persisted feature store and inference.
+FEATURE_COLS = [
+    # "recency_days",  # removed to prevent target leakage
+    "frequency_orders",
+    "monetary_total",
+    "avg_order_value",
+    "avg_review_score",
+    "avg_delivery_days",
+]
+
+# Data-dependent inputs, used when the features carry them: the order-history features
+# from the pipeline's temporal pass, and the category shares (the category list is fixed
+# by the model that uses them, see src.modeling.inference.model_categories).
+def is_category_feature(col: str) -> bool:
+    return col.startswith(CATEGORY_SHARE_PREFIX) or col == "n_categories"
+
+
+def share_categories(columns: Iterable[str]) -> list[str]:
+    """Categories behind the share columns among `columns`, in column order (without `other`)."""
+    other = f"{CATEGORY_SHARE_PREFIX}other"
+    return [c[len(CATEGORY_SHARE_PREFIX):] for c in columns if c.startswith(CATEGORY_SHARE_PREFIX) and c != other]
+
+
+def model_feature_cols(features: pd.DataFrame) -> list[str]:
+    """FEATURE_COLS plus whichever order-history and category features `features` carries."""
+    return (
+        list(FEATURE_COLS)
+        + [c for c in TEMPORAL_FEATURE_COLS if c in features.columns]
+        + [c for c in features.columns if is_category_feature(c)]
+    )
+
 
 def build_customer_features(transactions: pd.DataFrame, churn_window_days: int = 90) -> pd.DataFrame:
     """
@@ -20,8 +59,10 @@ def build_customer_features(transactions: pd.DataFrame, churn_window_days: int =
     features = (
         tx.groupby("customer_unique_id")
         .agg(
+            first_purchase=("order_purchase_timestamp", "min"),
             last_purchase=("order_purchase_timestamp", "max"),
-            frequency_orders=("order_id", "nunique"),
+            # One row per order (see build_transaction_table), so a count is the distinct count.
+            frequency_orders=("order_id", "count"),
             monetary_total=("revenue", "sum"),
             avg_review_score=("review_score", "mean"),
             avg_delivery_days=("delivery_days", "mean"),
@@ -30,6 +71,7 @@ def build_customer_features(transactions: pd.DataFrame, churn_window_days: int =
     )
 
     features["recency_days"] = (snapshot_date - features["last_purchase"]).dt.days
+    features["tenure_days"] = (snapshot_date - features["first_purchase"]).dt.days
     features["avg_order_value"] = features["monetary_total"] / features["frequency_orders"]
 
     features[f"churn_{churn_window_days}d"] = features["recency_days"] > churn_window_days
@@ -37,6 +79,7 @@ def build_customer_features(transactions: pd.DataFrame, churn_window_days: int =
     cols = [
         "customer_unique_id",
         "recency_days",
+        "tenure_days",
         "frequency_orders",
         "monetary_total",
         "avg_order_value",
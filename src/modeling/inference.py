@@ -1,36 +1,184 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
-from joblib import load
 
-from src.config import settings
+from src.modeling.compact import CompactForest
+from src.modeling.feature_store import ID_COL, open_feature_store
+from src.modeling.features import is_category_feature, share_categories
+from src.modeling.registry import (
+    COMPACT_FILENAME,
+    CURRENT_POINTER,
+    FEATURES_FILENAME,
+    MODEL_FILENAME,
+    models_dir,
+    read_metadata,
+    version_dir,
+)
 
+MAX_LOADED_VERSIONS = 3
+LEGACY_PREFIX = "legacy:"
 
-def load_model_artifacts() -> tuple[Any, list[str]]:
-    models_dir = settings.root_dir / settings.models_dir
-    model_path = models_dir / "churn_model.joblib"
-    cols_path = models_dir / "churn_features.joblib"
+_loaded: OrderedDict[str, tuple[Any, list[str], str]] = OrderedDict()
+_loaded_lock = threading.Lock()
+_pointer_cache: dict[str, Any] = {"stat": None, "version_id": None}
+_pointer_lock = threading.Lock()
 
-    if not model_path.exists() or not cols_path.exists():
+
+def _resolve_current() -> str | None:
+    """
+    Version id from the CURRENT pointer. The file is only re-read when its stat
+    changes, so calling this on every rerun is a single stat().
+    """
+    pointer = models_dir() / CURRENT_POINTER
+    with _pointer_lock:
+        try:
+            stat = pointer.stat()
+        except FileNotFoundError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if _pointer_cache["stat"] != key:
+            _pointer_cache["version_id"] = pointer.read_text(encoding="utf-8").strip() or None
+            _pointer_cache["stat"] = key
+        return _pointer_cache["version_id"]
+
+
+def _active() -> tuple[str, tuple[Path, Path, Path]]:
+    """
+    (version, artifact paths) from one read of CURRENT, so the key a model is cached
+    under always names the files it was loaded from. The version is the published id,
+    or a size + mtime fingerprint of legacy flat artifacts.
+    """
+    version_id = _resolve_current()
+    base = version_dir(version_id) if version_id else models_dir()
+    paths = (base / MODEL_FILENAME, base / FEATURES_FILENAME, base / COMPACT_FILENAME)
+    if version_id:
+        return version_id, paths
+
+    parts = []
+    for path in paths:
+        if path.exists():
+            stat = path.stat()
+            parts.append(f"{stat.st_size}-{stat.st_mtime_ns}")
+        else:
+            parts.append("missing")
+    return LEGACY_PREFIX + ":".join(parts), paths
+
+
+def model_version() -> str:
+    """
+    Identifier of the model that `load_model_artifacts` would return right now. Used to
+    key cached scores so a new or rolled-back model never reuses stale results; code that
+    also loads the model should use the version `load_model_artifacts` returns instead.
+    """
+    return _active()[0]
+
+
+def load_model_artifacts() -> tuple[Any, list[str], str]:
+    """
+    Load the churn model, its feature list and its version for the active version. The
+    compact array export is preferred when present; the sklearn pickle is the fallback.
+    Loaded versions are kept in-process, so switching CURRENT back and forth does not
+    reload from disk.
+    """
+    version, (model_path, cols_path, compact_path) = _active()
+    with _loaded_lock:
+        if version in _loaded:
+            _loaded.move_to_end(version)
+            return _loaded[version]
+
+    if not cols_path.exists() or not (compact_path.exists() or model_path.exists()):
         raise FileNotFoundError(
             "Model artifacts not found. Run: python -m src.modeling.train_churn_model"
         )
 
-    model = load(model_path)
+    from joblib import load
+
+    model = CompactForest.load(compact_path) if compact_path.exists() else load(model_path)
     feature_cols = load(cols_path)
 
-    return model, feature_cols
+    with _loaded_lock:
+        _loaded[version] = (model, feature_cols, version)
+        while len(_loaded) > MAX_LOADED_VERSIONS:
+            _loaded.popitem(last=False)
+
+    return model, feature_cols, version
+
+
+def model_categories() -> list[str] | None:
+    """
+    Ordered category list behind the active model's share features: recorded in its
+    registry metadata, or read off its feature columns for older versions. None when no
+    model is published or it uses no category features; the pipeline then picks the
+    top categories of the data.
+    """
+    try:
+        _, feature_cols, version = load_model_artifacts()
+    except FileNotFoundError:
+        return None
+    if not any(is_category_feature(c) for c in feature_cols):
+        return None
+    categories = None if version.startswith(LEGACY_PREFIX) else read_metadata(version).get("categories")
+    return list(categories) if categories is not None else share_categories(feature_cols)
+
+
+def model_matrix(features_df: pd.DataFrame, feature_cols: list[str], from_store: bool = False) -> np.ndarray:
+    """
+    float32 model input for the rows of features_df. With `from_store=True` the rows are
+    looked up by customer id in the memory-mapped feature store (no copy for the full
+    population); callers passing edited feature values must leave it off. Falls back
+    to features_df when the store is missing, stale, lacks any of the ids or was built
+    for other categories.
+
+    Raises ValueError when a training feature is missing, or the category shares were
+    built for a different category list (their `other` share would mean something
+    else): scoring on stand-in zeros would look fine and be wrong.
+    """
+    categories = share_categories(feature_cols)
+    if from_store and ID_COL in features_df.columns:
+        store = open_feature_store()
+        if store is not None and (not categories or list(store.categories) == categories):
+            X = store.rows(features_df[ID_COL], feature_cols)
+            if X is not None:
+                return X
+    missing = [c for c in feature_cols if c not in features_df.columns]
+    if missing:
+        raise ValueError(
+            f"Features lack {len(missing)} column(s) the model was trained on: {missing}. "
+            "Run: python main.py"
+        )
+    if categories and share_categories(features_df.columns) != categories:
+        raise ValueError(
+            f"Category shares were built for {share_categories(features_df.columns)}, "
+            f"the model expects {categories}. Run: python main.py"
+        )
+    return features_df[feature_cols].fillna(0).to_numpy(dtype=np.float32)
+
+
+def predict_positive(model: Any, X: np.ndarray, feature_cols: list[str]) -> np.ndarray:
+    if not isinstance(model, CompactForest):
+        # sklearn estimators were fitted on named columns.
+        X = pd.DataFrame(X, columns=feature_cols)
+    return model.predict_proba(X)[:, 1]
+
+
+def score_churn(features_df: pd.DataFrame, from_store: bool = False) -> tuple[pd.Series, str]:
+    """`predict_churn_proba` plus the version of the model that produced the scores."""
+    model, feature_cols, version = load_model_artifacts()
+    X = model_matrix(features_df, feature_cols, from_store=from_store)
+    proba = predict_positive(model, X, feature_cols)
+    return pd.Series(proba, index=features_df.index, name="churn_probability"), version
 
 
-def predict_churn_proba(features_df: pd.DataFrame) -> pd.Series:
+def predict_churn_proba(features_df: pd.DataFrame, from_store: bool = False) -> pd.Series:
     """
     Return churn probability for each row in features_df.
-    features_df must contain the same feature columns used in training.
+    features_df must contain the same feature columns used in training
+    (or, with `from_store=True`, customer ids present in the feature store).
     """
-    model, feature_cols = load_model_artifacts()
-    X = features_df[feature_cols].fillna(0)
-    proba = model.predict_proba(X)[:, 1]
-    return pd.Series(proba, index=features_df.index, name="churn_probability")
\ No newline at end of file
+    return score_churn(features_df, from_store=from_store)[0]
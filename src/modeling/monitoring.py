@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+BASELINE_FILENAME = "drift_baseline.npz"
+REPORT_FILENAME = "drift_report.json"
+HISTORY_FILENAME = "drift_history.jsonl"
+SCORE_COL = "churn_probability"
+
+FEATURE_BINS = 10  # training-data deciles
+SCORE_BINS = 20  # fixed-width bins over [0, 1]
+
+# (warn, alert) levels; PSI 0.1 / 0.25 are the usual "moderate" / "significant" shift marks.
+DRIFT_THRESHOLDS = {"psi": (0.1, 0.25), "ks": (0.1, 0.2)}
+STATUS_ORDER = ("ok", "warn", "alert")
+
+_EPS = 1e-4  # floor for empty bins in the PSI log ratio
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two binned count vectors."""
+    e = np.maximum(expected / max(expected.sum(), 1), _EPS)
+    a = np.maximum(actual / max(actual.sum(), 1), _EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov distance evaluated at the bin edges (a lower bound of the exact KS)."""
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+def _status(value: float, metric: str) -> str:
+    warn, alert = DRIFT_THRESHOLDS[metric]
+    return "alert" if value >= alert else "warn" if value >= warn else "ok"
+
+
+def _worst(statuses) -> str:
+    return max(statuses, key=STATUS_ORDER.index, default="ok")
+
+
+@dataclass(frozen=True)
+class DriftBaseline:
+    """
+    Training-time histograms: per feature, interior bin edges (training quantiles) and
+    counts; plus the score histogram on fixed edges. Edges are padded with NaN to a
+    rectangular array so the whole baseline is a few small arrays in one .npz.
+    """
+
+    feature_cols: list[str]
+    edges: np.ndarray  # (n_features, FEATURE_BINS - 1), NaN-padded
+    counts: np.ndarray  # (n_features, FEATURE_BINS), zero-padded
+    score_edges: np.ndarray
+    score_counts: np.ndarray
+
+    def _feature_edges(self, j: int) -> np.ndarray:
+        e = self.edges[j]
+        return e[~np.isnan(e)]
+
+    def feature_counts(self, X: np.ndarray) -> np.ndarray:
+        """Counts of `X` (rows × feature_cols) in the baseline bins; one searchsorted + bincount per column."""
+        out = np.zeros_like(self.counts)
+        for j in range(len(self.feature_cols)):
+            edges = self._feature_edges(j)
+            bins = np.searchsorted(edges, X[:, j], side="right")
+            out[j, : len(edges) + 1] = np.bincount(bins, minlength=len(edges) + 1)
+        return out
+
+    def score_histogram(self, scores: np.ndarray) -> np.ndarray:
+        bins = np.searchsorted(self.score_edges, np.asarray(scores, dtype=np.float64), side="right")
+        return np.bincount(bins, minlength=len(self.score_edges) + 1)
+
+    def compare(self, counts: np.ndarray, score_counts: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        PSI and binned KS per column from binned counts. Counts from several batches can
+        be summed first, so drift over a stream is tracked without keeping any rows.
+        """
+        rows = []
+        for j, col in enumerate(self.feature_cols):
+            n_bins = len(self._feature_edges(j)) + 1
+            rows.append((col, self.counts[j, :n_bins], counts[j, :n_bins]))
+        if score_counts is not None:
+            rows.append((SCORE_COL, self.score_counts, score_counts))
+
+        records = []
+        for col, expected, actual in rows:
+            p, ks = psi(expected, actual), binned_ks(expected, actual)
+            records.append(
+                {
+                    "column": col,
+                    "psi": round(p, 4),
+                    "ks": round(ks, 4),
+                    "status": _worst([_status(p, "psi"), _status(ks, "ks")]),
+                    "n": int(actual.sum()),
+                }
+            )
+        return pd.DataFrame(records)
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            feature_cols=np.array(self.feature_cols, dtype=str),
+            edges=self.edges,
+            counts=self.counts,
+            score_edges=self.score_edges,
+            score_counts=self.score_counts,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "DriftBaseline":
+        with np.load(path) as z:
+            return cls(
+                feature_cols=z["feature_cols"].tolist(),
+                edges=z["edges"],
+                counts=z["counts"],
+                score_edges=z["score_edges"],
+                score_counts=z["score_counts"],
+            )
+
+
+def build_baseline(X: np.ndarray, feature_cols: list[str], scores: np.ndarray) -> DriftBaseline:
+    X = np.asarray(X, dtype=np.float64)
+    quantiles = np.linspace(0, 1, FEATURE_BINS + 1)[1:-1]
+    edges = np.full((len(feature_cols), FEATURE_BINS - 1), np.nan)
+    for j in range(len(feature_cols)):
+        # Discrete or skewed columns collapse to fewer distinct edges.
+        e = np.unique(np.quantile(X[:, j], quantiles))
+        edges[j, : len(e)] = e
+
+    empty = DriftBaseline(
+        feature_cols=list(feature_cols),
+        edges=edges,
+        counts=np.zeros((len(feature_cols), FEATURE_BINS), dtype=np.int64),
+        score_edges=np.linspace(0, 1, SCORE_BINS + 1)[1:-1],
+        score_counts=np.zeros(SCORE_BINS, dtype=np.int64),
+    )
+    return replace(empty, counts=empty.feature_counts(X), score_counts=empty.score_histogram(scores))
+
+
+def load_baseline(version_id: str | None = None) -> DriftBaseline | None:
+    """Baseline of a published model version (default: the active one); None if it has none."""
+    from src.modeling.inference import model_version
+    from src.modeling.registry import version_dir
+
+    path = version_dir(version_id or model_version()) / BASELINE_FILENAME
+    return DriftBaseline.load(path) if path.exists() else None
+
+
+def reports_path() -> Path:
+    return settings.root_dir / settings.reports_dir / REPORT_FILENAME
+
+
+def check_drift(
+    features_df: pd.DataFrame,
+    scores: np.ndarray | None = None,
+    from_store: bool = False,
+    version: str | None = None,
+) -> dict | None:
+    """
+    Compare a scoring batch with the training baseline of model `version` (default: the
+    active one; pass the version that produced `scores`) and write
+    reports/drift_report.json (plus a line in reports/monitoring/drift_history.jsonl).
+    Returns the report, or None if that model has no baseline.
+    """
+    from src.modeling.inference import model_matrix, model_version
+
+    version = version or model_version()
+    baseline = load_baseline(version)
+    if baseline is None:
+        return None
+
+    X = model_matrix(features_df, baseline.feature_cols, from_store=from_store)
+    table = baseline.compare(
+        baseline.feature_counts(X),
+        baseline.score_histogram(scores) if scores is not None else None,
+    )
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "model_version": version,
+        "n_rows": int(len(X)),
+        "status": _worst(table["status"]),
+        "thresholds": DRIFT_THRESHOLDS,
+        "columns": table.to_dict(orient="records"),
+    }
+
+    path = reports_path()
+    history = path.parent / "monitoring" / HISTORY_FILENAME
+    history.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    with open(history, "a", encoding="utf-8") as f:
+        f.write(json.dumps({k: report[k] for k in ("created_at", "model_version", "n_rows", "status")}) + "\n")
+    return report
+
+
+def load_drift_report() -> dict | None:
+    path = reports_path()
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def print_drift_report(report: dict) -> None:
+    print(f"[monitor] Drift vs model {report['model_version']} over {report['n_rows']:,} rows: {report['status']}")
+    for row in report["columns"]:
+        flag = "" if row["status"] == "ok" else f"  <- {row['status']}"
+        print(f"[monitor]   {row['column']:<32} psi={row['psi']:.4f} ks={row['ks']:.4f}{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check the processed customer features for drift against the active churn model."
+    )
+    parser.parse_args()
+
+    from src.modeling.inference import score_churn
+
+    features = pd.read_csv(settings.root_dir / settings.data_processed_dir / "customer_features.csv")
+    proba, version = score_churn(features, from_store=True)
+    report = check_drift(features, proba.to_numpy(), from_store=True, version=version)
+    if report is None:
+        print("[monitor] The active model has no drift baseline. Retrain: python -m src.modeling.train_churn_model")
+        return
+    print_drift_report(report)
+    print(f"[monitor] Report saved to: {reports_path()}")
+
+
+if __name__ == "__main__":
+    main()
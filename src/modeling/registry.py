@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.config import settings
+
+MODEL_FILENAME = "churn_model.joblib"
+FEATURES_FILENAME = "churn_features.joblib"
+COMPACT_FILENAME = "churn_model_compact.npz"
+METADATA_FILENAME = "metadata.json"
+
+CURRENT_POINTER = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+
+
+def models_dir() -> Path:
+    return settings.root_dir / settings.models_dir
+
+
+def versions_dir() -> Path:
+    return models_dir() / VERSIONS_DIRNAME
+
+
+def version_dir(version_id: str) -> Path:
+    return versions_dir() / version_id
+
+
+def new_version_id(data_hash: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return f"{stamp}-{data_hash[:8]}"
+
+
+def stage_version() -> Path:
+    """
+    Empty staging directory next to the published versions (same filesystem, so the
+    final publish is a rename). Write the artifacts here, then call `publish_version`.
+    """
+    versions_dir().mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=versions_dir()))
+    staging.chmod(0o755)  # mkdtemp is owner-only; dashboard/API processes may run as another user
+    return staging
+
+
+def publish_version(version_id: str, staging_dir: Path, metadata: dict, activate: bool = True) -> Path:
+    """
+    Move a fully written staging directory into place as an immutable version and,
+    by default, point CURRENT at it. Readers only ever see complete versions.
+    """
+    metadata = {"version_id": version_id, **metadata}
+    (staging_dir / METADATA_FILENAME).write_text(json.dumps(metadata, indent=2, default=str), encoding="utf-8")
+
+    target = version_dir(version_id)
+    if target.exists():
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise FileExistsError(f"Model version already exists: {version_id}")
+    os.replace(staging_dir, target)
+
+    if activate:
+        set_current(version_id)
+    return target
+
+
+def set_current(version_id: str) -> None:
+    """Atomically repoint CURRENT (write a temp file, then rename over the pointer)."""
+    if not (version_dir(version_id) / FEATURES_FILENAME).exists():
+        raise FileNotFoundError(f"Unknown or incomplete model version: {version_id}")
+
+    pointer = models_dir() / CURRENT_POINTER
+    fd, tmp = tempfile.mkstemp(prefix=".CURRENT-", dir=models_dir())
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(version_id + "\n")
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, pointer)
+
+
+def current_version() -> str | None:
+    pointer = models_dir() / CURRENT_POINTER
+    if not pointer.exists():
+        return None
+    version_id = pointer.read_text(encoding="utf-8").strip()
+    return version_id or None
+
+
+def read_metadata(version_id: str) -> dict:
+    path = version_dir(version_id) / METADATA_FILENAME
+    if not path.exists():
+        return {"version_id": version_id}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def list_versions() -> list[dict]:
+    if not versions_dir().exists():
+        return []
+    ids = sorted(p.name for p in versions_dir().iterdir() if p.is_dir() and not p.name.startswith("."))
+    return [read_metadata(v) for v in ids]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and switch published churn model versions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List published versions")
+    sub.add_parser("current", help="Show the active version")
+    activate = sub.add_parser("activate", help="Point CURRENT at a version (roll forward or back)")
+    activate.add_argument("version_id")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = current_version()
+        for meta in list_versions():
+            marker = "*" if meta["version_id"] == current else " "
+            auc = meta.get("metrics", {}).get("roc_auc")
+            auc_label = f"roc_auc={auc:.4f}" if isinstance(auc, (int, float)) else ""
+            print(f"{marker} {meta['version_id']}  {meta.get('model_class', '')}  {auc_label}")
+    elif args.command == "current":
+        print(current_version() or "(none: using legacy flat artifacts)")
+    elif args.command == "activate":
+        set_current(args.version_id)
+        print(f"[registry] CURRENT -> {args.version_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+ID_COL = "customer_unique_id"
+
+WINDOWS_DAYS = (30, 90, 180)
+PEAK_WINDOW_DAYS = 90
+
+TEMPORAL_FEATURE_COLS = [
+    "mean_gap_days",
+    "std_gap_days",
+    "max_gap_days",
+    "last_gap_days",
+    "order_value_trend",
+    "last_order_value_ratio",
+    *[f"{kind}_{w}d_at_last" for w in WINDOWS_DAYS for kind in ("orders", "spend")],
+    f"spend_{PEAK_WINDOW_DAYS}d_vs_peak",
+    "last_review_score",
+    "review_trend",
+]
+
+# Transaction columns the features are built from (besides the customer id).
+SOURCE_COLS = ["order_purchase_timestamp", "revenue", "review_score"]
+
+
+def _group_slope(
+    group: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    n_groups: int,
+    weight: np.ndarray | None = None,
+) -> np.ndarray:
+    """Least-squares slope of y on x within each group, from five bincount sums; NaN under two points."""
+    w = np.ones_like(x, dtype=np.float64) if weight is None else weight
+    sw = np.bincount(group, w, n_groups)
+    sx = np.bincount(group, w * x, n_groups)
+    sy = np.bincount(group, w * y, n_groups)
+    sxx = np.bincount(group, w * x * x, n_groups)
+    sxy = np.bincount(group, w * x * y, n_groups)
+    denom = sw * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, (sw * sxy - sx * sy) / denom, np.nan)
+
+
+def build_temporal_features(transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Order-history features per customer, from one pass over the orders sorted by
+    (customer, purchase time). Every window ends at the customer's own last purchase,
+    not at the snapshot date, so none of them restates the churn label (recency
+    relative to the snapshot).
+
+    - gaps between consecutive orders: mean, std, max and the most recent one
+    - order value trend: slope of order value over order number, relative to the
+      customer's average order value; and last order value / average
+    - orders and spend in the 30/90/180 days up to the last purchase, and the 90-day
+      spend there relative to its peak over the customer's history
+    - most recent review score and the slope of review scores over rated orders
+
+    Features that need two orders (or two ratings) are NaN for customers without them.
+    """
+    ts = pd.to_datetime(transactions["order_purchase_timestamp"], errors="coerce")
+    keep = ts.notna().to_numpy()
+    if not keep.any():
+        return pd.DataFrame(columns=[ID_COL, *TEMPORAL_FEATURE_COLS])
+    codes, ids = pd.factorize(transactions[ID_COL][keep])
+    seconds = ts.to_numpy()[keep].astype("datetime64[s]").astype(np.int64)
+    seconds -= seconds.min()
+
+    # One int64 key orders rows by (customer, time). Its per-customer stride is longer
+    # than the data span plus the longest window, so a trailing window found on the key
+    # never reaches into the previous customer's orders.
+    stride = int(seconds.max()) + max(WINDOWS_DAYS) * 86400 + 1
+    key = codes.astype(np.int64) * stride + seconds
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    group = codes[order]
+    days = seconds[order] / 86400.0
+    value = np.nan_to_num(transactions["revenue"].to_numpy(dtype=np.float64)[keep][order])
+    review = transactions["review_score"].to_numpy(dtype=np.float64)[keep][order]
+
+    n, n_groups = len(group), len(ids)
+    counts = np.bincount(group, minlength=n_groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    last = ends - 1
+    rank = (np.arange(n) - np.repeat(starts, counts)).astype(np.float64)
+    out = pd.DataFrame({ID_COL: ids})
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Inter-purchase gaps; the first order of each customer has none.
+        gap = np.empty(n)
+        gap[0] = 0.0
+        gap[1:] = np.diff(days)
+        gap[starts] = 0.0
+        n_gaps = counts - 1
+        mean_gap = np.bincount(group, gap, n_groups) / n_gaps
+        var_gap = np.bincount(group, gap * gap, n_groups) / n_gaps - mean_gap**2
+        out["mean_gap_days"] = np.where(n_gaps > 0, mean_gap, np.nan)
+        out["std_gap_days"] = np.where(n_gaps > 1, np.sqrt(np.maximum(var_gap, 0)), np.nan)
+        out["max_gap_days"] = np.where(n_gaps > 0, np.maximum.reduceat(gap, starts), np.nan)
+        out["last_gap_days"] = np.where(n_gaps > 0, gap[last], np.nan)
+
+        avg_value = np.bincount(group, value, n_groups) / counts
+        has_value = avg_value > 0
+        out["order_value_trend"] = np.where(has_value, _group_slope(group, rank, value, n_groups) / avg_value, np.nan)
+        out["last_order_value_ratio"] = np.where(has_value, value[last] / avg_value, np.nan)
+
+        # Trailing windows ending at every order: each window start is one searchsorted on the key.
+        spend_cum = np.concatenate([[0.0], np.cumsum(value)])
+        position = np.arange(n)
+        for w in sorted({*WINDOWS_DAYS, PEAK_WINDOW_DAYS}):
+            first = np.searchsorted(key, key - w * 86400, side="left")
+            spend = spend_cum[position + 1] - spend_cum[first]
+            if w in WINDOWS_DAYS:
+                out[f"orders_{w}d_at_last"] = (position + 1 - first)[last]
+                out[f"spend_{w}d_at_last"] = spend[last]
+            if w == PEAK_WINDOW_DAYS:
+                peak = np.maximum.reduceat(spend, starts)
+                out[f"spend_{w}d_vs_peak"] = np.where(peak > 0, spend[last] / peak, np.nan)
+
+        rated = ~np.isnan(review)
+        last_rated = np.maximum.reduceat(np.where(rated, position, -1), starts)
+        out["last_review_score"] = np.where(last_rated >= starts, review[last_rated], np.nan)
+        out["review_trend"] = _group_slope(
+            group, rank, np.where(rated, review, 0.0), n_groups, weight=rated.astype(np.float64)
+        )
+
+    return out[[ID_COL, *TEMPORAL_FEATURE_COLS]]
+
+
+def with_temporal_features(features: pd.DataFrame, transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    `features` with the order-history features built from `transactions` when any of
+    them is missing (e.g. processed files written before they existed). Returned as is
+    when they are all there, or when `transactions` lacks the columns to build them;
+    scoring then reports the missing features instead of guessing them.
+    """
+    if set(TEMPORAL_FEATURE_COLS) <= set(features.columns):
+        return features
+    if not {ID_COL, *SOURCE_COLS} <= set(transactions.columns):
+        return features
+    stale = [c for c in TEMPORAL_FEATURE_COLS if c in features.columns]
+    temporal = build_temporal_features(transactions)
+    return features.drop(columns=stale).merge(temporal, on=ID_COL, how="left")
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
 import pandas as pd
-from pathlib import Path
 from joblib import dump
 
 from sklearn.ensemble import RandomForestClassifier
@@ -9,9 +15,29 @@ from sklearn.metrics import classification_report, roc_auc_score
 from sklearn.model_selection import train_test_split
 
 from src.config import settings
+from src.modeling.compact import CompactForest, compare_with_sklearn, is_exportable, print_report
+from src.modeling.feature_store import open_feature_store
+from src.modeling.features import FEATURE_COLS, model_feature_cols, share_categories
+from src.modeling.monitoring import BASELINE_FILENAME, build_baseline
+from src.modeling.registry import (
+    COMPACT_FILENAME,
+    FEATURES_FILENAME,
+    MODEL_FILENAME,
+    new_version_id,
+    publish_version,
+    stage_version,
+)
+
+
+def load_training_data() -> tuple[pd.DataFrame, pd.Series, list[str]]:
+    store = open_feature_store()
+    if store is not None and store.target is not None and store.covers(FEATURE_COLS):
+        print(f"[model] Memory-mapping features from: {store.path}")
+        feature_cols = list(store.columns)
+        X = pd.DataFrame(store.matrix(feature_cols), columns=feature_cols)
+        y = pd.Series(store.target, name=store.target_name).astype(int)
+        return X, y, feature_cols
 
-
-def main() -> None:
     processed_dir = settings.root_dir / settings.data_processed_dir
     features_path = processed_dir / "customer_features.csv"
 
@@ -19,15 +45,7 @@ def main() -> None:
     df = pd.read_csv(features_path)
 
     churn_col = [c for c in df.columns if c.startswith("churn_")][0]
-
-    feature_cols = [
-        # "recency_days",  # removed to prevent target leakage
-        "frequency_orders",
-        "monetary_total",
-        "avg_order_value",
-        "avg_review_score",
-        "avg_delivery_days",
-    ]
+    feature_cols = model_feature_cols(df)
 
     # Safety warning (no crash)
     if "recency_days" in feature_cols and churn_col.startswith("churn_"):
@@ -35,6 +53,55 @@ def main() -> None:
 
     X = df[feature_cols].fillna(0)
     y = df[churn_col].astype(int)
+    return X, y, feature_cols
+
+
+def training_data_hash(X: pd.DataFrame, y: pd.Series) -> str:
+    hashed = pd.util.hash_pandas_object(pd.concat([X, y], axis=1), index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def run_tuning(args: argparse.Namespace) -> None:
+    from src.modeling.tuning import tune
+
+    X, y, _ = load_training_data()
+    leaderboard = tune(
+        X,
+        y,
+        search=args.search,
+        n_iter=args.n_iter,
+        cv=args.cv,
+        n_jobs=args.n_jobs,
+    )
+
+    reports_dir = settings.root_dir / settings.reports_dir
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    out_path = reports_dir / "model_leaderboard.csv"
+    leaderboard.to_csv(out_path, index=False)
+
+    print("\nLeaderboard (top 10):")
+    print(
+        leaderboard.head(10)[
+            ["rank", "estimator", "roc_auc_mean", "roc_auc_std", "fit_time_s", "latency_us_per_row", "params"]
+        ].to_string(index=False)
+    )
+    print(f"\n[tune] Saved leaderboard to: {out_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train (or tune) the churn model.")
+    parser.add_argument("--tune", action="store_true", help="Run a hyperparameter search instead of training")
+    parser.add_argument("--search", choices=["random", "halving"], default="random")
+    parser.add_argument("--n-iter", type=int, default=20, help="Candidates to sample across estimators")
+    parser.add_argument("--cv", type=int, default=5, help="Stratified CV folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Worker processes (-1 = all cores)")
+    args = parser.parse_args()
+
+    if args.tune:
+        run_tuning(args)
+        return
+
+    X, y, feature_cols = load_training_data()
 
     X_train, X_test, y_train, y_test = train_test_split(
         X,
@@ -52,7 +119,9 @@ def main() -> None:
     )
 
     print("[model] Training RandomForest...")
+    t0 = time.perf_counter()
     model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - t0
 
     y_pred = model.predict(X_test)
     y_proba = model.predict_proba(X_test)[:, 1]
@@ -72,17 +141,62 @@ def main() -> None:
     print(importances)
 
     # =========================
-    # Save model
+    # Publish a new model version
     # =========================
 
-    models_dir = settings.root_dir / settings.models_dir
-    models_dir.mkdir(parents=True, exist_ok=True)
-
-    dump(model, models_dir / "churn_model.joblib")
-    dump(feature_cols, models_dir / "churn_features.joblib")
-
-    print(f"[model] Saved model to: {models_dir / 'churn_model.joblib'}")
+    data_hash = training_data_hash(X, y)
+    version_id = new_version_id(data_hash)
+    staging = stage_version()
+
+    # Nothing half-written may stay behind: a failed export or parity check drops the staging dir.
+    try:
+        dump(model, staging / MODEL_FILENAME)
+        dump(feature_cols, staging / FEATURES_FILENAME)
+
+        export_report = None
+        if is_exportable(model):
+            # Written under a temporary name and only renamed once it matches sklearn, since
+            # load_model_artifacts prefers the compact export over the pickle.
+            compact = CompactForest.from_sklearn(model)
+            unverified = staging / f".unverified-{COMPACT_FILENAME}"
+            compact.save(unverified)
+            export_report = compare_with_sklearn(model, compact, X_test, unverified)
+            os.replace(unverified, staging / COMPACT_FILENAME)
+            print_report(export_report)
+
+        # Reference histograms for drift monitoring: features over the full population, scores
+        # over the held-out split only. In-sample forest scores are more extreme than scores on
+        # new customers and would make fresh, unshifted data look like drift.
+        baseline = build_baseline(X.to_numpy(), feature_cols, y_proba)
+        baseline.save(staging / BASELINE_FILENAME)
+
+        metadata = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "model_class": type(model).__name__,
+            "params": model.get_params(),
+            "training_data_hash": data_hash,
+            "n_train": int(len(X_train)),
+            "n_test": int(len(X_test)),
+            "target": y.name,
+            "feature_dtypes": {c: str(t) for c, t in X.dtypes.items()},
+            # Scoring rebuilds the share features for exactly these categories (see inference.model_categories).
+            "categories": share_categories(feature_cols),
+            "metrics": {
+                "roc_auc": float(auc),
+                "classification_report": classification_report(y_test, y_pred, output_dict=True),
+            },
+            "feature_importances": importances.to_dict(),
+            "timing": {"train_seconds": train_seconds},
+            "compact_export": export_report,
+            "drift_baseline": BASELINE_FILENAME,
+        }
+
+        path = publish_version(version_id, staging, metadata)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    print(f"[model] Published model version {version_id} to: {path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
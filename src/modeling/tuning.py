@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed, dump, load
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+from src.config import settings
+
+SEARCH_SPACES = {
+    "random_forest": {
+        "n_estimators": [100, 200, 300, 500],
+        "max_depth": [4, 6, 8, 12, None],
+        "min_samples_leaf": [1, 5, 20, 50],
+        "max_features": ["sqrt", 0.5, 1.0],
+        "class_weight": ["balanced", None],
+    },
+    "gradient_boosting": {
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "max_iter": [100, 200, 400],
+        "max_depth": [3, 5, 8, None],
+        "max_leaf_nodes": [15, 31, 63],
+        "min_samples_leaf": [20, 50, 100],
+        "l2_regularization": [0.0, 0.1, 1.0],
+        "class_weight": ["balanced", None],
+    },
+}
+
+
+def make_estimator(name: str, params: dict, seed: int):
+    if name == "random_forest":
+        return RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    if name == "gradient_boosting":
+        return HistGradientBoostingClassifier(random_state=seed, **params)
+    raise ValueError(f"Unknown estimator: {name}")
+
+
+def _cache_shared_data(X: pd.DataFrame, y: pd.Series, cache_dir: Path) -> tuple[Path, str]:
+    """
+    Persist X/y once as plain numpy arrays. Workers receive only the path and open it
+    with mmap_mode="r", so every process shares one page-cache copy.
+    """
+    X_arr = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    y_arr = np.ascontiguousarray(y.to_numpy(dtype=np.int8))
+
+    digest = hashlib.sha256()
+    digest.update(X_arr.tobytes())
+    digest.update(y_arr.tobytes())
+    data_hash = digest.hexdigest()[:16]
+
+    data_path = cache_dir / f"xy_{data_hash}.joblib"
+    if not data_path.exists():
+        dump({"X": X_arr, "y": y_arr}, data_path)
+    return data_path, data_hash
+
+
+def _fit_fold(
+    data_path: str,
+    data_hash: str,
+    estimator: str,
+    params_json: str,
+    fold: int,
+    n_splits: int,
+    n_samples: int | None,
+    seed: int,
+) -> dict:
+    # `data_hash` is unused here: it is part of the cache key, standing in for the ignored path.
+    data = load(data_path, mmap_mode="r")
+    X, y = data["X"], data["y"]
+
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    train_idx, test_idx = list(splitter.split(np.zeros(len(y)), y))[fold]
+    if n_samples is not None and n_samples < len(train_idx):
+        rng = np.random.default_rng(seed + fold)
+        train_idx = np.sort(rng.choice(train_idx, size=n_samples, replace=False))
+
+    model = make_estimator(estimator, json.loads(params_json), seed)
+
+    t0 = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - t0
+
+    X_test = np.asarray(X[test_idx])
+    t0 = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    batch_time = time.perf_counter() - t0
+
+    single = X_test[:1]
+    t0 = time.perf_counter()
+    for _ in range(5):
+        model.predict_proba(single)
+    single_time = (time.perf_counter() - t0) / 5
+
+    return {
+        "roc_auc": float(roc_auc_score(y[test_idx], proba)),
+        "fit_time_s": fit_time,
+        "latency_us_per_row": batch_time / max(len(test_idx), 1) * 1e6,
+        "latency_ms_single": single_time * 1000,
+    }
+
+
+def _evaluate(candidates: list[tuple[str, dict]], n_samples: int | None, ctx: dict) -> list[dict]:
+    """Run every (candidate, fold) pair on the process pool; returns one summary per candidate."""
+    fit_fold = ctx["fit_fold"]
+    calls = [
+        (
+            ctx["data_path"], ctx["data_hash"], name, json.dumps(params, sort_keys=True),
+            fold, ctx["cv"], n_samples, ctx["seed"],
+        )
+        for name, params in candidates
+        for fold in range(ctx["cv"])
+    ]
+
+    # Only uncached folds go to the pool; cached ones are read back in this process.
+    pending = [i for i, call in enumerate(calls) if not fit_fold.check_call_in_cache(*call)]
+    results: list[dict | None] = [None] * len(calls)
+    if pending:
+        computed = Parallel(n_jobs=ctx["n_jobs"], backend="loky")(
+            delayed(fit_fold)(*calls[i]) for i in pending
+        )
+        for i, result in zip(pending, computed):
+            results[i] = result
+    results = [r if r is not None else fit_fold(*calls[i]) for i, r in enumerate(results)]
+
+    rows = []
+    for i, (name, params) in enumerate(candidates):
+        folds = pd.DataFrame(results[i * ctx["cv"]:(i + 1) * ctx["cv"]])
+        rows.append({
+            "estimator": name,
+            "params": json.dumps(params, sort_keys=True),
+            "n_samples": n_samples or ctx["n_rows"],
+            "roc_auc_mean": folds["roc_auc"].mean(),
+            "roc_auc_std": folds["roc_auc"].std(ddof=0),
+            "fit_time_s": folds["fit_time_s"].mean(),
+            "latency_us_per_row": folds["latency_us_per_row"].mean(),
+            "latency_ms_single": folds["latency_ms_single"].mean(),
+        })
+    return rows
+
+
+def _sample_candidates(n_iter: int, estimators: list[str], seed: int) -> list[tuple[str, dict]]:
+    per_estimator = max(1, n_iter // len(estimators))
+    candidates = []
+    for name in estimators:
+        sampler = ParameterSampler(SEARCH_SPACES[name], n_iter=per_estimator, random_state=seed)
+        candidates += [(name, params) for params in sampler]
+    return candidates
+
+
+def tune(
+    X: pd.DataFrame,
+    y: pd.Series,
+    search: str = "random",
+    n_iter: int = 20,
+    cv: int = 5,
+    n_jobs: int = -1,
+    estimators: list[str] | None = None,
+    halving_factor: int = 3,
+    seed: int = settings.random_seed,
+) -> pd.DataFrame:
+    """
+    Randomized or successive-halving search over RF and gradient-boosting configurations
+    with stratified CV on a process pool.
+
+    Fold results are memoized on disk (joblib.Memory) keyed by a hash of X/y, the
+    configuration and the fold, so repeated or extended searches only fit new folds.
+    Returns a leaderboard sorted by mean ROC-AUC.
+    """
+    estimators = estimators or list(SEARCH_SPACES)
+    cache_dir = settings.root_dir / settings.models_dir / ".tuning_cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    data_path, data_hash = _cache_shared_data(X, y, cache_dir)
+    memory = Memory(cache_dir / "folds", verbose=0)
+    ctx = {
+        "fit_fold": memory.cache(_fit_fold, ignore=["data_path"]),
+        "data_path": str(data_path),
+        "data_hash": data_hash,
+        "cv": cv,
+        "n_jobs": n_jobs,
+        "n_rows": int(len(y) * (cv - 1) / cv),
+        "seed": seed,
+    }
+
+    candidates = _sample_candidates(n_iter, estimators, seed)
+    print(f"[tune] {len(candidates)} candidates · {cv}-fold CV · search={search}")
+
+    if search == "random":
+        rows = _evaluate(candidates, None, ctx)
+    elif search == "halving":
+        n_rounds = max(1, math.ceil(math.log(len(candidates), halving_factor)))
+        rows = []
+        for r in range(n_rounds):
+            last = r == n_rounds - 1
+            n_samples = None if last else max(
+                cv * 20, int(ctx["n_rows"] / halving_factor ** (n_rounds - 1 - r))
+            )
+            round_rows = _evaluate(candidates, n_samples, ctx)
+            for row in round_rows:
+                row["round"] = r
+            rows += round_rows
+            print(f"[tune] Round {r}: {len(candidates)} candidates on {n_samples or ctx['n_rows']:,} rows")
+            if last:
+                break
+            ranked = sorted(range(len(candidates)), key=lambda i: -round_rows[i]["roc_auc_mean"])
+            keep = max(1, math.ceil(len(candidates) / halving_factor))
+            candidates = [candidates[i] for i in ranked[:keep]]
+    else:
+        raise ValueError(f"Unknown search: {search!r} (expected 'random' or 'halving')")
+
+    leaderboard = pd.DataFrame(rows).sort_values(
+        ["n_samples", "roc_auc_mean"], ascending=[False, False]
+    ).reset_index(drop=True)
+    leaderboard.insert(0, "rank", np.arange(1, len(leaderboard) + 1))
+    return leaderboard
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+# NOTE: nothing from `src` is imported at module level. Each dataset runs in a freshly
+# spawned process that sets DATA_RAW_DIR / DATA_PROCESSED_DIR / REPORTS_DIR before
+# `src.config` is first imported, so the unchanged pipeline code picks up its own paths.
+
+SUMMARY_FILENAME = "run_summary.json"
+LOG_FILENAME = "pipeline.log"
+
+
+@dataclass(frozen=True)
+class DatasetJob:
+    name: str
+    out_dir: Path
+    raw_dir: Path | None = None  # None: start from `transactions_path`
+    transactions_path: Path | None = None
+
+    @property
+    def processed_dir(self) -> Path:
+        return self.out_dir / "processed"
+
+    @property
+    def reports_dir(self) -> Path:
+        return self.out_dir / "reports"
+
+
+def _safe_name(value: object) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(value)).strip("._")
+    return name or "unknown"
+
+
+def _run_dataset(job: DatasetJob, score: bool) -> dict:
+    """Worker entry point: configure this process for one dataset, then run the stages."""
+    if job.raw_dir is not None:
+        os.environ["DATA_RAW_DIR"] = str(job.raw_dir)
+    os.environ["DATA_PROCESSED_DIR"] = str(job.processed_dir)
+    os.environ["REPORTS_DIR"] = str(job.reports_dir)
+
+    job.out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    summary = {"dataset": job.name, "out_dir": str(job.out_dir)}
+
+    with open(job.out_dir / LOG_FILENAME, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            import pandas as pd
+
+            from src.config import settings
+            from src.pipeline.stages import run_pipeline
+
+            settings.ensure_dirs()
+            transactions, items = None, None
+            if job.transactions_path is not None:
+                transactions, items = pd.read_pickle(job.transactions_path)
+            rfm_bins_path = settings.root_dir / settings.data_processed_dir / "rfm_bins.joblib"
+            summary.update(run_pipeline(transactions, items, score=score, rfm_bins_path=rfm_bins_path))
+            summary["status"] = "ok"
+        except Exception as e:  # reported in the combined summary; other datasets keep going
+            traceback.print_exc()
+            summary["status"] = "failed"
+            summary["error"] = f"{type(e).__name__}: {e}"
+
+    summary["seconds"] = round(time.perf_counter() - t0, 3)
+    return summary
+
+
+def raw_root_jobs(raw_roots: list[Path], out_root: Path) -> list[DatasetJob]:
+    names = [_safe_name(p.resolve().name) for p in raw_roots]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Raw roots must have distinct folder names: {names}")
+    return [
+        DatasetJob(name=name, out_dir=out_root / name, raw_dir=path.resolve())
+        for name, path in zip(names, raw_roots)
+    ]
+
+
+def partition_jobs(partition_col: str, out_root: Path) -> list[DatasetJob]:
+    """
+    Extract and transform the configured raw dir once, then split the transaction table
+    on `partition_col`; each partition runs features → segments (→ scoring) on its own.
+    """
+    import pandas as pd
+
+    from src.analysis.products import build_item_table
+    from src.etl.extract import load_all_raw_data
+    from src.etl.transform import build_transaction_table
+    from src.utils.validation import require_columns
+
+    data = load_all_raw_data()
+    transactions = build_transaction_table(data)
+    require_columns(transactions, [partition_col], "transactions")
+    items = build_item_table(data, transactions)
+    item_partition = items["order_id"].map(transactions.set_index("order_id")[partition_col])
+
+    staging = out_root / ".partitions"
+    staging.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    item_groups = items.groupby(item_partition, sort=False, dropna=False).indices
+    for value, part in transactions.groupby(partition_col, sort=True, dropna=False):
+        name = _safe_name(value)
+        path = staging / f"{name}.pkl"
+        part_items = items.iloc[item_groups.get(value, [])]
+        pd.to_pickle((part, part_items), path)
+        jobs.append(DatasetJob(name=name, out_dir=out_root / name, transactions_path=path))
+    print(f"[pipeline] {len(transactions):,} transactions split into {len(jobs)} partitions on '{partition_col}'")
+    return jobs
+
+
+def run_jobs(jobs: list[DatasetJob], max_workers: int = 2, score: bool = False) -> list[dict]:
+    """
+    Run every job on a process pool with at most `max_workers` datasets in flight.
+    Workers are spawned fresh per dataset so configuration never leaks between them.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(_run_dataset, job, score): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # worker crashed before it could report
+                result = {"dataset": job.name, "out_dir": str(job.out_dir), "status": "failed", "error": repr(e)}
+            results.append(result)
+            print(f"[pipeline] {result['status']:<6} {job.name} ({result.get('seconds', 0):.1f}s) → {job.out_dir}")
+    return sorted(results, key=lambda r: r["dataset"])
+
+
+def print_summary(results: list[dict], wall_seconds: float) -> None:
+    print("\nRun summary:")
+    for r in results:
+        if r["status"] == "ok":
+            detail = f"{r['customers']:>9,} customers {r['transactions']:>10,} orders"
+            if r.get("scored"):
+                detail += " · scored"
+        else:
+            detail = r.get("error", "")
+        print(f"  {r['status']:<6} {r['dataset']:<24} {r.get('seconds', 0):7.1f}s  {detail}")
+
+    ok = [r for r in results if r["status"] == "ok"]
+    busy = sum(r.get("seconds", 0) for r in results)
+    print(
+        f"\n[pipeline] {len(ok)}/{len(results)} datasets ok · "
+        f"{sum(r['customers'] for r in ok):,} customers · "
+        f"wall {wall_seconds:.1f}s vs {busy:.1f}s summed"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the pipeline for several datasets in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--raw-roots", nargs="+", type=Path, help="One raw-data folder per dataset")
+    source.add_argument("--partition-col", help="Split the configured raw data on this transaction column")
+    parser.add_argument("--out-root", type=Path, default=None, help="Default: <DATA_PROCESSED_DIR>/datasets")
+    parser.add_argument("--max-workers", type=int, default=2, help="Datasets processed concurrently")
+    parser.add_argument("--score", action="store_true", help="Also score segments with the active churn model")
+    args = parser.parse_args()
+
+    from src.config import settings
+
+    out_root = (args.out_root or settings.root_dir / settings.data_processed_dir / "datasets").resolve()
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    if args.raw_roots:
+        jobs = raw_root_jobs(args.raw_roots, out_root)
+    else:
+        jobs = partition_jobs(args.partition_col, out_root)
+
+    print(f"[pipeline] Running {len(jobs)} datasets with up to {args.max_workers} workers")
+    results = run_jobs(jobs, max_workers=args.max_workers, score=args.score)
+    shutil.rmtree(out_root / ".partitions", ignore_errors=True)
+    wall_seconds = time.perf_counter() - t0
+
+    summary_path = out_root / SUMMARY_FILENAME
+    summary_path.write_text(
+        json.dumps({"wall_seconds": round(wall_seconds, 3), "datasets": results}, indent=2),
+        encoding="utf-8",
+    )
+    print_summary(results, wall_seconds)
+    print(f"[pipeline] Summary saved to: {summary_path}")
+
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import pandas as pd
+
+from src.analysis.cohorts import build_cohorts, save_cohorts
+from src.analysis.geography import GEO_COLS, build_region_rollup, customer_regions, save_region_rollup
+from src.analysis.products import (
+    build_category_matrix,
+    build_item_table,
+    category_share_features,
+    save_category_outputs,
+    segment_category_mix,
+)
+from src.analysis.segmentation import assign_rfm_segments, fit_rfm_bins, save_rfm_bins
+from src.analysis.sketches import build_kpi_sketches, save_kpi_sketches
+from src.analysis.visualization import render_segment_reports
+from src.config import settings
+from src.etl.extract import load_all_raw_data
+from src.etl.processed import bump_data_version
+from src.etl.transform import build_transaction_table
+from src.modeling.clv import CLV_FILENAME, fit_clv
+from src.modeling.feature_store import write_feature_store
+from src.modeling.features import build_customer_features, is_category_feature, model_feature_cols
+from src.modeling.temporal_features import SOURCE_COLS, build_temporal_features, with_temporal_features
+
+SCORES_FILENAME = "customer_scores.csv"
+
+# Raw tables behind each refresh path. Everything downstream of the transaction table
+# (cohorts, features, segments, CLV, regions, sketches) needs a full run; the product
+# tables only feed the category matrix and the category share features.
+TRANSACTION_TABLES = ("orders", "order_items", "customers", "payments", "reviews")
+CATEGORY_TABLES = ("order_items", "products", "category_translation")
+
+
+def _share_categories() -> list[str] | None:
+    # Shares are built for the active model's categories, so it is scored on the columns it
+    # was trained on; None (no model yet) picks the top categories of this data.
+    from src.modeling.inference import model_categories
+
+    categories = model_categories()
+    if categories is not None:
+        print(f"[model] Category shares for the active model's {len(categories)} categories")
+    return categories
+
+
+def _with_category_features(
+    customer_features: pd.DataFrame,
+    items: pd.DataFrame,
+    categories: list[str] | None = None,
+):
+    """Replace any category share features with ones built from `items`; returns (features, matrix)."""
+    stale = [c for c in customer_features.columns if is_category_feature(c)]
+    customer_features = customer_features.drop(columns=stale)
+    category_matrix = build_category_matrix(items)
+    shares = category_share_features(category_matrix, categories=categories)
+    customer_features = customer_features.merge(shares, on="customer_unique_id", how="left")
+    share_cols = [c for c in shares.columns if c != "customer_unique_id"]
+    customer_features[share_cols] = customer_features[share_cols].fillna(0)
+    print(
+        f"[model] Category mix: {category_matrix.matrix.shape[1]} categories, "
+        f"{category_matrix.matrix.nnz:,} customer×category cells"
+    )
+    return customer_features, category_matrix
+
+
+def _write_features(customer_features: pd.DataFrame, processed_dir: Path) -> None:
+    features_path = processed_dir / "customer_features.csv"
+    customer_features.to_csv(features_path, index=False)
+    print(f"[model] Customer features shape: {customer_features.shape}")
+    print(f"[model] Saved to: {features_path}")
+
+    store_path = write_feature_store(
+        customer_features,
+        model_feature_cols(customer_features),
+        target_col=f"churn_{settings.default_churn_window_days}d",
+    )
+    print(f"[model] Saved memory-mappable feature matrix to: {store_path}")
+
+
+def _score_segments(segmented: pd.DataFrame, processed_dir: Path) -> pd.DataFrame | None:
+    from src.modeling.inference import score_churn
+
+    try:
+        proba, version = score_churn(segmented, from_store=True)
+    except FileNotFoundError as e:
+        print(f"\n[model] Scoring skipped: {e}")
+        return None
+    except ValueError as e:
+        print(f"\n[warning] Scoring skipped, features do not match the active model: {e}")
+        return None
+    scores = segmented[["customer_unique_id", "segment_name"]].assign(
+        churn_probability=proba,
+        model_version=version,
+    )
+    scores_path = processed_dir / SCORES_FILENAME
+    scores.to_csv(scores_path, index=False)
+    print(f"\n[model] Saved churn scores to: {scores_path}")
+    return scores
+
+
+def clv_segments(segmented: pd.DataFrame, clv: pd.DataFrame) -> pd.DataFrame:
+    return segmented.merge(clv[["customer_unique_id", "clv"]], on="customer_unique_id", how="left")
+
+
+def _check_drift(segmented: pd.DataFrame, scores: pd.DataFrame | None) -> dict | None:
+    # Feature (and, when scored, score) drift against the training histograms of the model
+    # that scored `scores`, or of the active model when unscored.
+    from src.modeling.monitoring import check_drift, print_drift_report, reports_path
+
+    t0 = time.perf_counter()
+    try:
+        if scores is None:
+            report = check_drift(segmented, from_store=True)
+        else:
+            report = check_drift(
+                segmented,
+                scores["churn_probability"].to_numpy(),
+                from_store=True,
+                version=scores["model_version"].iloc[0],
+            )
+    except FileNotFoundError:
+        return None  # no model published yet
+    except ValueError as e:
+        print(f"\n[warning] Drift check skipped, features do not match the active model: {e}")
+        return None
+    if report is None:
+        print("\n[monitor] Active model has no drift baseline; skipping drift check")
+        return None
+    print()
+    print_drift_report(report)
+    print(f"[monitor] Drift report saved to: {reports_path()} ({time.perf_counter() - t0:.2f}s)")
+    return report
+
+
+def run_pipeline(
+    transactions: pd.DataFrame | None = None,
+    items: pd.DataFrame | None = None,
+    score: bool = False,
+    rfm_bins_path: Path | None = None,
+) -> dict:
+    """
+    extract → transform → cohorts → features → segments → CLV (→ scoring) → KPI sketches,
+    reading and writing the directories configured in `settings`.
+
+    Pass `transactions` (and its `items`, see `build_item_table`) to start from an
+    already built transaction table, e.g. one partition of it. With `score`, segments
+    are scored with the active churn model and written to customer_scores.csv; scoring
+    is skipped if no model is published. Category shares are built for the active
+    model's category list when there is one.
+    Returns a summary of row counts and per-stage timings.
+    """
+    processed_dir = settings.root_dir / settings.data_processed_dir
+    timings: dict[str, float] = {}
+
+    def stage(name: str, t0: float) -> None:
+        timings[name] = round(time.perf_counter() - t0, 3)
+
+    if transactions is None:
+        print("\n[etl] Starting extraction...")
+        t0 = time.perf_counter()
+        data = load_all_raw_data()
+        stage("extract", t0)
+        print(f"[etl] Loaded datasets: {list(data.keys())}")
+
+        print("\n[etl] Building transaction table...")
+        t0 = time.perf_counter()
+        transactions = build_transaction_table(data)
+        items = build_item_table(data, transactions)
+        stage("transform", t0)
+        print(f"[etl] Transaction table shape: {transactions.shape}")
+
+    out_path = processed_dir / "transactions.csv"
+    transactions.to_csv(out_path, index=False)
+    print(f"[etl] Saved processed transactions to: {out_path}")
+
+    print("\n[analysis] Building cohort retention matrices...")
+    t0 = time.perf_counter()
+    cohorts = build_cohorts(transactions)
+    cohorts_path = save_cohorts(cohorts)
+    stage("cohorts", t0)
+    print(f"[analysis] {len(cohorts.cohorts)} monthly cohorts saved to: {cohorts_path}")
+
+    print("\n[model] Building customer features...")
+    t0 = time.perf_counter()
+    customer_features = build_customer_features(
+        transactions,
+        churn_window_days=settings.default_churn_window_days,
+    )
+    temporal = build_temporal_features(transactions)
+    customer_features = customer_features.merge(temporal, on="customer_unique_id", how="left")
+    print(f"[model] Order-history features: {temporal.shape[1] - 1} columns for {len(temporal):,} customers")
+
+    category_matrix = None
+    if items is not None:
+        customer_features, category_matrix = _with_category_features(customer_features, items, _share_categories())
+
+    _write_features(customer_features, processed_dir)
+    stage("features", t0)
+
+    print("\n[analysis] Fitting RFM bin edges...")
+    t0 = time.perf_counter()
+    rfm_bins = fit_rfm_bins(customer_features)
+    bins_path = save_rfm_bins(rfm_bins, rfm_bins_path)
+    print(f"[analysis] Saved RFM bins to: {bins_path}")
+
+    print("\n[analysis] Assigning RFM segments...")
+    segmented = assign_rfm_segments(customer_features, bins=rfm_bins)
+    if any(c in transactions.columns for c in GEO_COLS):
+        segmented = segmented.merge(customer_regions(transactions), on="customer_unique_id", how="left")
+
+    segments_path = processed_dir / "customer_segments.csv"
+    segmented.to_csv(segments_path, index=False)
+    stage("segments", t0)
+    print(f"[analysis] Segmented dataset shape: {segmented.shape}")
+    print(f"[analysis] Saved to: {segments_path}")
+
+    if "customer_state" in segmented.columns:
+        t0 = time.perf_counter()
+        rollup = build_region_rollup(segmented, f"churn_{settings.default_churn_window_days}d")
+        rollup_path = save_region_rollup(rollup)
+        stage("regions", t0)
+        print(f"[analysis] {len(rollup):,} region × segment rows saved to: {rollup_path}")
+
+    if category_matrix is not None:
+        t0 = time.perf_counter()
+        mix = segment_category_mix(category_matrix, segmented)
+        products_dir = save_category_outputs(category_matrix, mix)
+        stage("categories", t0)
+        print(f"[analysis] Saved category matrix and segment mix to: {products_dir}")
+
+    print("\n[model] Fitting CLV model (BG/NBD + Gamma-Gamma)...")
+    t0 = time.perf_counter()
+    # Not persisted: the per-customer predictions below are what gets served, and the fitted
+    # parameters go into the run summary (one per dataset under the multi-dataset runner).
+    clv_model = fit_clv(customer_features)
+    clv = clv_model.predict(customer_features)
+    clv_path = processed_dir / CLV_FILENAME
+    clv.to_csv(clv_path, index=False)
+    stage("clv", t0)
+    print(
+        f"[model] CLV params r={clv_model.r:.3f} alpha={clv_model.alpha:.3f} "
+        f"a={clv_model.a:.3f} b={clv_model.b:.3f} · p={clv_model.p:.3f} q={clv_model.q:.3f} v={clv_model.v:.3f}"
+    )
+    print(f"[model] Saved predicted CLV to: {clv_path}")
+
+    print("\n[report] Rendering segment charts...")
+    t0 = time.perf_counter()
+    render_segment_reports(segmented, parallel=True)
+    stage("reports", t0)
+
+    scores = None
+    if score:
+        t0 = time.perf_counter()
+        scores = _score_segments(segmented, processed_dir)
+        stage("scoring", t0)
+
+    drift = _check_drift(segmented, scores)
+
+    print("\n[analysis] Building KPI sketches (segment × day)...")
+    t0 = time.perf_counter()
+    sketches = build_kpi_sketches(transactions, clv_segments(segmented, clv), scores)
+    sketches_path = save_kpi_sketches(sketches)
+    stage("sketches", t0)
+    print(f"[analysis] {len(sketches.orders):,} KPI cells saved to: {sketches_path}")
+
+    bump_data_version()
+    return {
+        "transactions": int(len(transactions)),
+        "customers": int(len(segmented)),
+        "scored": scores is not None,
+        "drift_status": drift["status"] if drift else None,
+        "clv_model": asdict(clv_model),
+        "processed_dir": str(processed_dir),
+        "stage_seconds": timings,
+    }
+
+
+def refresh_categories(score: bool = False) -> dict:
+    """
+    Re-run only the stages fed by the product tables, on top of the outputs of the last
+    full run: re-read order_items/products/translation, rebuild the category matrix and
+    share features (for the active model's categories), rewrite customer_features/
+    segments and the feature store, and (with `score`) rescore. The transaction table,
+    cohorts, RFM segments, CLV and KPI sketches are left as they are.
+    """
+    processed_dir = settings.root_dir / settings.data_processed_dir
+    timings: dict[str, float] = {}
+
+    def stage(name: str, t0: float) -> None:
+        timings[name] = round(time.perf_counter() - t0, 3)
+
+    print(f"\n[etl] Reloading {', '.join(CATEGORY_TABLES)}...")
+    t0 = time.perf_counter()
+    data = load_all_raw_data(tables=list(CATEGORY_TABLES))
+    transactions = pd.read_csv(
+        processed_dir / "transactions.csv", usecols=["order_id", "customer_unique_id", *SOURCE_COLS]
+    )
+    items = build_item_table(data, transactions)
+    stage("extract", t0)
+
+    t0 = time.perf_counter()
+    # Outputs of a run that predates the order-history features get them here too.
+    customer_features = with_temporal_features(pd.read_csv(processed_dir / "customer_features.csv"), transactions)
+    customer_features, category_matrix = _with_category_features(customer_features, items, _share_categories())
+    _write_features(customer_features, processed_dir)
+    stage("features", t0)
+
+    t0 = time.perf_counter()
+    segments_path = processed_dir / "customer_segments.csv"
+    segmented = with_temporal_features(pd.read_csv(segments_path), transactions)
+    share_cols = [c for c in customer_features.columns if is_category_feature(c)]
+    segmented = segmented.drop(columns=[c for c in segmented.columns if is_category_feature(c)]).merge(
+        customer_features[["customer_unique_id", *share_cols]], on="customer_unique_id", how="left"
+    )
+    segmented.to_csv(segments_path, index=False)
+    mix = segment_category_mix(category_matrix, segmented)
+    products_dir = save_category_outputs(category_matrix, mix)
+    stage("categories", t0)
+    print(f"[analysis] Updated segments and category outputs in: {products_dir}")
+
+    scores = None
+    if score:
+        t0 = time.perf_counter()
+        scores = _score_segments(segmented, processed_dir)
+        stage("scoring", t0)
+    drift = _check_drift(segmented, scores)
+
+    bump_data_version()
+    return {
+        "customers": int(len(segmented)),
+        "scored": scores is not None,
+        "drift_status": drift["status"] if drift else None,
+        "processed_dir": str(processed_dir),
+        "stage_seconds": timings,
+    }
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.config import settings
+from src.etl.extract import RAW_FILES
+
+STATE_FILENAME = "watch_state.json"
+
+Signature = tuple[int, int]  # (size, mtime_ns)
+
+
+def snapshot(raw_dir: Path) -> dict[str, Signature]:
+    """
+    (size, mtime) of each of the seven raw tables that currently exists, by table name.
+    Upload tools often write to a temporary name first; only the final names are watched.
+    """
+    out = {}
+    for name, filename in RAW_FILES.items():
+        try:
+            st = (raw_dir / filename).stat()
+        except FileNotFoundError:
+            continue
+        out[name] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+def plan_for(changed: set[str]) -> str:
+    """'full' when the transaction table is affected, 'categories' when only the product tables changed."""
+    from src.pipeline.stages import TRANSACTION_TABLES
+
+    return "full" if changed & set(TRANSACTION_TABLES) else "categories"
+
+
+@dataclass
+class RawDirWatcher:
+    """
+    Polls the raw directory and reports a batch of changed tables once every changed
+    file has kept the same size and mtime for `debounce` seconds (an upload in
+    progress keeps changing both). `baseline` is what the processed outputs were last
+    built from.
+    """
+
+    raw_dir: Path
+    baseline: dict[str, Signature]
+    debounce: float = 30.0
+
+    def __post_init__(self) -> None:
+        self._last: dict[str, Signature] = {}
+        self._stable_since = time.monotonic()
+
+    def poll(self) -> tuple[set[str], dict[str, Signature]] | None:
+        """Return (changed tables, their snapshot) when a settled batch is ready, else None."""
+        current = snapshot(self.raw_dir)
+        now = time.monotonic()
+        if current != self._last:
+            self._last = current
+            self._stable_since = now
+            return None
+
+        changed = {name for name, sig in current.items() if self.baseline.get(name) != sig}
+        if not changed or now - self._stable_since < self.debounce:
+            return None
+        if len(current) < len(RAW_FILES):
+            return None  # a full run needs every table; wait for the rest of the drop
+        return changed, current
+
+
+def _state_path() -> Path:
+    return settings.root_dir / settings.data_processed_dir / STATE_FILENAME
+
+
+def load_state() -> dict[str, Signature] | None:
+    path = _state_path()
+    if not path.exists():
+        return None
+    return {name: tuple(sig) for name, sig in json.loads(path.read_text(encoding="utf-8")).items()}
+
+
+def save_state(state: dict[str, Signature]) -> None:
+    path = _state_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(state), encoding="utf-8")
+
+
+def run_plan(plan: str, score: bool) -> dict:
+    from src.pipeline.stages import refresh_categories, run_pipeline
+
+    return run_pipeline(score=score) if plan == "full" else refresh_categories(score=score)
+
+
+def watch(interval: float = 5.0, debounce: float = 30.0, score: bool = False, once: bool = False) -> None:
+    settings.ensure_dirs()
+    raw_dir = settings.root_dir / settings.data_raw_dir
+    processed_dir = settings.root_dir / settings.data_processed_dir
+
+    baseline = load_state()
+    if baseline is None:
+        # First start: adopt the files the current outputs were built from, if there are outputs.
+        built = (processed_dir / "customer_segments.csv").exists()
+        baseline = snapshot(raw_dir) if built else {}
+        save_state(baseline)
+
+    watcher = RawDirWatcher(raw_dir, baseline, debounce=debounce)
+    print(f"[watch] Watching {raw_dir} every {interval:g}s (debounce {debounce:g}s)")
+
+    while True:
+        batch = watcher.poll()
+        if batch is not None:
+            changed, current = batch
+            plan = plan_for(changed)
+            print(f"\n[watch] Changed: {', '.join(sorted(changed))} → {plan} refresh")
+            t0 = time.perf_counter()
+            try:
+                summary = run_plan(plan, score)
+            except Exception as e:  # keep watching; a fixed re-upload triggers a new run
+                print(f"[watch] Refresh failed: {type(e).__name__}: {e}")
+            else:
+                print(f"[watch] {plan} refresh done in {time.perf_counter() - t0:.1f}s: {summary.get('stage_seconds')}")
+            # Either way this drop has been handled; only new changes trigger another run.
+            watcher.baseline = current
+            save_state(current)
+            if once:
+                return
+        time.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Watch data/raw and refresh the processed outputs when new Olist files land."
+    )
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls")
+    parser.add_argument("--debounce", type=float, default=30.0, help="Seconds a changed file must stay unchanged")
+    parser.add_argument("--score", action="store_true", help="Also rescore customers after each refresh")
+    parser.add_argument("--once", action="store_true", help="Exit after the first refresh")
+    args = parser.parse_args()
+
+    watch(interval=args.interval, debounce=args.debounce, score=args.score, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+DASHBOARD = ROOT / "app" / "dashboard.py"
+
+REPORT_FILENAME = "load_test.json"
+STEPS = ("load", "segment", "date_range", "threshold", "rerun")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def dashboard_labels() -> dict[str, set[str]]:
+    """Labels of the widgets the sessions drive, in every UI language (read from the dashboard's I18N table)."""
+    tree = ast.parse(DASHBOARD.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "I18N" for t in node.targets):
+            i18n = ast.literal_eval(node.value)
+            return {key: {lang[key] for lang in i18n.values()} for key in ("segment", "date_range", "risk_threshold")}
+    raise RuntimeError(f"No I18N table found in {DASHBOARD}")
+
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+def synthesize(n_customers: int, out_dir: Path, seed: int = 0) -> str:
+    """
+    Resample the current processed data (or the demo sample) to `n_customers` customers,
+    each a renamed copy of a real one with all of its orders, and write the tables plus
+    the artifacts the dashboard reads (cohorts, region rollup, KPI sketches) to `out_dir`.
+    Returns the description of the source data.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from src.analysis.cohorts import COHORTS_FILENAME, build_cohorts, save_cohorts
+    from src.analysis.geography import ROLLUP_FILENAME, build_region_rollup, save_region_rollup
+    from src.analysis.products import SEGMENT_MIX_FILENAME
+    from src.analysis.sketches import SKETCHES_FILENAME, build_kpi_sketches, save_kpi_sketches
+    from src.analysis.summary import find_churn_col
+    from src.config import settings
+    from src.etl.processed import load_processed_data
+
+    segments, tx, source, _ = load_processed_data()
+    source_dir = settings.root_dir / settings.data_processed_dir
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(segments), n_customers)
+    copy_tag = np.char.add("~", np.arange(n_customers).astype(str))
+    new_ids = np.char.add(segments["customer_unique_id"].to_numpy(dtype=str)[picks], copy_tag)
+
+    # Rows of each source customer are contiguous in `order`; gather them once per copy.
+    codes = pd.Categorical(tx["customer_unique_id"], categories=segments["customer_unique_id"]).codes
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind="stable")]
+    counts = np.bincount(codes[valid], minlength=len(segments))
+    starts = np.cumsum(counts) - counts
+    n_rows = counts[picks]
+    within = np.arange(n_rows.sum()) - np.repeat(np.cumsum(n_rows) - n_rows, n_rows)
+    owner = np.repeat(np.arange(n_customers), n_rows)
+
+    new_tx = tx.iloc[order[np.repeat(starts[picks], n_rows) + within]].reset_index(drop=True)
+    new_tx["customer_unique_id"] = new_ids[owner]
+    for col in ("order_id", "customer_id"):
+        if col in new_tx.columns:
+            new_tx[col] = np.char.add(new_tx[col].to_numpy(dtype=str), copy_tag[owner])
+
+    new_segments = segments.iloc[picks].reset_index(drop=True)
+    new_segments["customer_unique_id"] = new_ids
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    clv_cols: list[str] = []
+    if (source_dir / "customer_clv.csv").exists():
+        clv_cols = [c for c in pd.read_csv(source_dir / "customer_clv.csv", nrows=0).columns if c != "customer_unique_id"]
+        new_segments[["customer_unique_id", *clv_cols]].to_csv(out_dir / "customer_clv.csv", index=False)
+    new_segments.drop(columns=clv_cols).to_csv(out_dir / "customer_segments.csv", index=False)
+    new_tx.to_csv(out_dir / "transactions.csv", index=False)
+
+    save_cohorts(build_cohorts(new_tx), out_dir / COHORTS_FILENAME)
+    if "customer_state" in new_segments.columns:
+        rollup = build_region_rollup(new_segments, find_churn_col(new_segments))
+        save_region_rollup(rollup, out_dir / ROLLUP_FILENAME)
+    save_kpi_sketches(build_kpi_sketches(new_tx, new_segments), out_dir / SKETCHES_FILENAME)
+    if (source_dir / SEGMENT_MIX_FILENAME).exists():
+        # Copies keep their segment, so the per-segment category shares carry over unchanged.
+        shutil.copy(source_dir / SEGMENT_MIX_FILENAME, out_dir / SEGMENT_MIX_FILENAME)
+    return source
+
+
+# -----------------------------
+# Sessions (worker process)
+# -----------------------------
+def current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Samples the process RSS every `interval` seconds (Linux); the peak falls back to getrusage elsewhere."""
+
+    def __init__(self, interval: float = 0.1) -> None:
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = current_rss_mb()
+        self.peak = self.baseline or 0.0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb() or 0.0)
+
+    def stop(self) -> dict[str, float | None]:
+        self._stop_event.set()
+        self.join()
+        if not self.peak:
+            import resource
+
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+        return {"baseline_mb": self.baseline, "peak_mb": self.peak, "end_mb": current_rss_mb()}
+
+
+@dataclass
+class SessionResult:
+    session: int
+    timings: list[tuple[str, float]] = field(default_factory=list)  # (step, ms) per rerun
+    errors: list[str] = field(default_factory=list)
+
+
+def run_session(
+    session: int,
+    iterations: int,
+    labels: dict[str, set[str]],
+    seed: int = 0,
+    timeout: float = 120.0,
+    start: threading.Barrier | None = None,
+) -> SessionResult:
+    """
+    One analyst: open the dashboard, then `iterations` times switch segment, move the
+    date range, change the risk threshold and rerun with unchanged widgets (what a
+    download click or any other no-op interaction costs). Every rerun is timed.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + session)
+    result = SessionResult(session)
+    at = AppTest.from_file(str(DASHBOARD), default_timeout=timeout)
+
+    def widget(widgets, key: str):
+        found = next((w for w in widgets if w.label in labels[key]), None)
+        if found is None:
+            raise LookupError(f"no '{key}' widget on the page")
+        return found
+
+    def step(name: str, action) -> None:
+        t0 = time.perf_counter()
+        try:
+            action()
+        except Exception as e:  # a broken step is reported, the session carries on
+            result.errors.append(f"{name}: {type(e).__name__}: {e}")
+            return
+        result.timings.append((name, (time.perf_counter() - t0) * 1000))
+        result.errors.extend(f"{name}: {e.value}" for e in at.exception)
+        result.errors.extend(f"{name}: {e.value[:300]}" for e in at.error)
+
+    if start is not None:
+        start.wait()
+    step("load", at.run)
+    full_range = tuple(widget(at.date_input, "date_range").value) if not result.errors else None
+
+    def move_date_range() -> None:
+        lo, hi = full_range
+        span = (hi - lo).days
+        if rng.random() < 0.3 or span < 2:
+            value = (lo, hi)
+        else:
+            first = lo + timedelta(days=rng.randrange(span // 2))
+            value = (first, first + timedelta(days=rng.randrange(1, hi.toordinal() - first.toordinal() + 1)))
+        widget(at.date_input, "date_range").set_value(value).run()
+
+    def switch_segment() -> None:
+        segment = widget(at.selectbox, "segment")
+        segment.select_index(rng.randrange(len(segment.options))).run()
+
+    for _ in range(iterations if full_range else 0):
+        step("segment", switch_segment)
+        step("date_range", move_date_range)
+        step("threshold", lambda: widget(at.slider, "risk_threshold").set_value(rng.randrange(10, 96, 5)).run())
+        step("rerun", at.run)
+    return result
+
+
+def _prepare_app_test() -> None:
+    """
+    Make AppTest safe to run from several threads, the way one Streamlit server runs its
+    sessions. This replaces private Streamlit attributes (checked against the version
+    pinned in requirements.txt) and fails fast if a release has moved them.
+    """
+    import streamlit
+
+    try:
+        from streamlit import config
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+        from streamlit.testing.v1 import app_test, local_script_runner
+        from streamlit.testing.v1.util import build_mock_config_get_option
+    except ImportError as e:
+        raise RuntimeError(
+            f"Streamlit {streamlit.__version__} lacks an AppTest internal the load test patches ({e}). "
+            "Install the version pinned in requirements.txt."
+        ) from None
+    missing = [
+        name
+        for module, attr, name in (
+            (config, "get_option", "streamlit.config.get_option"),
+            (app_test, "ScriptCache", "streamlit.testing.v1.app_test.ScriptCache"),
+            (local_script_runner, "ScriptCache", "streamlit.testing.v1.local_script_runner.ScriptCache"),
+        )
+        if not hasattr(module, attr)
+    ]
+    if missing:
+        raise RuntimeError(
+            f"Streamlit {streamlit.__version__} lacks {', '.join(missing)}, which the load test patches. "
+            "Install the version pinned in requirements.txt."
+        )
+
+    # AppTest.run() patches config.get_option for the length of one run and then puts the
+    # previous function back; with runs overlapping, one session's restore would turn test
+    # mode off under another. Pinned here, every restore keeps it on.
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+
+    # Each AppTest run compiles the script into a fresh ScriptCache, and concurrent
+    # ast.parse calls are not thread-safe on every Python version. A server keeps one
+    # cache (with a lock) per process; so does the worker.
+    shared = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+
+
+def run_worker(sessions: int, iterations: int, seed: int, timeout: float) -> dict:
+    _prepare_app_test()
+    labels = dashboard_labels()
+    # Warm-up session: fills the process-wide caches, like the first visitor of a freshly
+    # started container.
+    t0 = time.perf_counter()
+    warmup = run_session(-1, 0, labels, seed, timeout)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    sampler = RssSampler()
+    sampler.start()
+    barrier = threading.Barrier(sessions)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(
+            pool.map(lambda i: run_session(i, iterations, labels, seed, timeout, barrier), range(sessions))
+        )
+    wall_s = time.perf_counter() - t0
+    memory = sampler.stop()
+
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "cold_start_ms": cold_ms,
+        "wall_s": wall_s,
+        "timings": [(name, ms) for r in results for name, ms in r.timings],
+        "errors": warmup.errors + [f"session {r.session}: {e}" for r in results for e in r.errors],
+        "memory": memory,
+    }
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def latency_table(timings: list[tuple[str, float]]) -> dict[str, dict[str, float]]:
+    import numpy as np
+
+    table = {}
+    for name in (*STEPS, "all"):
+        values = np.array([ms for step, ms in timings if name in (step, "all")])
+        if len(values):
+            row = {"n": int(len(values)), "mean": float(values.mean()), "max": float(values.max())}
+            row.update({f"p{q}": float(np.percentile(values, q)) for q in PERCENTILES})
+            table[name] = row
+    return table
+
+
+def print_report(report: dict) -> None:
+    data = f"{report['customers']:,} synthetic customers" if report["customers"] else "current processed data"
+    print(
+        f"[loadtest] {report['sessions']} sessions × {report['iterations']} iterations on {data}"
+        f" · cold start {report['cold_start_ms']:,.0f} ms"
+    )
+    header = "".join(f"{f'p{q}':>8}" for q in PERCENTILES)
+    print(f"[loadtest] {'step':<11}{'n':>5}{header}{'max':>8}  (ms)")
+    for name, row in report["latency_ms"].items():
+        cells = "".join(f"{row[f'p{q}']:8.0f}" for q in PERCENTILES)
+        print(f"[loadtest] {name:<11}{row['n']:>5}{cells}{row['max']:8.0f}")
+
+    reruns = report["latency_ms"].get("all", {}).get("n", 0)
+    memory = report["memory"]
+    baseline = f"{memory['baseline_mb']:,.0f} MB" if memory["baseline_mb"] else "n/a"
+    print(
+        f"[loadtest] throughput {reruns / report['wall_s']:.1f} reruns/s over {report['wall_s']:.1f}s"
+        f" · RSS baseline {baseline}, peak {memory['peak_mb']:,.0f} MB"
+    )
+    for error in report["errors"][:10]:
+        print(f"[loadtest] error: {error}")
+    if len(report["errors"]) > 10:
+        print(f"[loadtest] … {len(report['errors']) - 10} more errors")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Drive app/dashboard.py with concurrent simulated sessions and report rerun latency and memory."
+    )
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="Interaction rounds per session")
+    parser.add_argument(
+        "--customers", type=int, default=0, help="Synthetic dataset size (0 = use the current processed data)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dataset and the interaction choices")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds one rerun may take")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Fail when the overall p95 exceeds this")
+    parser.add_argument("--output", type=Path, default=None, help="JSON report path")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.sessions, args.iterations, args.seed, args.timeout)
+        print(json.dumps(result))
+        return 0
+
+    from src.config import settings
+
+    env = dict(os.environ)
+    scratch = None
+    if args.customers:
+        scratch = Path(tempfile.mkdtemp(prefix="dashboard-load-"))
+        t0 = time.perf_counter()
+        source = synthesize(args.customers, scratch, args.seed)
+        print(f"[loadtest] Synthesized {args.customers:,} customers from {source} in {time.perf_counter() - t0:.1f}s")
+        env["DATA_PROCESSED_DIR"] = str(scratch)
+
+    # Sessions run in a fresh process so its memory is the dashboard's alone.
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "src.utils.load_test", *sys.argv[1:], "--worker"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Load-test worker failed:\n{proc.stderr[-3000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    report = {
+        "customers": args.customers,
+        **{k: v for k, v in result.items() if k != "timings"},
+        "latency_ms": latency_table([tuple(t) for t in result["timings"]]),
+    }
+    print_report(report)
+
+    output = args.output or settings.root_dir / settings.reports_dir / "profiling" / REPORT_FILENAME
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[loadtest] Report saved to: {output}")
+
+    p95 = report["latency_ms"].get("all", {}).get("p95")
+    if args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms):
+        print(f"[loadtest] FAIL overall p95 {p95 or 0:,.0f} ms > budget {args.max_p95_ms:,.0f} ms")
+        return 1
+    if report["errors"]:
+        print("[loadtest] FAIL sessions raised errors")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
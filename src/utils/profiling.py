@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from src.config import settings
+
+LOG_FILENAME = "dashboard_reruns.jsonl"
+CAPTURE_MODES = ("cprofile", "pyinstrument")
+
+_current: contextvars.ContextVar["RerunProfiler | None"] = contextvars.ContextVar("rerun_profiler", default=None)
+
+
+def profiling_dir() -> Path:
+    return settings.root_dir / settings.reports_dir / "profiling"
+
+
+def profiling_log_path() -> Path:
+    return profiling_dir() / LOG_FILENAME
+
+
+@dataclass
+class RerunProfiler:
+    """
+    Wall-clock timings of named sections for one Streamlit rerun. Sections nest
+    ("predict › scoring"), and the per-rerun record is appended to a JSONL log.
+    Optionally wraps the whole rerun in cProfile or pyinstrument.
+    """
+
+    session: str = ""
+    capture: str | None = None
+    sections: list[tuple[str, float]] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    _stack: list[str] = field(default_factory=list)
+    _profiler: object = None
+
+    def __post_init__(self) -> None:
+        if self.capture == "cprofile":
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.capture == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.capture = None
+                print("[profile] pyinstrument is not installed; capturing section timings only")
+            else:
+                self._profiler = Profiler()
+                self._profiler.start()
+
+    @contextlib.contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        label = " › ".join(self._stack)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append((label, (time.perf_counter() - t0) * 1000))
+            self._stack.pop()
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def _stop_capture(self) -> tuple[Path | None, str]:
+        if self._profiler is None:
+            return None, ""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        out_dir = profiling_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.capture == "cprofile":
+            import pstats
+
+            self._profiler.disable()
+            path = out_dir / f"rerun-{stamp}.prof"
+            self._profiler.dump_stats(path)
+            buf = io.StringIO()
+            pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(25)
+            return path, buf.getvalue()
+
+        self._profiler.stop()
+        path = out_dir / f"rerun-{stamp}.html"
+        path.write_text(self._profiler.output_html(), encoding="utf-8")
+        return path, self._profiler.output_text(unicode=True, color=False)
+
+    def finish(self, context: dict | None = None) -> dict:
+        """Stop any capture, append the rerun record to the log and return it."""
+        capture_path, capture_text = self._stop_capture()
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "session": self.session,
+            "total_ms": round(self.total_ms, 2),
+            "sections": [{"name": name, "ms": round(ms, 2)} for name, ms in self.sections],
+            **({"context": context} if context else {}),
+            **({"capture": str(capture_path)} if capture_path else {}),
+        }
+
+        profiling_dir().mkdir(parents=True, exist_ok=True)
+        with open(profiling_log_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+        record["capture_text"] = capture_text
+        return record
+
+
+def start_rerun(session: str = "", capture: str | None = None) -> RerunProfiler:
+    profiler = RerunProfiler(session=session, capture=capture if capture in CAPTURE_MODES else None)
+    _current.set(profiler)
+    return profiler
+
+
+def end_rerun() -> None:
+    _current.set(None)
+
+
+@contextlib.contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """Time a block under the active rerun profiler; a no-op when profiling is off."""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """
+    Canonical key for a derived result: sha256 over the namespace and the JSON of its
+    inputs (dates and other non-JSON values by their str()). Equal filter states give
+    equal keys in every worker process.
+    """
+    payload = json.dumps([namespace, *parts], sort_keys=True, default=str, separators=(",", ":"))
+    return f"{namespace}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory bytes; frames and arrays by their buffers, anything else by its pickle."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(v) for v in value) + 64
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        return sum(estimate_size(v) for v in value.values()) + 64
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+@dataclass
+class ResultCache:
+    """
+    Two-level cache for derived results. Level 1 is an in-process LRU evicted by total
+    (estimated) bytes; level 2, when `disk_dir` is set, is a directory of pickles shared
+    by every worker process on the host, pruned oldest-first past `max_disk_bytes`.
+
+    Keys must capture every input of the result (see `cache_key`); nothing is
+    invalidated explicitly, so a new data or model version simply produces new keys
+    and the old entries age out.
+    """
+
+    max_bytes: int = 256 * 1024**2
+    disk_dir: Path | None = None
+    max_disk_bytes: int = 1024**3
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir is not None:
+            self.disk_dir = Path(self.disk_dir)
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    # ---- memory tier ----
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return  # would evict everything else; recompute it instead
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    # ---- disk tier ----
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _read_disk(self, key: str) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # Truncated or written by an incompatible version: treat as a miss.
+            path.unlink(missing_ok=True)
+            return _MISSING
+        os.utime(path)  # mtime doubles as the shared LRU clock
+        return value
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # not picklable: memory tier only
+        # Write-then-rename, so other processes never read a partial file.
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".pkl"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+
+    # ---- public API ----
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.memory_hits += 1
+                return entry[0]
+        if self.disk_dir is not None:
+            value = self._read_disk(key)
+            if value is not _MISSING:
+                self.stats.disk_hits += 1
+                self._remember(key, value, estimate_size(value))
+                return value
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value, estimate_size(value))
+        if self.disk_dir is not None:
+            self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            self.stats.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
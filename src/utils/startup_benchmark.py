@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# module → import-time budget in milliseconds (median of runs, measured by -X importtime).
+BUDGETS_MS = {
+    "app.dashboard": 1500,
+    "main": 900,
+    "src.api.server": 900,
+    "src.modeling.inference": 700,
+}
+
+# Must not be pulled in just by importing an entry point.
+HEAVY_MODULES = ["sklearn", "matplotlib", "plotly.express", "scipy"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> tuple[float, list[tuple[str, float]], list[str]]:
+    """
+    Import `module` in a fresh interpreter under `-X importtime`.
+    Returns (cumulative ms for the module, its heaviest imports in ms, heavy modules that got loaded).
+    """
+    probe = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    # Indentation encodes nesting (" name" top level, "   name" one below) and children
+    # are printed before their parent, so collect depth-2 lines until the parent shows up.
+    total_ms = 0.0
+    direct: list[tuple[str, float]] = []
+    pending: list[tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        depth, name, cumulative_ms = len(match.group(3)), match.group(4), int(match.group(2)) / 1000
+        if depth == 3:
+            pending.append((name, cumulative_ms))
+        elif depth == 1:
+            if name == module:
+                total_ms, direct = cumulative_ms, pending
+            pending = []
+
+    heaviest = sorted(direct, key=lambda x: -x[1])[:5]
+    loaded_heavy = [m for m in proc.stdout.strip().splitlines()[-1].split(",") if m] if proc.stdout.strip() else []
+    return total_ms, heaviest, loaded_heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure entry-point import time against budgets.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="Modules to measure")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI machines)")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        results = [measure(module) for _ in range(args.runs)]
+        median_ms = statistics.median(r[0] for r in results)
+        heaviest, loaded_heavy = results[-1][1], results[-1][2]
+
+        budget = BUDGETS_MS.get(module)
+        over_budget = budget is not None and median_ms > budget * args.scale
+        status = "FAIL" if over_budget or loaded_heavy else "ok"
+        failed |= status == "FAIL"
+
+        budget_label = f"{budget * args.scale:.0f} ms" if budget is not None else "—"
+        print(f"[startup] {status:<4} {module:<26} {median_ms:7.0f} ms (budget {budget_label})")
+        print("[startup]      heaviest: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in heaviest))
+        if loaded_heavy:
+            print(f"[startup]      heavy modules loaded at import: {loaded_heavy}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
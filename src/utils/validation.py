@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Iterable
+
+import numpy as np
 import pandas as pd
 
 
@@ -10,4 +14,184 @@ def require_columns(df: pd.DataFrame, required: Iterable[str], name: str) -> Non
         raise ValueError(
             f"[schema] {name} missing columns: {missing}. "
             f"Available columns: {list(df.columns)}"
-        )
\ No newline at end of file
+        )
+
+
+# ===============================
+# Declarative data-quality checks
+# ===============================
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """
+    Expectations for one column. Row-level violations (type, nulls, range, allowed
+    values, uniqueness) send the row to quarantine; `max_null_rate` is a table-level
+    check that is only reported.
+    """
+
+    column: str
+    dtype: str | None = None  # "numeric" | "datetime"
+    nullable: bool = True
+    min_value: float | None = None
+    max_value: float | None = None
+    allowed: tuple | None = None
+    unique: bool = False
+    max_null_rate: float | None = None
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    column: str
+    ref_table: str
+    ref_column: str
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    name: str
+    columns: tuple[ColumnRule, ...]
+    primary_key: tuple[str, ...] = ()
+    foreign_keys: tuple[ForeignKey, ...] = ()
+
+
+@dataclass
+class ValidationResult:
+    table: str
+    valid: pd.DataFrame
+    quarantine: pd.DataFrame
+    checks: list[dict] = field(default_factory=list)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.valid) + len(self.quarantine)
+
+
+def _check(table: str, column: str, check: str, failed: int, n_rows: int, status: str | None = None) -> dict:
+    return {
+        "table": table,
+        "column": column,
+        "check": check,
+        "failed_rows": int(failed),
+        "failed_rate": (failed / n_rows) if n_rows else 0.0,
+        "status": status or ("fail" if failed else "ok"),
+    }
+
+
+def _coerce(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "numeric":
+        return pd.to_numeric(series, errors="coerce")
+    if dtype == "datetime":
+        return pd.to_datetime(series, errors="coerce", format="ISO8601")
+    raise ValueError(f"Unknown dtype rule: {dtype!r}")
+
+
+def validate_table(
+    df: pd.DataFrame,
+    schema: TableSchema,
+    ref_values: dict[tuple[str, str], pd.Index] | None = None,
+) -> ValidationResult:
+    """
+    Run every check in `schema` as one vectorized pass over its column(s).
+
+    Typed columns are coerced in place (so e.g. timestamps are parsed once here, not
+    again downstream). Rows failing any row-level check are split off into the
+    quarantine frame with a `_violations` column naming the failed checks.
+    """
+    require_columns(
+        df,
+        [rule.column for rule in schema.columns]
+        + list(schema.primary_key)
+        + [fk.column for fk in schema.foreign_keys],
+        schema.name,
+    )
+
+    df = df.copy()
+    n = len(df)
+    checks: list[dict] = []
+    masks: list[tuple[str, np.ndarray]] = []
+
+    def add(column: str, check: str, mask: pd.Series | np.ndarray) -> None:
+        mask = np.asarray(mask, dtype=bool)
+        failed = int(mask.sum())
+        checks.append(_check(schema.name, column, check, failed, n))
+        if failed:
+            masks.append((f"{column}:{check}", mask))
+
+    for rule in schema.columns:
+        col = rule.column
+        raw_null = df[col].isna().to_numpy()
+
+        if rule.dtype:
+            df[col] = _coerce(df[col], rule.dtype)
+            add(col, f"type_{rule.dtype}", df[col].isna().to_numpy() & ~raw_null)
+
+        values = df[col]
+        is_null = values.isna().to_numpy()
+
+        if rule.max_null_rate is not None:
+            rate = float(is_null.mean()) if n else 0.0
+            status = "warn" if rate > rule.max_null_rate else "ok"
+            checks.append(_check(schema.name, col, f"null_rate<={rule.max_null_rate}", int(is_null.sum()), n, status))
+        if not rule.nullable:
+            add(col, "not_null", raw_null)
+        if rule.min_value is not None:
+            add(col, f">={rule.min_value}", (values < rule.min_value).to_numpy() & ~is_null)
+        if rule.max_value is not None:
+            add(col, f"<={rule.max_value}", (values > rule.max_value).to_numpy() & ~is_null)
+        if rule.allowed is not None:
+            add(col, "allowed_values", ~values.isin(rule.allowed).to_numpy() & ~is_null)
+        if rule.unique:
+            add(col, "unique", values.duplicated(keep="first").to_numpy() & ~is_null)
+
+    if schema.primary_key:
+        add("+".join(schema.primary_key), "unique", df.duplicated(subset=list(schema.primary_key), keep="first"))
+
+    for fk in schema.foreign_keys:
+        refs = (ref_values or {}).get((fk.ref_table, fk.ref_column))
+        if refs is None:
+            continue
+        if not isinstance(refs, pd.Index) or not refs.is_unique:
+            refs = pd.Index(pd.unique(refs))
+        # Hash lookup against a unique index; Series.isin on Arrow-backed strings loops in Python.
+        values = df[fk.column]
+        add(fk.column, f"fk->{fk.ref_table}.{fk.ref_column}", (refs.get_indexer(values) < 0) & values.notna().to_numpy())
+
+    if not masks:
+        return ValidationResult(schema.name, df, df.iloc[0:0].assign(_violations=""), checks)
+
+    bad = np.logical_or.reduce([m for _, m in masks])
+    quarantine = df[bad].copy()
+    labels = pd.Series("", index=quarantine.index)
+    for name, mask in masks:
+        labels = labels.where(~mask[bad], labels + name + ";")
+    quarantine["_violations"] = labels.str.rstrip(";")
+
+    return ValidationResult(schema.name, df[~bad], quarantine, checks)
+
+
+def validate_tables(
+    data: dict[str, pd.DataFrame],
+    schemas: dict[str, TableSchema],
+    max_workers: int = 4,
+) -> dict[str, ValidationResult]:
+    """
+    Validate several tables concurrently. Foreign keys are checked against the raw
+    (pre-quarantine) key columns of the referenced tables, so tables stay independent.
+    Each referenced key set is indexed once and shared by every table that points at it.
+    """
+    ref_values = {
+        (fk.ref_table, fk.ref_column): pd.Index(data[fk.ref_table][fk.ref_column].dropna().unique())
+        for schema in schemas.values()
+        for fk in schema.foreign_keys
+        if fk.ref_table in data
+    }
+
+    names = [name for name in schemas if name in data]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda name: validate_table(data[name], schemas[name], ref_values), names)
+        return dict(zip(names, results))
+
+
+def validation_report(results: dict[str, ValidationResult]) -> pd.DataFrame:
+    return pd.DataFrame([check for result in results.values() for check in result.checks])
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling import background
+from src.modeling.background import BackgroundScorer
+
+TIMEOUT = 10
+
+
+@pytest.fixture
+def gate(monkeypatch) -> threading.Event:
+    """Stub the model so scoring is `x / 10` and each chunk blocks until the gate opens."""
+    event = threading.Event()
+
+    def predict_positive(model, X, feature_cols):
+        assert event.wait(TIMEOUT)
+        return X[:, 0] / 10
+
+    monkeypatch.setattr(background, "load_model_artifacts", lambda: (None, ["x"], "v1"))
+    monkeypatch.setattr(background, "model_matrix", lambda df, cols, from_store: df[cols].to_numpy(float))
+    monkeypatch.setattr(background, "predict_positive", predict_positive)
+    return event
+
+
+@pytest.fixture
+def scorer():
+    s = BackgroundScorer(max_workers=2, chunk_size=3, max_results=2)
+    yield s
+    s._executor.shutdown(wait=True)
+
+
+def _features(n: int = 10) -> pd.DataFrame:
+    return pd.DataFrame({"x": np.arange(n, dtype=float)}, index=[f"c{i}" for i in range(n)])
+
+
+def test_scores_in_chunks_and_keeps_index(gate, scorer):
+    df = _features()
+    job = scorer.submit("k", df, "s1")
+    gate.set()
+    result = job.future.result(timeout=TIMEOUT)
+    pd.testing.assert_series_equal(result, (df["x"] / 10).rename("churn_probability"))
+    assert len(job.chunks) == 4
+    assert job.progress == 1.0 and job.done
+
+
+def test_identical_requests_share_one_job(gate, scorer):
+    df = _features()
+    first = scorer.submit("k", df, "s1")
+    second = scorer.submit("k", df, "s2")
+    assert first is second
+    assert first.watchers == {"s1", "s2"}
+    gate.set()
+    first.future.result(timeout=TIMEOUT)
+
+
+def test_completed_result_is_reused(gate, scorer):
+    df = _features()
+    gate.set()
+    job = scorer.submit("k", df, "s1")
+    job.future.result(timeout=TIMEOUT)
+    assert scorer.submit("k", df, "s2") is job
+
+
+def test_new_key_cancels_unwatched_previous_job(gate, scorer):
+    df = _features()
+    old = scorer.submit("k1", df, "s1")
+    new = scorer.submit("k2", df, "s1")
+    assert old.cancelled and not new.cancelled
+    gate.set()
+    assert old.future.result(timeout=TIMEOUT) is None
+    assert new.future.result(timeout=TIMEOUT) is not None
+    # A cancelled job is not cached: asking for its key again starts a fresh run.
+    again = scorer.submit("k1", df, "s1")
+    assert again is not old
+    assert again.future.result(timeout=TIMEOUT) is not None
+
+
+def test_previous_job_survives_while_another_session_watches(gate, scorer):
+    df = _features()
+    shared = scorer.submit("k1", df, "s1")
+    scorer.submit("k1", df, "s2")
+    scorer.submit("k2", df, "s1")
+    assert not shared.cancelled
+    assert shared.watchers == {"s2"}
+    gate.set()
+    assert shared.future.result(timeout=TIMEOUT) is not None
+
+
+def test_result_cache_is_bounded_lru(gate, scorer):
+    df = _features(3)
+    gate.set()
+    jobs = {}
+    for key in ("a", "b", "c"):
+        jobs[key] = scorer.submit(key, df, "s1")
+        jobs[key].future.result(timeout=TIMEOUT)
+    assert list(scorer._results) == ["b", "c"]
+    assert scorer.submit("a", df, "s1") is not jobs["a"]
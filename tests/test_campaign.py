@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import campaign
+from src.analysis.campaign import select_targets, simulate_campaign
+
+
+@pytest.fixture(scope="module")
+def customers() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    return rng.beta(2, 3, size=500), rng.gamma(2.0, 60.0, size=500)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # 500 customers × 40 draws per chunk: 1000 draws span 25 chunks.
+    monkeypatch.setattr(campaign, "CHUNK_CELLS", 20_000)
+
+
+def test_draws_do_not_depend_on_worker_count(customers, small_chunks):
+    p, value = customers
+    runs = [simulate_campaign(p, value, 0.3, n_draws=1000, seed=7, max_workers=w).retained for w in (1, 2, 4)]
+    assert len(runs[0]) == 1000
+    np.testing.assert_array_equal(runs[0], runs[1])
+    np.testing.assert_array_equal(runs[0], runs[2])
+
+
+def test_mean_and_spread_match_expected(customers, small_chunks):
+    p, value = customers
+    result = simulate_campaign(p, value, 0.3, n_draws=4000, seed=1)
+    q = p * 0.3
+    assert result.expected_retained == pytest.approx(np.dot(q, value))
+    # Σ value · Bernoulli(q): variance Σ value² q (1 - q); mean of 4000 draws within 4 standard errors.
+    sd = np.sqrt(np.dot(value**2, q * (1 - q)))
+    assert abs(result.retained.mean() - result.expected_retained) < 4 * sd / np.sqrt(4000)
+    assert result.retained.std() == pytest.approx(sd, rel=0.1)
+
+
+def test_seed_reproducible_and_different_seeds_differ(customers):
+    p, value = customers
+    a = simulate_campaign(p, value, 0.3, n_draws=200, seed=3).retained
+    np.testing.assert_array_equal(a, simulate_campaign(p, value, 0.3, n_draws=200, seed=3).retained)
+    assert not np.array_equal(a, simulate_campaign(p, value, 0.3, n_draws=200, seed=4).retained)
+
+
+def test_summary_roi(customers):
+    p, value = customers
+    result = simulate_campaign(p, value, 0.3, cost_per_contact=5.0, n_draws=500, seed=0)
+    summary = result.summary()
+    assert summary["cost"] == 2500.0
+    assert summary["roi_mean"] == pytest.approx((result.retained.mean() - 2500) / 2500)
+    lo, hi = summary["retained_ci"]
+    assert lo <= summary["retained_mean"] <= hi
+    assert 0 <= summary["p_positive_roi"] <= 1
+
+    free = simulate_campaign(p, value, 0.3, n_draws=10, seed=0).summary()
+    assert free["roi_mean"] is None and free["roi_ci"] is None
+
+
+def test_empty_and_degenerate_inputs():
+    empty = simulate_campaign(np.array([]), np.array([]), 0.3, cost_per_contact=1.0, n_draws=50)
+    assert (empty.n_targeted, empty.expected_retained) == (0, 0.0)
+    assert not empty.retained.any()
+    # Probabilities outside [0, 1] are clipped and missing values count as zero.
+    sure = simulate_campaign(np.array([1.5, -1.0]), np.array([10.0, np.nan]), 1.0, n_draws=20, seed=0)
+    np.testing.assert_array_equal(sure.retained, 10.0)
+
+
+def test_select_targets_orders_by_expected_save_and_respects_budget():
+    scored = pd.DataFrame(
+        {
+            "churn_probability": [0.9, 0.6, 0.8, 0.3, 0.7],
+            "clv": [10.0, 100.0, 50.0, 1000.0, np.nan],
+        },
+        index=list("abcde"),
+    )
+    assert select_targets(scored, "clv", threshold=0.5).index.tolist() == ["b", "c", "a", "e"]
+    assert select_targets(scored, "clv", threshold=0.5, top_n=3).index.tolist() == ["b", "c", "a"]
+    budgeted = select_targets(scored, "clv", threshold=0.5, budget=25.0, cost_per_contact=10.0)
+    assert budgeted.index.tolist() == ["b", "c"]
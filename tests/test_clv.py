@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling.clv import OBSERVED_SPEND, TIME_UNIT_DAYS, CLVModel, fit_clv
+
+# Generating parameters (a > 1 and q > 1, so expected purchases and mean spend exist).
+R, ALPHA, A, B = 0.8, 4.0, 2.5, 5.0
+P, Q, V = 6.0, 4.0, 15.0
+FUTURE_WEEKS = 26.0
+
+
+def _simulate(n: int, seed: int = 0) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Customers drawn from the BG/NBD + Gamma-Gamma generative process, as model features
+    (in days) plus each customer's true number of purchases in the next FUTURE_WEEKS.
+    """
+    rng = np.random.default_rng(seed)
+    lam = rng.gamma(R, 1 / ALPHA, size=n)
+    drop = rng.beta(A, B, size=n)
+    T = rng.uniform(10, 80, size=n)
+    nu = rng.gamma(Q, 1 / V, size=n)
+
+    x = np.zeros(n, dtype=int)
+    t_x = np.zeros(n)
+    future = np.zeros(n, dtype=int)
+    avg_value = np.zeros(n)
+    for i in range(n):
+        t, spend = 0.0, [rng.gamma(P, 1 / nu[i])]
+        while True:
+            # The first purchase is at 0; the customer may drop out after each purchase.
+            if t > 0 and rng.random() < drop[i]:
+                break
+            t += rng.exponential(1 / lam[i])
+            if t > T[i] + FUTURE_WEEKS:
+                break
+            if t <= T[i]:
+                x[i] += 1
+                t_x[i] = t
+                spend.append(rng.gamma(P, 1 / nu[i]))
+            else:
+                future[i] += 1
+        avg_value[i] = np.mean(spend)
+
+    features = pd.DataFrame(
+        {
+            "customer_unique_id": [f"c{i}" for i in range(n)],
+            "frequency_orders": x + 1,
+            "tenure_days": T * TIME_UNIT_DAYS,
+            "recency_days": (T - t_x) * TIME_UNIT_DAYS,
+            "avg_order_value": avg_value,
+        }
+    )
+    return features, future
+
+
+@pytest.fixture(scope="module")
+def simulated() -> tuple[pd.DataFrame, np.ndarray, CLVModel]:
+    features, future = _simulate(6000)
+    return features, future, fit_clv(features)
+
+
+def test_fit_recovers_generating_parameters(simulated):
+    _, _, model = simulated
+    assert model.r == pytest.approx(R, rel=0.2)
+    assert model.alpha == pytest.approx(ALPHA, rel=0.3)
+    assert model.a / (model.a + model.b) == pytest.approx(A / (A + B), rel=0.2)
+    assert model.v * model.p / (model.q - 1) == pytest.approx(V * P / (Q - 1), rel=0.1)
+
+
+def test_expected_purchases_match_simulated_future(simulated):
+    features, future, model = simulated
+    predicted = model.predict(features, horizon_days=int(FUTURE_WEEKS * TIME_UNIT_DAYS))
+    assert predicted["expected_purchases"].mean() == pytest.approx(future.mean(), rel=0.1)
+    # The conditional expectations hold per history too, not only on average.
+    by_x = pd.DataFrame(
+        {
+            "orders": features["frequency_orders"].clip(upper=4),
+            "pred": predicted["expected_purchases"],
+            "actual": future,
+        }
+    ).groupby("orders").mean()
+    np.testing.assert_allclose(by_x["pred"], by_x["actual"], rtol=0.25)
+
+
+def test_p_alive_is_one_without_repeats_and_decays_with_inactivity(simulated):
+    _, _, model = simulated
+    assert model.p_alive([0], [0], [40]).item() == 1.0
+    recent, stale = model.p_alive([3, 3], [39, 5], [40, 40])
+    assert 0 < stale < recent <= 1
+
+
+def test_expected_order_value_shrinks_toward_population_mean(simulated):
+    _, _, model = simulated
+    population = model.v * model.p / (model.q - 1)
+    low, high = model.expected_order_value([2, 50], [population / 4, population / 4])
+    assert population / 4 < high < low < population
+
+
+def test_undefined_moments_fall_back():
+    model = CLVModel(r=0.24, alpha=4.4, a=0.79, b=2.4, p=P, q=0.9, v=V, n_customers=1, n_repeat_customers=1)
+    assert np.isnan(model.expected_purchases(52, [2], [30.4], [38.9])).all()
+    np.testing.assert_array_equal(model.expected_order_value([3, 5], [10.0, 20.0]), [10.0, 20.0])
+
+
+def test_few_repeat_buyers_use_observed_spend():
+    features, _ = _simulate(300, seed=1)
+    features.loc[features.index[10:], "frequency_orders"] = 1
+    model = fit_clv(features)
+    assert (model.p, model.q, model.v) == OBSERVED_SPEND
+    np.testing.assert_allclose(model.expected_order_value([2], [42.0]), [42.0], rtol=1e-5)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.cohorts import build_cohorts, load_cohorts, save_cohorts
+
+
+@pytest.fixture(scope="module")
+def tx() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 3000
+    ts = pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 540, size=n), unit="D")
+    df = pd.DataFrame(
+        {
+            "customer_unique_id": rng.integers(0, 800, size=n).astype(str),
+            "order_purchase_timestamp": ts,
+            "revenue": rng.gamma(2.0, 50.0, size=n).round(2),
+        }
+    )
+    df.loc[::250, "order_purchase_timestamp"] = pd.NaT
+    return df
+
+
+def _reference(tx: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.Series]:
+    """Cohort active counts and revenue the slow way: groupby over (cohort, period)."""
+    df = tx.dropna(subset=["order_purchase_timestamp"]).copy()
+    df["month"] = df["order_purchase_timestamp"].dt.to_period("M")
+    df["cohort"] = df.groupby("customer_unique_id")["month"].transform("min")
+    df["period"] = (df["month"] - df["cohort"]).apply(lambda offset: offset.n)
+    df["cohort"] = df["cohort"].astype(str)
+    grouped = df.groupby(["cohort", "period"])
+    active = grouped["customer_unique_id"].nunique().unstack(fill_value=0)
+    revenue = grouped["revenue"].sum().unstack(fill_value=0.0)
+    return active, revenue, df.groupby("cohort")["customer_unique_id"].nunique()
+
+
+def test_matrices_match_groupby(tx):
+    matrices = build_cohorts(tx)
+    active, revenue, sizes = _reference(tx)
+
+    got_active = matrices.active_customers()
+    assert list(got_active.index) == list(sizes.index)
+    np.testing.assert_array_equal(matrices.sizes, sizes.to_numpy())
+
+    observed = got_active.notna()
+    expected_active = active.reindex(columns=got_active.columns, fill_value=0)
+    expected_revenue = revenue.reindex(columns=got_active.columns, fill_value=0.0)
+    np.testing.assert_array_equal(got_active[observed].fillna(-1), expected_active.where(observed, -1))
+    np.testing.assert_allclose(
+        matrices.revenue_matrix()[observed].fillna(-1), expected_revenue.where(observed, -1), rtol=1e-9
+    )
+    np.testing.assert_allclose(matrices.retention()[0].to_numpy(), 1.0)
+
+
+def test_cells_after_last_order_month_are_nan():
+    tx = pd.DataFrame(
+        {
+            "customer_unique_id": ["a", "b", "a", "b"],
+            "order_purchase_timestamp": pd.to_datetime(["2018-01-10", "2018-02-10", "2018-03-10", "2018-04-10"]),
+            "revenue": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+    retention = build_cohorts(tx).retention()
+    # April has only a repeat order, so the February cohort is observable for 3 periods.
+    assert retention.loc["2018-01"].tolist() == [1.0, 0.0, 1.0, 0.0]
+    np.testing.assert_array_equal(retention.loc["2018-02"].to_numpy(), [1.0, 0.0, 1.0, np.nan])
+
+
+def test_save_load_round_trip(tx, tmp_path):
+    matrices = build_cohorts(tx)
+    loaded = load_cohorts(save_cohorts(matrices, tmp_path / "cohorts.csv"))
+    assert loaded.last_month == matrices.last_month
+    pd.testing.assert_frame_equal(loaded.retention(), matrices.retention())
+    pd.testing.assert_frame_equal(loaded.revenue_matrix(), matrices.revenue_matrix())
+    assert load_cohorts(tmp_path / "missing.csv") is None
+
+
+def test_empty_transactions():
+    tx = pd.DataFrame(
+        {"customer_unique_id": ["a"], "order_purchase_timestamp": [pd.NaT], "revenue": [1.0]}
+    )
+    matrices = build_cohorts(tx)
+    assert matrices.retention().empty
+    assert matrices.to_long().empty
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from src.modeling.compact import PARITY_TOLERANCE, CompactForest
+
+
+@pytest.fixture(scope="module")
+def data() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6)).astype(np.float32)
+    # One coarse column, like rounded money or day counts: many rows share each value.
+    X[:, 3] = np.round(X[:, 3], 1)
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module", params=[RandomForestClassifier, ExtraTreesClassifier])
+def fitted(request, data):
+    X, y = data
+    # Unbounded depth and min_samples_leaf=1 give trees of very different depths.
+    model = request.param(n_estimators=25, random_state=0).fit(X, y)
+    return model, CompactForest.from_sklearn(model)
+
+
+def test_predict_proba_matches_sklearn(fitted, data):
+    model, compact = fitted
+    X, _ = data
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(compact.predict_proba(X), expected, rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_predict_proba_independent_of_chunking(fitted, data):
+    _, compact = fitted
+    X, _ = data
+    np.testing.assert_array_equal(compact.predict_proba(X, chunk_size=7), compact.predict_proba(X))
+
+
+def test_contributions_add_up_to_prediction(fitted, data):
+    _, compact = fitted
+    X, _ = data
+    bias, contributions = compact.contributions(X, chunk_size=64)
+    assert contributions.shape == X.shape
+    np.testing.assert_allclose(
+        bias + contributions.sum(axis=1), compact.predict_proba(X)[:, 1], rtol=0, atol=PARITY_TOLERANCE
+    )
+
+
+def test_contributions_bias_is_mean_root_value(fitted):
+    model, compact = fitted
+    roots = [est.tree_.value[0, 0] for est in model.estimators_]
+    expected = np.mean([v[1] / v.sum() for v in roots])
+    bias, _ = compact.contributions(np.zeros((1, compact.n_features), dtype=np.float32))
+    assert bias == pytest.approx(expected, abs=PARITY_TOLERANCE)
+
+
+def test_unused_feature_gets_no_contribution(data):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=10, max_features=None, random_state=0)
+    model.fit(np.column_stack([X, np.zeros(len(X), dtype=np.float32)]), y)
+    compact = CompactForest.from_sklearn(model)
+    _, contributions = compact.contributions(np.column_stack([X, np.ones(len(X), dtype=np.float32)]))
+    assert not contributions[:, -1].any()
+
+
+def test_save_load_round_trip(fitted, data, tmp_path):
+    _, compact = fitted
+    X, _ = data
+    path = tmp_path / "compact.npz"
+    compact.save(path)
+    loaded = CompactForest.load(path)
+    assert (loaded.max_depth, loaded.n_features) == (compact.max_depth, compact.n_features)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compact.predict_proba(X))
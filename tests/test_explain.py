@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.modeling import explain
+from src.modeling.compact import PARITY_TOLERANCE
+from src.modeling.explain import explain_churn, top_drivers
+
+FEATURES = ["recency_days", "frequency_orders", "monetary_total"]
+
+
+@pytest.fixture(scope="module")
+def data() -> tuple[pd.DataFrame, RandomForestClassifier]:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(400, 3)), columns=FEATURES)
+    df.insert(0, "customer_unique_id", [f"c{i}" for i in range(len(df))])
+    y = (df["recency_days"] - df["frequency_orders"] + rng.normal(scale=0.5, size=len(df)) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(df[FEATURES], y)
+    return df, model
+
+
+@pytest.fixture
+def matrix_rows(monkeypatch, data) -> list[int]:
+    """Stub the model and feature store; record how many rows each model_matrix call builds."""
+    _, model = data
+    calls: list[int] = []
+    store = object()
+
+    def model_matrix(features_df, feature_cols, from_store=False):
+        calls.append(len(features_df))
+        return features_df[feature_cols].to_numpy(dtype=np.float32)
+
+    monkeypatch.setattr(explain, "load_model_artifacts", lambda: (model, FEATURES, "v1"))
+    monkeypatch.setattr(explain, "model_matrix", model_matrix)
+    monkeypatch.setattr(explain, "open_feature_store", lambda: store)
+    monkeypatch.setattr(explain, "_cache", OrderedDict())
+    monkeypatch.setattr(explain, "_cache_state", {"store": None})
+    monkeypatch.setattr(explain, "_compact", {})
+    return calls
+
+
+def test_contributions_add_up_to_sklearn_proba(data, matrix_rows):
+    df, model = data
+    bias, contributions = explain_churn(df)
+    assert list(contributions.columns) == FEATURES
+    assert contributions.index.equals(df.index)
+    np.testing.assert_allclose(
+        bias + contributions.sum(axis=1), model.predict_proba(df[FEATURES])[:, 1], rtol=0, atol=PARITY_TOLERANCE
+    )
+
+
+def test_cached_rows_are_not_recomputed(data, matrix_rows):
+    df, _ = data
+    _, first = explain_churn(df.iloc[:100], from_store=True)
+    _, second = explain_churn(df.iloc[50:150], from_store=True)
+    assert matrix_rows == [100, 50]
+    pd.testing.assert_frame_equal(second.loc[50:99], first.loc[50:99])
+    pd.testing.assert_frame_equal(second, explain_churn(df.iloc[50:150])[1])
+
+
+def test_rebuilt_store_drops_the_cache(data, matrix_rows, monkeypatch):
+    df, _ = data
+    explain_churn(df.iloc[:10], from_store=True)
+    monkeypatch.setattr(explain, "open_feature_store", lambda: object())
+    explain_churn(df.iloc[:10], from_store=True)
+    assert matrix_rows == [10, 10]
+
+
+def test_non_tree_model_is_rejected(data, monkeypatch):
+    df, _ = data
+    linear = LogisticRegression().fit(df[FEATURES], np.arange(len(df)) % 2)
+    monkeypatch.setattr(explain, "load_model_artifacts", lambda: (linear, FEATURES, "linear"))
+    monkeypatch.setattr(explain, "_compact", {})
+    with pytest.raises(TypeError, match="tree ensemble"):
+        explain_churn(df)
+
+
+def test_top_drivers_lists_positive_contributions_only():
+    contributions = pd.DataFrame(
+        [[0.05, -0.02, 0.10], [-0.01, -0.03, -0.02]], columns=FEATURES, index=["a", "b"]
+    )
+    drivers = top_drivers(contributions, k=2)
+    assert drivers.to_dict() == {"a": "monetary_total (+10.0 pp), recency_days (+5.0 pp)", "b": ""}
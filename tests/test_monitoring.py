@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.modeling.monitoring import DriftBaseline, binned_ks, build_baseline, psi
+
+
+def test_psi_and_ks_on_known_histograms():
+    expected = np.array([50, 50])
+    actual = np.array([25, 75])
+    assert psi(expected, actual) == pytest.approx(0.25 * np.log(2) + 0.25 * np.log(1.5))
+    assert binned_ks(expected, actual) == pytest.approx(0.25)
+    # Only proportions matter, and a histogram does not drift from itself.
+    assert psi(expected, 3 * expected) == 0.0
+    assert binned_ks(np.array([1, 2, 3]), np.array([2, 4, 6])) == 0.0
+
+
+def test_psi_floors_empty_bins():
+    value = psi(np.array([100, 0]), np.array([50, 50]))
+    assert np.isfinite(value)
+    assert value == pytest.approx((0.5 - 1) * np.log(0.5) + (0.5 - 1e-4) * np.log(0.5 / 1e-4))
+
+
+def test_binned_ks_matches_exact_ks_on_bin_edges():
+    from scipy.stats import ks_2samp
+
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, 10, size=5000), rng.integers(0, 12, size=4000)
+    # On integer data, one bin per value loses nothing: the binned KS is the exact one.
+    counts_a, counts_b = np.bincount(a, minlength=12), np.bincount(b, minlength=12)
+    assert binned_ks(counts_a, counts_b) == pytest.approx(ks_2samp(a, b).statistic)
+
+
+@pytest.fixture(scope="module")
+def baseline() -> DriftBaseline:
+    rng = np.random.default_rng(1)
+    X = np.column_stack([rng.normal(size=20000), rng.integers(1, 4, size=20000), np.zeros(20000)])
+    return build_baseline(X, ["amount", "orders", "flag"], rng.beta(2, 5, size=20000))
+
+
+def test_baseline_bins_are_deciles_or_collapsed(baseline):
+    assert len(baseline._feature_edges(0)) == 9
+    np.testing.assert_allclose(baseline.counts[0] / baseline.counts[0].sum(), 0.1, atol=1e-3)
+    assert baseline._feature_edges(1).tolist() == [1.0, 2.0, 3.0]
+    assert baseline._feature_edges(2).tolist() == [0.0]
+    assert baseline.counts.sum(axis=1).tolist() == [20000] * 3
+    assert baseline.score_counts.sum() == 20000
+
+
+def test_same_distribution_is_ok_and_shift_alerts(baseline):
+    rng = np.random.default_rng(2)
+    same = np.column_stack([rng.normal(size=5000), rng.integers(1, 4, size=5000), np.zeros(5000)])
+    table = baseline.compare(baseline.feature_counts(same), baseline.score_histogram(rng.beta(2, 5, size=5000)))
+    assert table["column"].tolist() == ["amount", "orders", "flag", "churn_probability"]
+    assert set(table["status"]) == {"ok"}
+
+    shifted = same.copy()
+    shifted[:, 0] += 0.5
+    table = baseline.compare(baseline.feature_counts(shifted), baseline.score_histogram(rng.beta(5, 2, size=5000)))
+    assert table.set_index("column")["status"].to_dict() == {
+        "amount": "alert",
+        "orders": "ok",
+        "flag": "ok",
+        "churn_probability": "alert",
+    }
+
+
+def test_counts_add_across_batches(baseline):
+    rng = np.random.default_rng(3)
+    X = np.column_stack([rng.normal(size=3000), rng.integers(1, 4, size=3000), np.zeros(3000)])
+    summed = baseline.feature_counts(X[:1000]) + baseline.feature_counts(X[1000:])
+    np.testing.assert_array_equal(summed, baseline.feature_counts(X))
+
+
+def test_save_load_round_trip(baseline, tmp_path):
+    path = tmp_path / "drift_baseline.npz"
+    baseline.save(path)
+    loaded = DriftBaseline.load(path)
+    assert loaded.feature_cols == baseline.feature_cols
+    np.testing.assert_array_equal(loaded.edges, baseline.edges)
+    np.testing.assert_array_equal(loaded.counts, baseline.counts)
+    np.testing.assert_array_equal(loaded.score_counts, baseline.score_counts)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import dataclasses
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pytest
+from joblib import dump
+from sklearn.linear_model import LogisticRegression
+
+from src.modeling import inference, registry
+from src.modeling.registry import (
+    CURRENT_POINTER,
+    FEATURES_FILENAME,
+    MODEL_FILENAME,
+    current_version,
+    list_versions,
+    publish_version,
+    read_metadata,
+    set_current,
+    stage_version,
+    versions_dir,
+)
+
+
+@pytest.fixture(autouse=True)
+def models(monkeypatch, tmp_path) -> Path:
+    # MODELS_DIR may be absolute, which would win over root_dir: replace both.
+    settings = dataclasses.replace(registry.settings, root_dir=tmp_path, models_dir=Path("models"))
+    monkeypatch.setattr(registry, "settings", settings)
+    monkeypatch.setattr(inference, "_pointer_cache", {"stat": None, "version_id": None})
+    monkeypatch.setattr(inference, "_loaded", OrderedDict())
+    return registry.models_dir()
+
+
+def _publish(version_id: str, coef: float, activate: bool = True) -> Path:
+    staging = stage_version()
+    model = LogisticRegression().fit(np.array([[0.0], [1.0]]), [0, 1])
+    model.coef_[:] = coef
+    dump(model, staging / MODEL_FILENAME)
+    dump(["x"], staging / FEATURES_FILENAME)
+    return publish_version(version_id, staging, {"metrics": {"roc_auc": coef}}, activate=activate)
+
+
+def test_publish_activates_and_records_metadata(models):
+    target = _publish("v1", 1.0)
+    assert target == versions_dir() / "v1"
+    assert current_version() == "v1"
+    assert read_metadata("v1") == {"version_id": "v1", "metrics": {"roc_auc": 1.0}}
+    # No staging leftovers, and hidden dirs are never listed as versions.
+    assert [p.name for p in versions_dir().iterdir()] == ["v1"]
+
+
+def test_publish_without_activate_keeps_current(models):
+    _publish("v1", 1.0)
+    _publish("v2", 2.0, activate=False)
+    assert current_version() == "v1"
+    assert [m["version_id"] for m in list_versions()] == ["v1", "v2"]
+
+
+def test_duplicate_version_is_rejected_and_staging_removed(models):
+    _publish("v1", 1.0)
+    with pytest.raises(FileExistsError):
+        _publish("v1", 2.0)
+    assert [p.name for p in versions_dir().iterdir()] == ["v1"]
+    assert read_metadata("v1")["metrics"]["roc_auc"] == 1.0
+
+
+def test_set_current_refuses_incomplete_versions(models):
+    _publish("v1", 1.0)
+    (versions_dir() / "broken").mkdir()
+    with pytest.raises(FileNotFoundError):
+        set_current("broken")
+    with pytest.raises(FileNotFoundError):
+        set_current("missing")
+    assert current_version() == "v1"
+    assert not list(models.glob(".CURRENT-*"))
+
+
+def test_rollback_switches_loaded_model(models):
+    _publish("v1", 1.0)
+    _publish("v2", 2.0)
+    model, cols, version = inference.load_model_artifacts()
+    assert (version, cols, model.coef_[0, 0]) == ("v2", ["x"], 2.0)
+
+    set_current("v1")
+    model, _, version = inference.load_model_artifacts()
+    assert (version, model.coef_[0, 0]) == ("v1", 1.0)
+    assert inference.model_version() == "v1"
+    assert (models / CURRENT_POINTER).read_text(encoding="utf-8") == "v1\n"
+
+
+def test_legacy_flat_artifacts_without_current(models):
+    with pytest.raises(FileNotFoundError):
+        inference.load_model_artifacts()
+    assert current_version() is None
+
+    models.mkdir(parents=True, exist_ok=True)
+    dump(LogisticRegression().fit(np.array([[0.0], [1.0]]), [0, 1]), models / MODEL_FILENAME)
+    dump(["x"], models / FEATURES_FILENAME)
+    _, cols, version = inference.load_model_artifacts()
+    assert cols == ["x"]
+    assert version.startswith(inference.LEGACY_PREFIX)
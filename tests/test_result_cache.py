@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utils.result_cache import ResultCache, cache_key, estimate_size
+
+
+def _blob(n_bytes: int, fill: int = 0) -> np.ndarray:
+    return np.full(n_bytes, fill, dtype=np.uint8)
+
+
+def test_cache_key_is_canonical():
+    a = cache_key("kpis", {"segments": ["A"], "start": dt.date(2018, 1, 1)}, "v1")
+    b = cache_key("kpis", {"start": dt.date(2018, 1, 1), "segments": ["A"]}, "v1")
+    assert a == b and a.startswith("kpis-")
+    assert a != cache_key("kpis", {"segments": ["A"], "start": dt.date(2018, 1, 2)}, "v1")
+    assert a != cache_key("kpis", {"segments": ["A"], "start": dt.date(2018, 1, 1)}, "v2")
+
+
+def test_estimate_size():
+    assert estimate_size(_blob(1000)) == 1000
+    df = pd.DataFrame({"x": np.zeros(100)})
+    assert estimate_size(df) == df.memory_usage(deep=True).sum()
+    assert estimate_size((_blob(10), _blob(20))) == 94
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes():
+    cache = ResultCache(max_bytes=2500)
+    cache.put("a", _blob(1000))
+    cache.put("b", _blob(1000))
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", _blob(1000))
+    assert (cache.get("b"), len(cache), cache.nbytes) == (None, 2, 2000)
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    # Re-putting a key replaces its size rather than adding to it.
+    cache.put("a", _blob(500))
+    assert cache.nbytes == 1500
+
+
+def test_oversized_values_are_not_kept_in_memory():
+    cache = ResultCache(max_bytes=100)
+    cache.put("small", _blob(50))
+    cache.put("big", _blob(1000))
+    assert cache.get("big") is None
+    assert cache.get("small") is not None
+
+
+def test_get_or_compute_counts_hits_and_misses(tmp_path):
+    calls = []
+    cache = ResultCache(disk_dir=tmp_path)
+    for _ in range(3):
+        value = cache.get_or_compute("k", lambda: calls.append(1) or _blob(10, 7))
+    assert calls == [1]
+    np.testing.assert_array_equal(value, _blob(10, 7))
+    assert cache.stats.as_dict() == {"memory_hits": 2, "disk_hits": 0, "misses": 1}
+
+    # Another worker process shares the disk tier.
+    other = ResultCache(disk_dir=tmp_path)
+    np.testing.assert_array_equal(other.get("k"), _blob(10, 7))
+    assert other.get("k") is not None
+    assert other.stats.as_dict() == {"memory_hits": 1, "disk_hits": 1, "misses": 0}
+
+
+def test_disk_tier_prunes_oldest_first(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path, max_disk_bytes=3000)
+    for i, key in enumerate(("a", "b")):
+        cache.put(key, _blob(1000))
+        os.utime(tmp_path / f"{key}.pkl", (1_000_000 + i, 1_000_000 + i))
+    # Reading "a" refreshes its mtime, so "b" becomes the oldest file.
+    ResultCache(disk_dir=tmp_path).get("a")
+    cache.put("c", _blob(1000))
+
+    assert sorted(p.stem for p in tmp_path.glob("*.pkl")) == ["a", "c"]
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 3000
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_corrupt_disk_entry_is_a_miss_and_removed(tmp_path):
+    (tmp_path / "k.pkl").write_bytes(b"not a pickle")
+    cache = ResultCache(disk_dir=tmp_path)
+    assert cache.get("k", "default") == "default"
+    assert not (tmp_path / "k.pkl").exists()
+
+
+def test_unpicklable_values_stay_in_memory(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path)
+    value = lambda: None  # noqa: E731
+    cache.put("fn", value)
+    assert cache.get("fn") is value
+    assert not list(tmp_path.iterdir())
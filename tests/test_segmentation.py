@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.segmentation import (
+    assign_rfm_segments,
+    fit_rfm_bins,
+    label_segments,
+    load_rfm_bins,
+    save_rfm_bins,
+    score_rfm,
+)
+
+LABELS = [1, 2, 3, 4]
+
+
+@pytest.fixture(scope="module")
+def features() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 2000
+    return pd.DataFrame(
+        {
+            "recency_days": rng.integers(0, 700, size=n).astype(float),
+            # Heavily tied, like real order counts: qcut has to drop duplicate edges.
+            "frequency_orders": rng.choice([1, 1, 1, 1, 1, 1, 2, 2, 3, 5], size=n).astype(float),
+            "monetary_total": rng.lognormal(4, 1, size=n).round(2),
+        },
+        index=[f"c{i}" for i in range(n)],
+    )
+
+
+def _qcut_reference(series: pd.Series, reverse: bool) -> np.ndarray:
+    """The scoring this module replaced: pd.qcut codes rescaled onto 1..4."""
+    buckets = pd.qcut(series, q=4, duplicates="drop")
+    k = buckets.cat.categories.size
+    scaled = (buckets.cat.codes / max(k - 1, 1) * 3).round().astype(int)
+    out = np.asarray(LABELS)[scaled.to_numpy()]
+    return 5 - out if reverse else out
+
+
+@pytest.mark.parametrize(
+    "score_col, col, reverse",
+    [
+        ("R_score", "recency_days", True),
+        ("F_score", "frequency_orders", False),
+        ("M_score", "monetary_total", False),
+    ],
+)
+def test_scores_match_qcut(features, score_col, col, reverse):
+    scores = score_rfm(features, fit_rfm_bins(features))
+    np.testing.assert_array_equal(scores[score_col].to_numpy(), _qcut_reference(features[col], reverse))
+
+
+def test_frequency_ties_collapse_bins(features):
+    bins = fit_rfm_bins(features)
+    assert bins.edges["frequency_orders"].size < 3
+    assert bins.n_reference == len(features)
+
+
+def test_batch_scores_do_not_depend_on_batch(features):
+    bins = fit_rfm_bins(features)
+    full = score_rfm(features, bins)
+    batch = features.iloc[::97]
+    pd.testing.assert_frame_equal(score_rfm(batch, bins), full.loc[batch.index])
+
+
+def test_constant_column_scores_top_bucket():
+    df = pd.DataFrame({"recency_days": [5.0, 5.0], "frequency_orders": [1.0, 1.0], "monetary_total": [10.0, 20.0]})
+    bins = fit_rfm_bins(df)
+    assert "frequency_orders" not in bins.edges
+    assert score_rfm(df, bins)["F_score"].tolist() == [4, 4]
+
+
+def test_sampled_edges_approximate_full_edges(features):
+    full = fit_rfm_bins(features)
+    sampled = fit_rfm_bins(features, sample_size=1000)
+    assert sampled.n_reference == 1000
+    np.testing.assert_allclose(sampled.edges["recency_days"], full.edges["recency_days"], rtol=0.1)
+
+
+def test_label_segments_matches_rules():
+    r, f, m = (a.ravel() for a in np.meshgrid(LABELS, LABELS, LABELS, indexing="ij"))
+
+    def rule(r: int, f: int, m: int) -> str:
+        if r >= 4 and f >= 3 and m >= 3:
+            return "Champions"
+        if r >= 3 and f >= 3 and m >= 2:
+            return "Loyal"
+        if r >= 4 and f <= 2:
+            return "New Customers"
+        if r == 3 and f <= 2 and m <= 2:
+            return "Need Attention"
+        if r <= 2 and f >= 2 and m >= 2:
+            return "At Risk"
+        if r <= 2 and f == 1:
+            return "Hibernating"
+        return "Regular"
+
+    assert label_segments(r, f, m).tolist() == [rule(*x) for x in zip(r, f, m)]
+
+
+def test_assign_with_saved_bins(features, tmp_path):
+    path = save_rfm_bins(fit_rfm_bins(features), tmp_path / "rfm_bins.joblib")
+    segmented = assign_rfm_segments(features.iloc[:50], load_rfm_bins(path))
+    expected = assign_rfm_segments(features).iloc[:50]
+    pd.testing.assert_frame_equal(segmented, expected)
+    with pytest.raises(FileNotFoundError):
+        load_rfm_bins(tmp_path / "missing.joblib")
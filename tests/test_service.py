@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.api import service
+from src.api.service import QueryService
+
+
+@pytest.fixture
+def segments() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "customer_unique_id": ["a", "b", "c"],
+            "segment_name": ["Champions", "At Risk", "At Risk"],
+            "monetary_total": [300.0, 50.0, 20.0],
+            "churn_180d": [0, 1, 1],
+        }
+    )
+
+
+@pytest.fixture
+def tx() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": ["o1", "o2", "o3", "o4"],
+            "customer_unique_id": ["a", "a", "b", "c"],
+            "order_purchase_timestamp": pd.to_datetime(
+                ["2018-01-03 10:00", "2018-01-01 10:00", "2018-01-02 23:00", "2018-01-05 10:00"]
+            ),
+            "revenue": [100.0, 200.0, 50.0, 20.0],
+        }
+    )
+
+
+def _service(monkeypatch, segments, tx, proba=None) -> QueryService:
+    def predict_churn_proba(df, from_store=False):
+        if proba is None:
+            raise FileNotFoundError("no model")
+        return pd.Series(proba, index=df.index)
+
+    monkeypatch.setattr(service, "predict_churn_proba", predict_churn_proba)
+    return QueryService(segments, tx)
+
+
+def _get(svc: QueryService, path: str, **params) -> tuple[int, object]:
+    status, body = svc.handle(path, params)
+    return status, json.loads(body)
+
+
+def test_health_and_trailing_slash(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx)
+    status, body = _get(svc, "/health/")
+    assert status == 200
+    assert body == {"status": "ok", "source": "in-memory", "customers": 3, "orders": 4, "scored": False}
+
+
+def test_kpis_date_range_is_inclusive(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx)
+    _, body = _get(svc, "/kpis", start="2018-01-02", end="2018-01-03")
+    assert body["total_orders"] == 2
+    _, body = _get(svc, "/kpis", segment="At Risk")
+    assert (body["total_customers"], body["total_revenue"], body["churn_rate"]) == (2, 70.0, 100.0)
+
+
+def test_segments_summary(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx)
+    status, body = _get(svc, "/segments")
+    assert status == 200
+    assert [(r["segment"], r["customers"], r["revenue"]) for r in body] == [
+        ("Champions", 1, 300.0),
+        ("At Risk", 2, 70.0),
+    ]
+
+
+def test_customer_profile_orders_sorted(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx)
+    status, body = _get(svc, "/customers/a")
+    assert status == 200
+    assert body["customer"]["segment_name"] == "Champions"
+    assert [o["order_id"] for o in body["orders"]] == ["o2", "o1"]
+    assert _get(svc, "/customers/zzz")[0] == 404
+
+
+def test_at_risk_ranks_scores_and_clamps_n(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx, proba=[0.1, 0.9, 0.5])
+    status, body = _get(svc, "/customers/at-risk", n="5000")
+    assert status == 200
+    assert [r["customer_unique_id"] for r in body] == ["b", "c", "a"]
+    _, body = _get(svc, "/customers/at-risk", n="1", segment="At Risk")
+    assert [r["customer_unique_id"] for r in body] == ["b"]
+
+
+@pytest.mark.parametrize(
+    "path, params, status",
+    [
+        ("/kpis", {"start": "not-a-date"}, 400),
+        ("/kpis", {"segment": "Nope"}, 400),
+        ("/customers/at-risk", {"n": "ten"}, 400),
+        ("/customers/at-risk", {}, 503),
+        ("/quantiles", {"metric": "revenue"}, 503),
+        ("/nowhere", {}, 404),
+    ],
+)
+def test_errors_map_to_status(monkeypatch, segments, tx, path, params, status):
+    svc = _service(monkeypatch, segments, tx)
+    code, body = _get(svc, path, **params)
+    assert code == status
+    assert "error" in body
+
+
+def test_only_successful_responses_are_cached(monkeypatch, segments, tx):
+    svc = _service(monkeypatch, segments, tx)
+    calls = []
+    dispatch = svc._dispatch
+    monkeypatch.setattr(svc, "_dispatch", lambda path, params: calls.append(path) or dispatch(path, params))
+    svc.handle("/health", {})
+    svc.handle("/health", {})
+    svc.handle("/nowhere", {})
+    svc.handle("/nowhere", {})
+    assert calls == ["/health", "/nowhere", "/nowhere"]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.sketches import (
+    HLL_PRECISION,
+    QUANTILE_ACCURACY,
+    QuantileSketch,
+    _bit_length,
+    build_kpi_sketches,
+    hash64,
+    hll_estimate,
+    hll_observations,
+    load_kpi_sketches,
+    save_kpi_sketches,
+)
+
+# Four standard errors of a 2^11-register HyperLogLog (1.04 / sqrt(m)).
+HLL_TOLERANCE = 4 * 1.04 / np.sqrt(1 << HLL_PRECISION)
+
+
+def _hll(ids: pd.Series) -> float:
+    index, rank = hll_observations(hash64(ids))
+    registers = np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+    np.maximum.at(registers, index, rank)
+    return hll_estimate(registers)
+
+
+def test_bit_length_is_exact():
+    values = np.array([0, 1, 2, 3, 2**31, 2**32 - 1, 2**32, 2**53 + 1, 2**64 - 1], dtype=np.uint64)
+    assert _bit_length(values).tolist() == [int(v).bit_length() for v in values]
+
+
+@pytest.mark.parametrize("n", [10, 1000, 20000, 200000])
+def test_hll_estimate_within_error_bound(n):
+    ids = pd.Series([f"customer-{i}" for i in range(n)])
+    # Duplicates must not count twice.
+    estimate = _hll(pd.concat([ids, ids.iloc[: n // 2]]))
+    assert estimate == pytest.approx(n, rel=HLL_TOLERANCE)
+
+
+def test_hll_registers_merge_like_union():
+    a = pd.Series([f"c{i}" for i in range(0, 6000)])
+    b = pd.Series([f"c{i}" for i in range(4000, 10000)])
+    registers = []
+    for ids in (a, b):
+        index, rank = hll_observations(hash64(ids))
+        r = np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+        np.maximum.at(r, index, rank)
+        registers.append(r)
+    assert hll_estimate(np.maximum(*registers)) == pytest.approx(_hll(pd.concat([a, b])))
+    assert hll_estimate(np.maximum(*registers)) == pytest.approx(10000, rel=HLL_TOLERANCE)
+
+
+@pytest.fixture(scope="module")
+def values() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.concatenate([rng.lognormal(4, 1.5, size=20000), np.zeros(500), [np.nan, np.inf]])
+
+
+@pytest.mark.parametrize("q", [0.0, 0.01, 0.1, 0.5, 0.9, 0.99, 1.0])
+def test_quantiles_within_relative_accuracy(values, q):
+    finite = np.sort(values[np.isfinite(values)])
+    exact = finite[int(q * (len(finite) - 1))]
+    (estimate,) = QuantileSketch.from_values(values).quantiles([q])
+    assert estimate == pytest.approx(exact, rel=QUANTILE_ACCURACY, abs=0)
+
+
+def test_quantile_sketch_merge_equals_sketch_of_union(values):
+    parts = np.array_split(values, 3)
+    merged = QuantileSketch.merge([QuantileSketch.from_values(p) for p in parts])
+    whole = QuantileSketch.from_values(values)
+    np.testing.assert_array_equal(merged.keys, whole.keys)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert QuantileSketch.merge([]).quantiles([0.5]) == [None]
+
+
+@pytest.fixture(scope="module")
+def cube_data() -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(1)
+    n_customers, n_orders = 5000, 20000
+    segments = pd.DataFrame(
+        {
+            "customer_unique_id": [f"c{i}" for i in range(n_customers)],
+            "segment_name": rng.choice(["A", "B", "C"], size=n_customers),
+            "monetary_total": rng.gamma(2.0, 80.0, size=n_customers),
+        }
+    )
+    tx = pd.DataFrame(
+        {
+            "order_id": [f"o{i}" for i in range(n_orders)],
+            "customer_unique_id": rng.choice(segments["customer_unique_id"], size=n_orders),
+            "order_purchase_timestamp": pd.Timestamp("2018-01-01")
+            + pd.to_timedelta(rng.integers(0, 90 * 24, size=n_orders), unit="h"),
+            "revenue": rng.gamma(2.0, 40.0, size=n_orders),
+        }
+    )
+    tx.loc[::1000, "order_purchase_timestamp"] = pd.NaT
+    return tx, segments
+
+
+@pytest.mark.parametrize(
+    "seg, start, end",
+    [(None, None, None), (["A"], None, None), (["A", "C"], "2018-01-15", "2018-02-10"), (None, "2018-03-01", None)],
+)
+def test_cube_answers_filters(cube_data, seg, start, end):
+    tx, segments = cube_data
+    sketches = build_kpi_sketches(tx, segments)
+
+    rows = tx.merge(segments, on="customer_unique_id")
+    day = rows["order_purchase_timestamp"].dt.normalize()
+    mask = pd.Series(True, index=rows.index)
+    if seg is not None:
+        mask &= rows["segment_name"].isin(seg)
+    if start is not None:
+        mask &= day >= pd.Timestamp(start)
+    if end is not None:
+        mask &= day <= pd.Timestamp(end)
+    expected = rows[mask]
+
+    start_d = pd.Timestamp(start).date() if start else None
+    end_d = pd.Timestamp(end).date() if end else None
+    assert sketches.order_count(seg, start_d, end_d) == len(expected)
+    assert sketches.revenue_total(seg, start_d, end_d) == pytest.approx(expected["revenue"].sum())
+    distinct = expected["customer_unique_id"].nunique()
+    assert sketches.distinct_customers(seg, start_d, end_d) == pytest.approx(distinct, rel=HLL_TOLERANCE)
+
+
+def test_save_load_round_trip(cube_data, tmp_path):
+    tx, segments = cube_data
+    sketches = build_kpi_sketches(tx, segments)
+    path = save_kpi_sketches(sketches, tmp_path / "kpi_sketches.npz")
+    loaded = load_kpi_sketches(path)
+
+    assert loaded.segment_names == sketches.segment_names
+    np.testing.assert_array_equal(loaded.registers, sketches.registers)
+    for seg in (None, ["B"]):
+        assert loaded.quantiles("monetary_total", [0.1, 0.5, 0.9], seg) == sketches.quantiles(
+            "monetary_total", [0.1, 0.5, 0.9], seg
+        )
+
+    # Transactions written after the sketches make them stale.
+    tx_path = tmp_path / "transactions.csv"
+    tx_path.write_text("")
+    mtime = path.stat().st_mtime
+    os.utime(tx_path, (mtime + 10, mtime + 10))
+    assert load_kpi_sketches(path) is None
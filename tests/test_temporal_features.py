@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling.temporal_features import (
+    ID_COL,
+    PEAK_WINDOW_DAYS,
+    TEMPORAL_FEATURE_COLS,
+    WINDOWS_DAYS,
+    build_temporal_features,
+    with_temporal_features,
+)
+
+
+@pytest.fixture(scope="module")
+def transactions() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n_customers = 300
+    n_orders = rng.integers(1, 8, size=n_customers)
+    ids = np.repeat([f"c{i}" for i in range(n_customers)], n_orders)
+    n = len(ids)
+    seconds = rng.integers(0, 400 * 86400, size=n)
+    seconds[::17] = seconds[::17] // 86400 * 86400  # midnights: some same-time ties
+    tx = pd.DataFrame(
+        {
+            ID_COL: ids,
+            "order_purchase_timestamp": pd.Timestamp("2017-01-01") + pd.to_timedelta(seconds, unit="s"),
+            "revenue": rng.gamma(2.0, 50.0, size=n).round(2),
+            "review_score": rng.integers(1, 6, size=n).astype(float),
+        }
+    )
+    tx.loc[rng.random(n) < 0.3, "review_score"] = np.nan
+    tx.loc[::23, "revenue"] = np.nan
+    tx.loc[::41, "order_purchase_timestamp"] = pd.NaT
+    # Shuffle so the builder has to do its own sorting.
+    return tx.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def _slope(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2 or np.ptp(x) == 0:
+        return np.nan
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def _reference(tx: pd.DataFrame) -> pd.DataFrame:
+    """The same features computed one customer at a time with plain loops."""
+    tx = tx.dropna(subset=["order_purchase_timestamp"])
+    records = []
+    for cid, orders in tx.groupby(ID_COL, sort=False):
+        orders = orders.sort_values("order_purchase_timestamp", kind="stable")
+        t = (orders["order_purchase_timestamp"] - pd.Timestamp("2017-01-01")).dt.total_seconds().to_numpy()
+        days = t / 86400
+        value = orders["revenue"].fillna(0).to_numpy()
+        review = orders["review_score"].to_numpy()
+        rank = np.arange(len(orders), dtype=float)
+        gaps = np.diff(days)
+        avg = value.mean()
+
+        def window_spend(i: int, w: int) -> tuple[int, float]:
+            inside = [j for j in range(i + 1) if t[j] >= t[i] - w * 86400]
+            return len(inside), float(value[inside].sum())
+
+        row = {
+            ID_COL: cid,
+            "mean_gap_days": gaps.mean() if len(gaps) else np.nan,
+            "std_gap_days": gaps.std() if len(gaps) > 1 else np.nan,
+            "max_gap_days": gaps.max() if len(gaps) else np.nan,
+            "last_gap_days": gaps[-1] if len(gaps) else np.nan,
+            "order_value_trend": _slope(rank, value) / avg if avg > 0 else np.nan,
+            "last_order_value_ratio": value[-1] / avg if avg > 0 else np.nan,
+        }
+        for w in WINDOWS_DAYS:
+            row[f"orders_{w}d_at_last"], row[f"spend_{w}d_at_last"] = window_spend(len(t) - 1, w)
+        peak = max(window_spend(i, PEAK_WINDOW_DAYS)[1] for i in range(len(t)))
+        last_spend = window_spend(len(t) - 1, PEAK_WINDOW_DAYS)[1]
+        row[f"spend_{PEAK_WINDOW_DAYS}d_vs_peak"] = last_spend / peak if peak > 0 else np.nan
+        rated = ~np.isnan(review)
+        row["last_review_score"] = review[rated][-1] if rated.any() else np.nan
+        row["review_trend"] = _slope(rank[rated], review[rated])
+        records.append(row)
+    return pd.DataFrame(records)
+
+
+def test_matches_per_customer_loop(transactions):
+    got = build_temporal_features(transactions).set_index(ID_COL).sort_index()
+    expected = _reference(transactions).set_index(ID_COL).sort_index()[TEMPORAL_FEATURE_COLS]
+    assert list(got.columns) == TEMPORAL_FEATURE_COLS
+    assert got.index.equals(expected.index)
+    for col in TEMPORAL_FEATURE_COLS:
+        np.testing.assert_allclose(
+            got[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float), rtol=1e-7, atol=1e-7, err_msg=col
+        )
+
+
+def test_single_order_customer():
+    tx = pd.DataFrame(
+        {
+            ID_COL: ["a"],
+            "order_purchase_timestamp": pd.to_datetime(["2018-01-01"]),
+            "revenue": [20.0],
+            "review_score": [4.0],
+        }
+    )
+    row = build_temporal_features(tx).iloc[0]
+    assert np.isnan(row["mean_gap_days"]) and np.isnan(row["order_value_trend"]) and np.isnan(row["review_trend"])
+    assert (row["orders_30d_at_last"], row["spend_90d_vs_peak"], row["last_review_score"]) == (1, 1.0, 4.0)
+
+
+def test_no_timestamps_gives_empty_frame(transactions):
+    empty = build_temporal_features(transactions.assign(order_purchase_timestamp=pd.NaT))
+    assert empty.empty and list(empty.columns) == [ID_COL, *TEMPORAL_FEATURE_COLS]
+
+
+def test_with_temporal_features_backfills_only_when_missing(transactions):
+    features = pd.DataFrame({ID_COL: sorted(transactions[ID_COL].unique()), "frequency_orders": 1})
+    filled = with_temporal_features(features, transactions)
+    assert set(TEMPORAL_FEATURE_COLS) <= set(filled.columns)
+    assert filled[ID_COL].tolist() == features[ID_COL].tolist()
+
+    assert with_temporal_features(filled, transactions) is filled
+    assert with_temporal_features(features, transactions.drop(columns=["review_score"])) is features
+
+
+def test_window_includes_order_exactly_on_its_start():
+    tx = pd.DataFrame(
+        {
+            ID_COL: ["a", "a", "a"],
+            "order_purchase_timestamp": pd.to_datetime(["2018-01-01", "2018-01-31", "2018-01-31"]),
+            "revenue": [10.0, 20.0, 30.0],
+            "review_score": [5.0, np.nan, 3.0],
+        }
+    )
+    row = build_temporal_features(tx).iloc[0]
+    assert (row["orders_30d_at_last"], row["spend_30d_at_last"]) == (3, 60.0)
+    assert (row["last_gap_days"], row["max_gap_days"]) == (0.0, 30.0)
+    assert (row["last_review_score"], row["review_trend"]) == (3.0, -1.0)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from src.etl.schemas import OLIST_SCHEMAS
+from src.utils.validation import (
+    ColumnRule,
+    ForeignKey,
+    TableSchema,
+    validate_table,
+    validate_tables,
+    validation_report,
+)
+
+ITEMS = TableSchema(
+    name="items",
+    columns=(
+        ColumnRule("item_id", nullable=False, unique=True),
+        ColumnRule("price", dtype="numeric", nullable=False, min_value=0, max_value=100),
+        ColumnRule("status", allowed=("ok", "late")),
+        ColumnRule("note", max_null_rate=0.25),
+    ),
+    foreign_keys=(ForeignKey("order_id", "orders", "order_id"),),
+)
+
+
+@pytest.fixture
+def items() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "item_id": ["i1", "i2", "i2", None, "i5", "i6"],
+            "order_id": ["o1", "o1", "o2", "o2", "o9", None],
+            "price": ["10", "abc", "5", "7", "-1", "250"],
+            "status": ["ok", "late", "lost", "ok", None, "ok"],
+            "note": [None, None, "x", "y", "z", "w"],
+        }
+    )
+
+
+def _violations(result) -> dict[int, str]:
+    return result.quarantine["_violations"].to_dict()
+
+
+def _violations_by(result, column: str) -> dict[str, str]:
+    return dict(zip(result.quarantine[column], result.quarantine["_violations"]))
+
+
+def test_quarantine_rows_name_every_failed_check(items):
+    result = validate_table(items, ITEMS, {("orders", "order_id"): pd.Index(["o1", "o2"])})
+
+    assert result.valid["item_id"].tolist() == ["i1"]
+    assert _violations(result) == {
+        1: "price:type_numeric",
+        2: "item_id:unique;status:allowed_values",
+        3: "item_id:not_null",
+        4: "price:>=0;order_id:fk->orders.order_id",
+        5: "price:<=100",
+    }
+    assert result.n_rows == len(items)
+
+
+def test_typed_columns_are_coerced(items):
+    result = validate_table(items, ITEMS)
+    assert result.valid["price"].tolist() == [10.0]
+    assert pd.api.types.is_numeric_dtype(result.quarantine["price"])
+
+
+def test_nulls_pass_value_checks_and_missing_refs_skip_fk(items):
+    # Row 4 has a null status and an unknown order; without reference keys only its price fails.
+    result = validate_table(items, ITEMS)
+    assert _violations(result)[4] == "price:>=0"
+    assert not any(c["check"].startswith("fk->") for c in result.checks)
+
+
+def test_null_rate_is_reported_not_quarantined(items):
+    result = validate_table(items, ITEMS)
+    note = next(c for c in result.checks if c["column"] == "note")
+    assert (note["failed_rows"], note["status"]) == (2, "warn")
+    assert note["failed_rate"] == pytest.approx(2 / 6)
+    assert not any("note" in v for v in result.quarantine["_violations"])
+
+
+def test_clean_table_has_empty_quarantine():
+    df = pd.DataFrame({"item_id": ["a"], "order_id": ["o"], "price": [1.0], "status": ["ok"], "note": ["n"]})
+    result = validate_table(df, ITEMS)
+    assert len(result.valid) == 1
+    assert result.quarantine.empty and "_violations" in result.quarantine.columns
+    assert {c["status"] for c in result.checks} == {"ok"}
+
+
+def test_missing_column_raises(items):
+    with pytest.raises(ValueError, match="items missing columns"):
+        validate_table(items.drop(columns=["status"]), ITEMS)
+
+
+def test_validate_tables_checks_foreign_keys_against_raw_keys():
+    orders = pd.DataFrame(
+        {
+            "order_id": ["o1", "o1"],
+            "customer_id": ["c1", "c1"],
+            "order_status": ["delivered", "delivered"],
+            "order_purchase_timestamp": ["2018-01-01 10:00:00", "2018-01-02 10:00:00"],
+            "order_delivered_customer_date": [None, None],
+        }
+    )
+    payments = pd.DataFrame(
+        {"order_id": ["o1", "o2"], "payment_sequential": [1, 1], "payment_value": [10.0, 5.0]}
+    )
+    schemas = {k: OLIST_SCHEMAS[k] for k in ("orders", "payments")}
+    results = validate_tables({"orders": orders, "payments": payments}, schemas)
+
+    # The duplicate order is quarantined, but payments still see it as a known key.
+    assert _violations_by(results["orders"], "order_id") == {"o1": "order_id:unique"}
+    assert _violations_by(results["payments"], "order_id") == {"o2": "order_id:fk->orders.order_id"}
+    report = validation_report(results)
+    assert set(report["table"]) == {"orders", "payments"}
+    assert report.loc[report["check"] == "null_rate<=0.1", "status"].item() == "warn"